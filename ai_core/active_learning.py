@@ -0,0 +1,124 @@
+# ai_core/active_learning.py
+"""
+Uncertainty-driven choice of solver targets (acquisition mode of automate.py).
+
+A large pool of candidate (Fr, BW) targets is scored in one batched pass by
+forward/inverse cycle disagreement: the inverse model's design for a target
+is clamped into the family bounds and run back through the forward model;
+the relative distance between that prediction and the target is high where
+the two models disagree, i.e. where the models have seen little or
+inconsistent data. Batches are picked greedily, each pick discounting the
+score of candidates whose design is close to it (and to designs already
+simulated). Diversity is measured on the designs, not the targets: many
+unreachable targets clamp to the same corner design, and the solver only
+sees the design.
+
+    selector = ActiveTargetSelector(engine.ai_mgr, "patch_rect", (1.0, 10.0), (50, 800))
+    Fr, BW = selector.next_target()
+    selector.observe(params)   # design sent to the solver, keeps later picks away from it
+"""
+import numpy as np
+from ai_core.ai_config import *
+from ai_core import param_schema
+
+
+def candidate_pool(n, fr_range, bw_range, rng):
+    # (n,2) uniform [Fr_GHz, BW_MHz] candidates
+    U = rng.random((int(n), 2))
+    return np.column_stack([
+        fr_range[0] + U[:, 0]*(fr_range[1] - fr_range[0]),
+        bw_range[0] + U[:, 1]*(bw_range[1] - bw_range[0]),
+    ])
+
+def cycle_disagreement(ai_mgr, family, targets):
+    """
+    |forward(clamp(inverse(t))) - t| / t per target (relative Fr and BW error,
+    Euclidean), one inverse and one forward batch call.
+    returns: (scores (N,), clamped designs (N,5))
+    """
+    targets = np.atleast_2d(np.asarray(targets, dtype=float))
+    params = param_schema.clamp(family, ai_mgr.predict_inverse_batch(family, targets))
+    y = ai_mgr.predict_forward_batch(family, params)
+    rel = (y - targets) / np.maximum(np.abs(targets), 1e-9)
+    score = np.sqrt(np.sum(rel**2, axis=1))
+    return np.where(np.isfinite(score), score, 0.0), params
+
+def design_features(family, params):
+    # free slots of the design in the family's unit box
+    return param_schema.normalize(family, params)[:, param_schema.free_mask(family)]
+
+def select_diverse(Z, scores, k, length_scale=ACQ_LENGTH_SCALE, existing=None):
+    """
+    Greedy batch of k indices into the candidate features Z (unit box):
+    highest score first, every pick (and every row of existing) multiplies
+    nearby scores by 1 - exp(-d^2 / 2 l^2).
+    """
+    Z = np.asarray(Z, dtype=float)
+    s = np.asarray(scores, dtype=float).copy()
+
+    def discount(z):
+        d2 = np.sum((Z - z)**2, axis=1)
+        s[:] *= 1.0 - np.exp(-d2 / (2*length_scale**2))
+
+    if existing is not None:
+        for z in np.asarray(existing, dtype=float).reshape(-1, Z.shape[1]):
+            discount(z)
+    picks = []
+    for _ in range(min(int(k), len(s))):
+        i = int(np.argmax(s))
+        picks.append(i)
+        discount(Z[i])
+        s[i] = -np.inf
+    return np.array(picks, dtype=int)
+
+
+class ActiveTargetSelector:
+    def __init__(
+            self,
+            ai_mgr,
+            family,
+            fr_range,
+            bw_range,
+            pool_size=ACQ_POOL_SIZE,
+            batch_size=ACQ_BATCH_SIZE,
+            length_scale=ACQ_LENGTH_SCALE,
+            seed=None
+    ):
+        """
+        ai_mgr: AICoreManager (or InferenceClient) used for scoring
+        fr_range / bw_range: candidate target ranges in GHz / MHz
+        pool_size: candidates scored per refill, batch_size: targets kept per refill
+        length_scale: diversity radius in the family's unit design box
+        """
+        self.ai_mgr = ai_mgr
+        self.family = family
+        self.fr_range = tuple(fr_range)
+        self.bw_range = tuple(bw_range)
+        self.pool_size = int(pool_size)
+        self.batch_size = int(batch_size)
+        self.length_scale = float(length_scale)
+        self.rng = np.random.default_rng(seed)
+        self.queue = []
+        self.observed = []
+        self.last_scores = None
+
+    def next_batch(self):
+        """
+        Score a fresh pool and return the next (batch_size, 2) diverse high-score targets.
+        """
+        pool = candidate_pool(self.pool_size, self.fr_range, self.bw_range, self.rng)
+        scores, params = cycle_disagreement(self.ai_mgr, self.family, pool)
+        existing = design_features(self.family, self.observed) if self.observed else None
+        idx = select_diverse(design_features(self.family, params), scores, self.batch_size,
+                             self.length_scale, existing=existing)
+        self.last_scores = scores[idx]
+        return pool[idx]
+
+    def next_target(self):
+        if not self.queue:
+            self.queue = [tuple(map(float, t)) for t in self.next_batch()]
+        return self.queue.pop(0)
+
+    def observe(self, params):
+        # a design that was simulated: later batches keep away from it
+        self.observed.append([float(v) for v in params[:5]])
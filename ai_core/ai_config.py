@@ -12,6 +12,19 @@ PRINT_ERROR = True        # print eval losses
 AUTO_RETRAIN = True       # permit retrain in feedback loop
 RETRAIN_MIN_SAMPLES = 12
 RETRAIN_EVERY = 8
+RETRAIN_INCREMENTAL = True      # quick_retrain continues the saved correction model on new rows
+RETRAIN_FULL_EVERY = 20         # ... with a full refit after this many incremental updates
+RETRAIN_REPLAY_SIZE = 256       # older rows (reservoir sample) mixed into every incremental update
+RETRAIN_INCREMENTAL_EPOCHS = 20 # partial_fit passes per incremental update
+RETRAIN_BACKGROUND = True       # retrain in feedback/retrain_worker.py instead of inside the simulation cycle
+RETRAIN_POLL_INTERVAL = 1.0     # seconds between the worker's checks for a retrain request
+RETRAIN_KEEP_VERSIONS = 5       # published correction-model versions kept on disk
+CORRECTION_POLL_INTERVAL = 2.0  # seconds between checks of the correction model file for changes
+FEEDBACK_FLUSH_ROWS = 16        # buffered feedback rows written per transaction
+FEEDBACK_FLUSH_SECONDS = 30.0   # ... or at the first append after this long
+FEEDBACK_AGG_WINDOW = 50        # rolling-window length of the dashboard error statistics
+FEEDBACK_S11_EDGES = (-30.0, -20.0, -15.0, -10.0)  # dB bucket edges of the S11 histogram
+FEEDBACK_AGG_CHUNK = 50000      # store rows read per step when (re)building the aggregates
 
 # -------------------------
 # Model training / dataset
@@ -21,6 +34,58 @@ FORWARD_EPOCHS = 40
 INVERSE_EPOCHS = 60
 BATCH_SIZE = 128
 RANDOM_SEED = 42
+TRAIN_WORKERS = None              # trainers/train_families.py processes (None = one per core, at most one per job)
+TRAIN_THREADS_PER_WORKER = None   # TensorFlow threads per training process (None = cores / workers)
+TRAIN_LEARNING_RATE = 1e-3        # Adam start value; FORWARD_EPOCHS / INVERSE_EPOCHS are upper bounds
+TRAIN_PATIENCE = 8                # stop after this many epochs without val_loss improvement
+TRAIN_MIN_DELTA = 1e-3            # relative val_loss decrease that counts as an improvement
+TRAIN_LR_PATIENCE = 3             # epochs without improvement before the learning rate is cut
+TRAIN_LR_FACTOR = 0.5
+TRAIN_MIN_LR = 1e-5
+TRAIN_CHECKPOINT_EVERY = 5        # epochs between resumable checkpoints (and at the end)
+
+# -------------------------
+# Inference
+# -------------------------
+INFERENCE_BATCH_SIZE = 4096  # rows per model call in the batched predict APIs
+INFERENCE_BACKEND = "keras"  # "keras", "numpy" (exported weights, no TensorFlow import) or "multi" (shared multi-family models)
+INFERENCE_BUCKETS = (1, 8, 64, 512, INFERENCE_BATCH_SIZE)  # padded batch shapes of the compiled Keras path
+MODEL_CACHE_MAX_FAMILIES = None  # loaded families kept in memory (None = all)
+MODEL_CACHE_MAX_MB = None        # weight memory budget for loaded families (None = unbounded)
+MODEL_CACHE_PINNED = []          # families never evicted from the cache
+RESULT_CACHE_SIZE = 4096         # cached inverse predictions / optimizations (0 disables)
+RESULT_CACHE_TTL = None          # seconds before a cached result expires (None = never)
+RESULT_CACHE_FR_RES_GHZ = 0.001  # target quantization for cache keys (1 MHz)
+RESULT_CACHE_BW_RES_MHZ = 0.1    # (0.1 MHz)
+RESULT_CACHE_PATH = None         # e.g. BASE_DIR / "result_cache.save" to persist across runs
+SURROGATE_INDEX_SAMPLES = 65536  # forward-model samples per family in the surrogate index
+SWEEP_POINTS_PER_DIM = 128       # grid points per varying dimension in design sweeps
+SWEEP_CHUNK_ROWS = 262144        # grid points per sweep chunk (unit of resume)
+
+# -------------------------
+# Local inference service (python -m ai_core.inference_service)
+# -------------------------
+USE_INFERENCE_SERVICE = False   # UI / automate.py use the shared service instead of loading models
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+SERVICE_BATCH_WINDOW_MS = 2.0   # how long a batch waits for concurrent requests
+SERVICE_MAX_QUEUE = 1024        # pending requests per batcher before clients get "busy"
+SERVICE_MAX_INFLIGHT = 64       # requests read ahead per connection
+
+# -------------------------
+# Goal-seeking mode (ai_core/goal_seeker.py)
+# -------------------------
+GOAL_TOL_FR_GHZ = 0.02    # stop when |Fr error| <= 20 MHz ...
+GOAL_TOL_BW_MHZ = 10.0    # ... and |BW error| <= 10 MHz
+GOAL_MAX_SOLVES = 12      # solver (CST) runs per target
+GOAL_TRUST_RADIUS = 0.2   # initial step limit, fraction of each parameter's range
+
+# -------------------------
+# Active-learning target selection (ai_core/active_learning.py)
+# -------------------------
+ACQ_POOL_SIZE = 4096      # candidate targets scored per batch
+ACQ_BATCH_SIZE = 8        # targets sent to the solver per batch
+ACQ_LENGTH_SCALE = 0.1    # diversity radius in the unit design box
 
 # -------------------------
 # Physical & dataset defaults
@@ -45,11 +110,29 @@ MONOPOLE_LENGTH_RANGE = (5e-3, 80e-3)
 MONOPOLE_WIDTH_RANGE = (0.5e-3, 6e-3)
 DIPOLE_LENGTH_RANGE = (10e-3, 160e-3)
 DIPOLE_WIDTH_RANGE = (0.5e-3, 6e-3)
+SLOT_DEPTH_RANGE = (1e-3, 8e-3)       # u-slot / e-shape slot depth (dataset "extra" column)
+CPW_W_RANGE = (10e-3, 80e-3)
+SLOT_W_RANGE = (1e-3, 20e-3)
+VIVALDI_MOUTH_RANGE = (10e-3, 120e-3)
+SUBSTRATE_H_RANGE = (0.5e-3, 5e-3)
+EPS_R_RANGE = (2.0, 10.0)
 SAMPLES = 120000
+DATASET_CHUNK_ROWS = 100000  # rows per generator chunk (one seeded stream each; part of the dataset identity)
 
 # Paths
-BASE_DIR = Path(".")
+BASE_DIR = Path(__file__).resolve().parent.parent  # repo root: paths work from any working directory
 DATASET_PATH = BASE_DIR / "dataset_mode2.csv"
+DATASET_STORE_DIR = BASE_DIR / "dataset_mode2"  # family-partitioned float32 memmaps (dataset_store.py)
 MODELS_DIR = BASE_DIR / "models"
 MODELS_DIR.mkdir(exist_ok=True)
+TRAIN_SUMMARY_PATH = MODELS_DIR / "training_summary.json"  # per-job timings / losses of the last run
+TRAIN_CHECKPOINT_DIR = MODELS_DIR / "checkpoints"  # one resumable checkpoint per unfinished (family, model)
+SWEEP_DIR = BASE_DIR / "sweeps"  # design sweep outputs (ai_core/design_sweep.py)
+FEEDBACK_DB_PATH = BASE_DIR / "feedback" / "feedback_mode2.sqlite"  # feedback/feedback_store.py
+FEEDBACK_CSV_PATH = BASE_DIR / "feedback" / "ai_feedback_mode2.csv"  # legacy per-row log, imported once
+CORRECTION_MODEL_PATH = BASE_DIR / "feedback" / "ai_quick_retrain.save"  # published correction model (ai_quick_retrain.py)
+RETRAIN_META_PATH = BASE_DIR / ".ai_retrain_meta_mode2"  # correction retrain state (rows trained, version)
+FEEDBACK_AGG_PATH = BASE_DIR / "feedback" / "feedback_aggregates.json"  # per-family running statistics
+RETRAIN_SIGNAL_PATH = BASE_DIR / "feedback" / "retrain.request"  # written by request_retrain()
+RETRAIN_STATUS_PATH = BASE_DIR / "feedback" / "retrain_status.json"  # last retrain-worker outcome
 ANTENNA_PATH = r"E:\Antenna Optimization System\cst_interface\output\antenna.cst"
\ No newline at end of file
@@ -1,13 +1,77 @@
 # ai_core/ai_core_manager.py
+import os
+import time
+import threading
 import joblib
 import numpy as np
 from pathlib import Path
-from tensorflow.keras.models import load_model
 from ai_core.ai_config import *
+from ai_core.family_registry import FamilyRegistry
+from ai_core import param_schema
+from ai_core.numpy_runtime import NumpyFamilyModels, forward_npz_path, inverse_npz_path
+from ai_core.multi_family import (
+    MultiFamilyModels, MultiFamilyView, MULTI_FORWARD_PATH, MULTI_INVERSE_PATH, MULTI_SCALERS_PATH
+)
+from ai_core.result_cache import ResultCache, file_fingerprint
+from ai_core.surrogate_index import load_or_build_index
 import scipy.optimize as opt
 
 MODELS_DIR = Path(MODELS_DIR)
 
+OPTIMIZER_METHODS = ("powell", "de", "gradient")
+INFERENCE_BACKENDS = ("keras", "numpy", "multi")
+
+def target_loss(y, Fr_GHz, BW_MHz):
+    # Weighted error: freq error in GHz normalized by ~1 GHz, BW in MHz normalized by 100 MHz
+    # y: (N,2) NumPy array or tensor of [Fr_GHz, BW_MHz]
+    return (y[:, 0] - Fr_GHz)**2 + 0.001*(y[:, 1] - BW_MHz)**2
+
+def target_loss_grad(y, Fr_GHz, BW_MHz):
+    # d target_loss / d y for a (N,2) NumPy array
+    return np.column_stack([2.0*(y[:, 0] - Fr_GHz), 0.002*(y[:, 1] - BW_MHz)])
+
+def bucket_size(n):
+    # smallest INFERENCE_BUCKETS entry that holds n rows (n <= INFERENCE_BATCH_SIZE)
+    for b in INFERENCE_BUCKETS:
+        if n <= b:
+            return b
+    return INFERENCE_BUCKETS[-1]
+
+def compile_fixed_shape(model, bucket):
+    # one graph per bucket with a fixed input shape, so nothing is retraced
+    import tensorflow as tf
+
+    fn = tf.function(lambda x: model(x, training=False))
+    return fn.get_concrete_function(tf.TensorSpec([bucket, model.input_shape[-1]], tf.float32))
+
+def run_bucketed(get_fn, Xs, out_dim):
+    """
+    Run a fixed-shape graph over Xs: each chunk is padded up to its bucket size,
+    get_fn(bucket) returns the callable for that shape, and the padding is dropped.
+    """
+    Xs = np.asarray(Xs, dtype=np.float32)
+    out = []
+    for i in range(0, Xs.shape[0], INFERENCE_BATCH_SIZE):
+        chunk = Xs[i:i + INFERENCE_BATCH_SIZE]
+        n = chunk.shape[0]
+        b = bucket_size(n)
+        if b > n:
+            chunk = np.concatenate([chunk, np.zeros((b - n, chunk.shape[1]), np.float32)])
+        out.append(np.asarray(get_fn(b)(chunk))[:n])
+    if not out:
+        return np.empty((0, out_dim))
+    return np.concatenate(out).astype(float)
+
+def keras_model_paths(family):
+    # forward model, forward scaler, inverse model, inverse scalerX, inverse scalerY
+    return (
+        MODELS_DIR / f"forward_{family}.keras",
+        MODELS_DIR / f"forward_{family}_scaler.save",
+        MODELS_DIR / f"inverse_{family}.keras",
+        MODELS_DIR / f"inverse_{family}_scalerX.save",
+        MODELS_DIR / f"inverse_{family}_scalerY.save",
+    )
+
 class FamilyModels:
     def __init__(self, family):
         self.family = family
@@ -16,14 +80,14 @@ class FamilyModels:
         self.inv_model = None
         self.inv_scalerX = None
         self.inv_scalerY = None
+        self._compiled = {}  # (direction, bucket) -> concrete function
         self.load_models()
 
     def load_models(self):
-        fwd_path = MODELS_DIR / f"forward_{self.family}.keras"
-        fwd_scaler = MODELS_DIR / f"forward_{self.family}_scaler.save"
-        inv_path = MODELS_DIR / f"inverse_{self.family}.keras"
-        inv_scalerX = MODELS_DIR / f"inverse_{self.family}_scalerX.save"
-        inv_scalerY = MODELS_DIR / f"inverse_{self.family}_scalerY.save"
+        # TensorFlow is only imported by the Keras backend
+        from tensorflow.keras.models import load_model
+
+        fwd_path, fwd_scaler, inv_path, inv_scalerX, inv_scalerY = keras_model_paths(self.family)
 
         if fwd_path.exists():
             self.fwd_model = load_model(str(fwd_path))
@@ -36,108 +100,587 @@ class FamilyModels:
             if inv_scalerY.exists():
                 self.inv_scalerY = joblib.load(str(inv_scalerY))
 
+    def _concrete_fn(self, direction, bucket):
+        key = (direction, bucket)
+        if key not in self._compiled:
+            model = self.fwd_model if direction == "forward" else self.inv_model
+            self._compiled[key] = compile_fixed_shape(model, bucket)
+        return self._compiled[key]
+
+    def _run_compiled(self, direction, Xs):
+        model = self.fwd_model if direction == "forward" else self.inv_model
+        return run_bucketed(lambda b: self._concrete_fn(direction, b), Xs, model.output_shape[-1])
+
+    def warmup(self, buckets=INFERENCE_BUCKETS):
+        """
+        Trace every bucket's graph ahead of time.
+        """
+        for b in buckets:
+            if self.fwd_model is not None:
+                self._concrete_fn("forward", b)(np.zeros((b, self.fwd_model.input_shape[-1]), np.float32))
+            if self.inv_model is not None:
+                self._concrete_fn("inverse", b)(np.zeros((b, self.inv_model.input_shape[-1]), np.float32))
+
+    def forward(self, X):
+        """
+        X: (N,5) array in original units
+        returns: (N,2) array of [Fr_GHz, BW_MHz]
+        """
+        if self.fwd_model is None or self.fwd_scaler is None:
+            raise RuntimeError(f"Forward model missing for {self.family}")
+        Xs = self.fwd_scaler.transform(X)
+        return self._run_compiled("forward", Xs)
+
+    def inverse(self, targets):
+        """
+        targets: (N,2) array of [Fr_GHz, BW_MHz]
+        returns: (N,5) array of params in original units
+        """
+        if self.inv_model is None or self.inv_scalerX is None or self.inv_scalerY is None:
+            raise RuntimeError(f"Inverse model missing for {self.family}")
+        Xs = self.inv_scalerX.transform(targets)
+        y_scaled = self._run_compiled("inverse", Xs)
+        return np.asarray(self.inv_scalerY.inverse_transform(y_scaled), dtype=float)
+
+    def forward_loss_grad(self, X, Fr_GHz, BW_MHz):
+        """
+        Exact gradient of target_loss through the scaler and forward model.
+        X: (N,5) array in original units
+        returns: (loss per row, d loss / d X) as NumPy arrays
+        """
+        import tensorflow as tf
+
+        if self.fwd_model is None or self.fwd_scaler is None:
+            raise RuntimeError(f"Forward model missing for {self.family}")
+        x = tf.constant(X, tf.float32)
+        mean = tf.constant(self.fwd_scaler.mean_, tf.float32)
+        scale = tf.constant(self.fwd_scaler.scale_, tf.float32)
+        with tf.GradientTape() as tape:
+            tape.watch(x)
+            y = self.fwd_model((x - mean) / scale, training=False)
+            loss_rows = target_loss(y, Fr_GHz, BW_MHz)
+            loss = tf.reduce_sum(loss_rows)
+        g = tape.gradient(loss, x)
+        return loss_rows.numpy().astype(float), g.numpy().astype(float)
+
 class AICoreManager:
     """
     High-level wrapper. Instantiate once, call set_family() to switch.
     """
-    def __init__(self):
-        self.family_models = {}
+    def __init__(
+            self,
+            backend=INFERENCE_BACKEND,
+            max_families=MODEL_CACHE_MAX_FAMILIES,
+            max_mb=MODEL_CACHE_MAX_MB,
+            pinned=MODEL_CACHE_PINNED,
+            preload=None,
+            result_cache=None
+    ):
+        """
+        backend: one of INFERENCE_BACKENDS
+        max_families / max_mb: LRU budget for loaded families (None = unbounded)
+        pinned: families never evicted
+        preload: families to load on a background thread right away
+        result_cache: ResultCache for optimize_parameters / ParameterEngine.predict
+                      (default: one built from the RESULT_CACHE_* settings, None if size is 0)
+        """
+        if backend not in INFERENCE_BACKENDS:
+            raise ValueError("Unknown inference backend: " + str(backend))
+        self.backend = backend
+        self._multi = None  # shared MultiFamilyModels for backend="multi"
+        self._multi_lock = threading.Lock()
+        self.family_models = FamilyRegistry(
+            self._load_family,
+            max_families=max_families,
+            max_bytes=None if max_mb is None else int(max_mb * 1024 * 1024),
+            pinned=pinned,
+        )
         self.current = None
+        if result_cache is None and RESULT_CACHE_SIZE:
+            result_cache = ResultCache(
+                max_entries=RESULT_CACHE_SIZE,
+                ttl=RESULT_CACHE_TTL,
+                fr_resolution=RESULT_CACHE_FR_RES_GHZ,
+                bw_resolution=RESULT_CACHE_BW_RES_MHZ,
+                path=RESULT_CACHE_PATH,
+            )
+        self.result_cache = result_cache
+        self._surrogate_indexes = {}
+        if preload:
+            self.preload(preload)
+
+    def _load_family(self, family):
+        if self.backend == "numpy":
+            return NumpyFamilyModels(family)
+        if self.backend == "multi":
+            return MultiFamilyView(self._shared_models(), family)
+        return FamilyModels(family)
+
+    def _shared_models(self):
+        # the single forward/inverse network pair of backend="multi", loaded once
+        with self._multi_lock:
+            if self._multi is None:
+                self._multi = MultiFamilyModels()
+            return self._multi
+
+    def model_paths(self, family, direction=None):
+        # files the loaded models for family are built from ("forward", "inverse" or both)
+        if self.backend == "numpy":
+            paths = {"forward": [forward_npz_path(family)], "inverse": [inverse_npz_path(family)]}
+        elif self.backend == "multi":
+            paths = {"forward": [MULTI_FORWARD_PATH, MULTI_SCALERS_PATH],
+                     "inverse": [MULTI_INVERSE_PATH, MULTI_SCALERS_PATH]}
+        else:
+            fwd, fwd_sc, inv, inv_scX, inv_scY = keras_model_paths(family)
+            paths = {"forward": [fwd, fwd_sc], "inverse": [inv, inv_scX, inv_scY]}
+        if direction is None:
+            return paths["forward"] + paths["inverse"]
+        return paths[direction]
+
+    def model_fingerprint(self, family, extra_paths=()):
+        # cache-invalidation fingerprint of the model files (plus extra_paths)
+        return file_fingerprint(self.model_paths(family) + list(extra_paths))
+
+    def surrogate_index(self, family):
+        """
+        Precomputed forward-response index for family (built on first use,
+        rebuilt when the forward model files change).
+        """
+        fingerprint = file_fingerprint(self.model_paths(family, "forward"))
+        entry = self._surrogate_indexes.get(family)
+        if entry is None or entry[1] != fingerprint:
+            entry = (load_or_build_index(self, family), fingerprint)
+            self._surrogate_indexes[family] = entry
+        return entry[0]
+
+    def nearest_designs(self, family, Fr_GHz, BW_MHz, k=8):
+        """
+        Fast inverse lookup: the k indexed designs whose forward prediction is closest to the target.
+        returns: (params (k,5), predicted [Fr_GHz, BW_MHz] (k,2), loss (k,))
+        """
+        if family not in FAMILIES:
+            raise ValueError("Unknown family: " + family)
+        return self.surrogate_index(family).query(Fr_GHz, BW_MHz, k=k)
 
     def ensure_family(self, family):
         if family not in FAMILIES:
             raise ValueError("Unknown family: " + family)
-        if family not in self.family_models:
-            self.family_models[family] = FamilyModels(family)
-        self.current = self.family_models[family]
+        self.current = self.family_models.get(family)
         return self.current
 
+    def preload(self, families=FAMILIES, background=True):
+        """
+        Load families ahead of use (on a background thread by default).
+        """
+        for fam in families:
+            if fam not in FAMILIES:
+                raise ValueError("Unknown family: " + fam)
+        return self.family_models.preload(list(families), background=background)
+
+    def pin(self, family):
+        self.family_models.pin(family)
+
+    def unpin(self, family):
+        self.family_models.unpin(family)
+
+    def warmup(self, families=FAMILIES, buckets=INFERENCE_BUCKETS):
+        """
+        Load each family, compile its inference graphs for every bucket size,
+        and time a single-row forward + inverse call before and after.
+        returns: {family: {'load_s', 'cold_s', 'compile_s', 'warm_s'}} (or {'error': str})
+        """
+        probe = np.array([[2.4, 100.0]])
+        report = {}
+        for fam in families:
+            try:
+                t0 = time.perf_counter()
+                fm = self.ensure_family(fam)
+                t1 = time.perf_counter()
+                fm.forward(fm.inverse(probe))
+                t2 = time.perf_counter()
+                if hasattr(fm, "warmup"):
+                    fm.warmup(buckets)
+                t3 = time.perf_counter()
+                fm.forward(fm.inverse(probe))
+                t4 = time.perf_counter()
+                report[fam] = {'load_s': t1 - t0, 'cold_s': t2 - t1, 'compile_s': t3 - t2, 'warm_s': t4 - t3}
+            except Exception as e:
+                report[fam] = {'error': str(e)}
+        return report
+
+    def model_cache_stats(self):
+        """
+        returns: dict of hits / misses / loads / evictions / load_time and cache contents
+        """
+        return self.family_models.stats()
+
+    def _group_families(self, family, n):
+        # Map a single family name or a per-row sequence to {family: row indices}
+        if isinstance(family, str):
+            return {family: np.arange(n)}
+        families = np.asarray(family)
+        if families.shape != (n,):
+            raise ValueError(f"Expected {n} family names, got shape {families.shape}")
+        return {str(f): np.flatnonzero(families == f) for f in np.unique(families)}
+
+    def _row_families(self, family, n):
+        # per-row family names (the shared multi-family model takes a mixed batch as is)
+        if isinstance(family, str):
+            return [family]*n
+        if len(family) != n:
+            raise ValueError(f"Expected {n} family names, got {len(family)}")
+        return list(family)
+
+    def predict_forward_batch(self, family, X):
+        """
+        family: family name, or sequence of N family names (mixed batches are grouped)
+        X: (N,5) array of param_a, param_b, feed_width, substrate_h, eps_r
+        returns: (N,2) array of [Fr_GHz, BW_MHz]
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        if self.backend == "multi":
+            return self._shared_models().forward(self._row_families(family, X.shape[0]), X)
+        out = np.empty((X.shape[0], 2), dtype=float)
+        for fam, idx in self._group_families(family, X.shape[0]).items():
+            out[idx] = self.ensure_family(fam).forward(X[idx])
+        return out
+
+    def predict_inverse_batch(self, family, targets):
+        """
+        family: family name, or sequence of N family names (mixed batches are grouped)
+        targets: (N,2) array of [Fr_GHz, BW_MHz]
+        returns: (N,5) array of params in original units
+        """
+        targets = np.atleast_2d(np.asarray(targets, dtype=float))
+        if self.backend == "multi":
+            return self._shared_models().inverse(self._row_families(family, targets.shape[0]), targets)
+        out = np.empty((targets.shape[0], 5), dtype=float)
+        for fam, idx in self._group_families(family, targets.shape[0]).items():
+            out[idx] = self.ensure_family(fam).inverse(targets[idx])
+        return out
+
     def predict_forward(self, family, params):
         """
         params: list/array of 5 floats: param_a, param_b, feed_width, substrate_h, eps_r
         returns: (Fr_GHz, BW_MHz)
         """
-        fm = self.ensure_family(family)
-        if fm.fwd_model is None or fm.fwd_scaler is None:
-            raise RuntimeError(f"Forward model missing for {family}")
-        X = np.array(params).reshape(1, -1)
-        Xs = fm.fwd_scaler.transform(X)
-        y = fm.fwd_model.predict(Xs)[0]
+        y = self.predict_forward_batch(family, [params])[0]
         return float(y[0]), float(y[1])
 
     def predict_inverse(self, family, Fr_GHz, BW_MHz):
         """
         returns: params vector in original units [param_a, param_b, feed_width, substrate_h, eps_r]
         """
-        fm = self.ensure_family(family)
-        if fm.inv_model is None or fm.inv_scalerX is None or fm.inv_scalerY is None:
-            raise RuntimeError(f"Inverse model missing for {family}")
-        X = np.array([[Fr_GHz, BW_MHz]])
-        Xs = fm.inv_scalerX.transform(X)
-        y_scaled = fm.inv_model.predict(Xs)[0]
-        y = fm.inv_scalerY.inverse_transform(y_scaled.reshape(1, -1))[0]
+        y = self.predict_inverse_batch(family, [[Fr_GHz, BW_MHz]])[0]
         return [float(v) for v in y]
 
-    def optimize_parameters(self, family, Fr_GHz, BW_MHz, bounds=None, x0=None):
+    def _gradient_descent(self, family, Fr_GHz, BW_MHz, lo, hi, starts, steps, lr):
+        """
+        Projected Adam on the Fr/BW loss, with exact gradients taken through
+        the forward model. All starts run as one (S,5) batch per step.
+        starts: (S,5) array inside [lo, hi]
+        returns: (best_X, best_loss) per start
+        """
+        fm = self.ensure_family(family)
+
+        # optimize in the unit box so all dimensions share one step size
+        span = hi - lo
+        u = (starts - lo) / np.where(hi > lo, span, 1.0)
+        m = np.zeros_like(u)
+        v = np.zeros_like(u)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+
+        best_u = u.copy()
+        best_loss = np.full(starts.shape[0], np.inf)
+        for t in range(1, steps + 1):
+            loss_rows, gX = fm.forward_loss_grad(lo + u*span, Fr_GHz, BW_MHz)
+            g = gX*span
+
+            # keep the best point seen by each start (loss is evaluated before the step)
+            improved = loss_rows < best_loss
+            best_loss[improved] = loss_rows[improved]
+            best_u[improved] = u[improved]
+
+            m = beta1*m + (1 - beta1)*g
+            v = beta2*v + (1 - beta2)*g**2
+            m_hat = m / (1 - beta1**t)
+            v_hat = v / (1 - beta2**t)
+            u = np.clip(u - lr*m_hat / (np.sqrt(v_hat) + eps), 0.0, 1.0)
+
+        return lo + best_u*span, best_loss
+
+    def optimize_parameters(self, family, Fr_GHz, BW_MHz, bounds=None, x0=None,
+                            method="powell", popsize=15, maxiter=None, seed=RANDOM_SEED,
+                            n_starts=64, lr=0.05, index_seeds=0):
         """
         Light-weight optimizer that refines inverse prediction using forward model.
         - bounds: list of (min,max) for the continuous optimization parameters (length <=5)
         - x0: initial guess (list)
-        Returns dict: {'params': final_params, 'fun': value, 'success': bool}
+        - method: one of OPTIMIZER_METHODS
+            'powell' : scipy Powell, one forward call per objective evaluation
+            'de'     : differential evolution, the whole population is scored
+                       in one forward batch per generation
+            'gradient' : multi-start projected gradient descent with exact
+                       gradients through the forward model
+        - popsize: DE population multiplier (population = popsize * free dims)
+        - maxiter: iteration / generation / gradient step limit
+                   (default 1000 for Powell, 100 for DE, 40 for gradient)
+        - n_starts: gradient starts (the inverse guess plus random points in bounds)
+        - lr: gradient step size in units of the bound width
+        - index_seeds: nearest surrogate-index designs used as extra starts
+                       (gradient) or as the start point when they beat the
+                       inverse guess (powell / de); 0 disables
+        Returns dict: {'params': final_params, 'fun': value, 'success': bool, 'cached': bool,
+                       'method': str, 'nfev': int, 'nbatches': int, 'wall_time': float}
+        'gradient' also returns 'local_optima': [{'params', 'fun'}, ...] sorted by fun
         """
-        fm = self.ensure_family(family)
+        if method not in OPTIMIZER_METHODS:
+            raise ValueError(f"Unknown optimizer method: {method}")
+        t_start = time.perf_counter()
+        self.ensure_family(family)
+
+        cache_key, fingerprint, cached = self._cached_optimize(
+            family, Fr_GHz, BW_MHz, bounds, x0, method, popsize, maxiter, seed, n_starts, lr, index_seeds
+        )
+        if cached is not None:
+            cached['wall_time'] = time.perf_counter() - t_start
+            return cached
+        result = self._optimize(family, Fr_GHz, BW_MHz, bounds, x0, method, popsize,
+                                maxiter, seed, n_starts, lr, index_seeds, t_start)
+        if cache_key is not None and result.get('success'):
+            self.result_cache.put(cache_key, result, fingerprint)
+        result['cached'] = False
+        return result
+
+    def _cached_optimize(self, family, Fr_GHz, BW_MHz, bounds=None, x0=None, method="powell",
+                         popsize=15, maxiter=None, seed=RANDOM_SEED, n_starts=64, lr=0.05, index_seeds=0):
+        # only default-bounds / default-start runs are cached (keyed on the quantized target)
+        # returns (key, fingerprint, cached result or None); key is None when not cacheable
+        if self.result_cache is None or bounds is not None or x0 is not None:
+            return None, None, None
+        cache_key = self.result_cache.key(
+            "optimize", family, Fr_GHz, BW_MHz, method, popsize, maxiter, seed, n_starts, lr, index_seeds
+        )
+        fingerprint = self.model_fingerprint(family)
+        cached = self.result_cache.get(cache_key, fingerprint)
+        if cached is not None:
+            cached['cached'] = True
+        return cache_key, fingerprint, cached
+
+    def optimize_many(self, targets, workers=None, **kwargs):
+        """
+        Optimize many targets in parallel; a generator yielding results as they finish.
+        - targets: iterable of (family, Fr_GHz, BW_MHz) tuples, or dicts with
+                   'family', 'Fr_GHz', 'BW_MHz' and optional per-target
+                   optimize_parameters arguments overriding kwargs
+        - workers: worker processes (default: CPU count); <= 1 runs in this process
+        - kwargs: optimize_parameters arguments shared by every target
+        Each worker builds one AICoreManager (same backend) and keeps its models
+        loaded for every target it handles. Cache hits are answered here without
+        a worker. Yields dicts:
+            {'index': position in targets, 'family', 'Fr_GHz', 'BW_MHz',
+             'result': optimize_parameters dict or None, 'error': str or None}
+        A failing target only sets its own 'error'.
+        """
+        jobs = [_target_job(i, t, kwargs) for i, t in enumerate(targets)]
+        workers = (os.cpu_count() or 1) if workers is None else int(workers)
+
+        pending = []
+        for job in jobs:
+            index, family, Fr_GHz, BW_MHz, opts = job
+            try:
+                _, _, cached = self._cached_optimize(family, Fr_GHz, BW_MHz, **opts)
+            except Exception:
+                cached = None
+            if cached is not None:
+                yield self._store_many_result(_target_result(job, cached, None), store=False)
+            else:
+                pending.append(job)
+
+        if workers <= 1 or len(pending) <= 1:
+            for job in pending:
+                yield self._store_many_result(_run_target(self, job), store=False)
+            return
+
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        # spawn, not fork: a forked TensorFlow runtime is not safe to reuse
+        with ProcessPoolExecutor(
+                max_workers=min(workers, len(pending)),
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_optimize_worker,
+                initargs=(self.backend,),
+        ) as pool:
+            futures = {pool.submit(_optimize_worker, job): job for job in pending}
+            for fut in as_completed(futures):
+                try:
+                    out = fut.result()
+                except Exception as e:  # worker died (e.g. out of memory)
+                    out = _target_result(futures[fut], None, f"{type(e).__name__}: {e}")
+                yield self._store_many_result(out)
+
+    def _store_many_result(self, out, store=True):
+        # put successful worker results into this manager's result cache
+        opts = out.pop('_opts')
+        if store and out['result'] is not None and out['result'].get('success'):
+            try:
+                key, fingerprint, _ = self._cached_optimize(out['family'], out['Fr_GHz'], out['BW_MHz'], **opts)
+                if key is not None:
+                    self.result_cache.put(key, out['result'], fingerprint)
+            except Exception:
+                pass
+        return out
 
+    def _optimize(self, family, Fr_GHz, BW_MHz, bounds, x0, method, popsize,
+                  maxiter, seed, n_starts, lr, index_seeds, t_start):
         # initial guess from inverse model
         try:
             pred = self.predict_inverse(family, Fr_GHz, BW_MHz)
         except Exception:
             pred = [0]*5
 
+        seeds = np.empty((0, 5))
+        if index_seeds and x0 is None:
+            seeds, _, seed_loss = self.nearest_designs(family, Fr_GHz, BW_MHz, k=index_seeds)
+            if method != "gradient":
+                # start from the nearest indexed design when it beats the inverse guess
+                try:
+                    pred_loss = float(target_loss(self.predict_forward_batch(family, [pred]), Fr_GHz, BW_MHz)[0])
+                except Exception:
+                    pred_loss = np.inf
+                if seed_loss[0] < pred_loss:
+                    pred = [float(v) for v in seeds[0]]
+
         if x0 is None:
             x0 = pred
 
-        # reduce to continuous variables only (we'll optimize the 5-vector directly)
         if bounds is None:
-            # use generic bounds from ai_config
-            if family.startswith("patch"):
-                bounds = [PATCH_W_RANGE, PATCH_L_RANGE, FEED_W_RANGE, (0.0005, 0.003), (2.0, 10.0)]
-            elif family == "monopole":
-                bounds = [MONOPOLE_LENGTH_RANGE, MONOPOLE_WIDTH_RANGE, (0,0), (0.0005,0.003), (2,10)]
-            elif family == "dipole":
-                bounds = [DIPOLE_LENGTH_RANGE, DIPOLE_WIDTH_RANGE, (0,0), (0.0005,0.003), (2,10)]
-            else:
-                bounds = [(1e-4, 0.2)]*5
-
-        def objective(x):
-            # ensure length 5
-            x_full = list(x) + [0]*(5-len(x))
-            try:
-                f_pred, bw_pred = self.predict_forward(family, x_full)
-            except Exception:
-                # penalize heavily if forward model missing
-                return 1e6
-            # Weighted error: freq error in GHz normalized by ~1 GHz, BW in MHz normalized by 100 MHz
-            return (f_pred - Fr_GHz)**2 + 0.001*(bw_pred - BW_MHz)**2
+            bounds = param_schema.bounds(family)
+        bounds = list(bounds) + [(0, 0)]*(5-len(bounds))
 
         # only optimize continuous subset where bounds are not zero-length
+        free = np.array([b[0] != b[1] for b in bounds])
+        lo = np.array([b[0] for b in bounds], dtype=float)
         var_bounds = [b for b in bounds if b[0] != b[1]]
-        x0_var = [x0[i] for i,b in enumerate(bounds) if b[0] != b[1]]
+        x0_var = [x0[i] for i in np.flatnonzero(free)]
+
+        counts = {'nfev': 0, 'nbatches': 0}
+
+        def expand(X_var):
+            # (N, n_free) -> (N, 5) with fixed dimensions filled in
+            X = np.tile(lo, (X_var.shape[0], 1))
+            X[:, free] = X_var
+            return X
+
+        def objective_batch(X_var):
+            y = self.predict_forward_batch(family, expand(X_var))
+            counts['nfev'] += X_var.shape[0]
+            counts['nbatches'] += 1
+            return target_loss(y, Fr_GHz, BW_MHz)
+
+        if method == "gradient":
+            return self._optimize_gradient(family, Fr_GHz, BW_MHz, bounds, x0, seed,
+                                           n_starts, 40 if maxiter is None else maxiter,
+                                           lr, seeds, t_start)
+
         try:
-            res = opt.minimize(objective, x0_var, bounds=var_bounds, method='Powell', options={'maxiter':1000})
+            if method == "de":
+                x0_var = np.clip(x0_var, [b[0] for b in var_bounds], [b[1] for b in var_bounds])
+                res = opt.differential_evolution(
+                    lambda X: objective_batch(np.asarray(X).T),
+                    var_bounds, x0=x0_var, popsize=popsize,
+                    maxiter=100 if maxiter is None else maxiter,
+                    seed=seed, polish=False, vectorized=True, updating='deferred'
+                )
+            else:
+                res = opt.minimize(
+                    lambda x: float(objective_batch(np.asarray(x).reshape(1, -1))[0]),
+                    x0_var, bounds=var_bounds, method='Powell',
+                    options={'maxiter': 1000 if maxiter is None else maxiter}
+                )
         except Exception as e:
-            return {'success': False, 'error': str(e), 'params': x0}
+            return {'success': False, 'error': str(e), 'params': x0, 'method': method,
+                    **counts, 'wall_time': time.perf_counter() - t_start}
 
         # reconstruct final vector
-        final = []
-        vi = 0
-        for i,b in enumerate(bounds):
-            if b[0] != b[1]:
-                final.append(float(res.x[vi] if vi < len(res.x) else x0[i]))
-                vi += 1
-            else:
-                final.append(float(b[0]))
+        final = [float(v) for v in expand(np.atleast_2d(res.x))[0]]
+
+        return {'success': bool(res.success), 'fun': float(res.fun), 'params': final,
+                'method': method, **counts, 'wall_time': time.perf_counter() - t_start}
+
+    def _optimize_gradient(self, family, Fr_GHz, BW_MHz, bounds, x0, seed, n_starts, steps, lr, seeds, t_start):
+        lo = np.array([b[0] for b in bounds], dtype=float)
+        hi = np.array([b[1] for b in bounds], dtype=float)
+        rng = np.random.default_rng(seed)
+        starts = lo + rng.random((max(int(n_starts), 1 + len(seeds)), 5))*(hi - lo)
+        starts[0] = np.clip(np.asarray(x0, dtype=float), lo, hi)
+        starts[1:1 + len(seeds)] = np.clip(seeds, lo, hi)
+
+        try:
+            X, losses = self._gradient_descent(family, Fr_GHz, BW_MHz, lo, hi, starts, steps, lr)
+        except Exception as e:
+            return {'success': False, 'error': str(e), 'params': list(x0), 'method': 'gradient',
+                    'nfev': 0, 'nbatches': 0, 'wall_time': time.perf_counter() - t_start}
+
+        # collapse starts that converged to the same optimum (1e-3 of the bound width)
+        span = np.where(hi > lo, hi - lo, 1.0)
+        local_optima = []
+        kept = []
+        for i in np.argsort(losses):
+            u = (X[i] - lo) / span
+            if any(np.max(np.abs(u - k)) < 1e-3 for k in kept):
+                continue
+            kept.append(u)
+            local_optima.append({'params': [float(v) for v in X[i]], 'fun': float(losses[i])})
+
+        best = local_optima[0]
+        return {'success': bool(np.isfinite(best['fun'])), 'fun': best['fun'], 'params': best['params'],
+                'method': 'gradient', 'nfev': steps*starts.shape[0], 'nbatches': steps,
+                'wall_time': time.perf_counter() - t_start, 'local_optima': local_optima}
+
+
+#--- optimize_many workers (module level so spawned processes can import them)
+
+_WORKER_MGR = None
+
+def _init_optimize_worker(backend):
+    global _WORKER_MGR
+    if backend != "numpy":
+        # one worker per core: keep TensorFlow from also spreading each call over every core
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(1)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+    _WORKER_MGR = AICoreManager(backend=backend)
+    _WORKER_MGR.result_cache = None  # results are cached by the parent manager
+
+def _optimize_worker(job):
+    return _run_target(_WORKER_MGR, job)
+
+def _target_job(index, target, shared):
+    if isinstance(target, dict):
+        target = dict(target)
+        family, Fr_GHz, BW_MHz = target.pop('family'), target.pop('Fr_GHz'), target.pop('BW_MHz')
+        opts = {**shared, **target}
+    else:
+        family, Fr_GHz, BW_MHz = target
+        opts = dict(shared)
+    return index, family, float(Fr_GHz), float(BW_MHz), opts
+
+def _target_result(job, result, error):
+    index, family, Fr_GHz, BW_MHz, opts = job
+    return {'index': index, 'family': family, 'Fr_GHz': Fr_GHz, 'BW_MHz': BW_MHz,
+            'result': result, 'error': error, '_opts': opts}
+
+def _run_target(mgr, job):
+    index, family, Fr_GHz, BW_MHz, opts = job
+    try:
+        result = mgr.optimize_parameters(family, Fr_GHz, BW_MHz, **opts)
+    except Exception as e:
+        return _target_result(job, None, f"{type(e).__name__}: {e}")
+    return _target_result(job, result, result.get('error'))
+
 
-        return {'success': res.success, 'fun': float(res.fun), 'params': final}
 '''
 
 from ai_core.ai_core_manager import AICoreManager
@@ -145,4 +688,9 @@ ai_mgr = AICoreManager()
 params = ai_mgr.predict_inverse("patch_rect", 2.4, 100)          # inverse suggestion
 fwd = ai_mgr.predict_forward("patch_rect", params)             # forward estimate
 opt = ai_mgr.optimize_parameters("patch_rect", 2.4, 100)  
-'''
\ No newline at end of file
+opt_de = ai_mgr.optimize_parameters("patch_rect", 2.4, 100, method="de")  # population optimizer
+opt_grad = ai_mgr.optimize_parameters("patch_rect", 2.4, 100, method="gradient")  # multi-start gradient
+fwd_many = ai_mgr.predict_forward_batch(["patch_rect", "dipole"], [params, params])  # (2,2) array
+for r in ai_mgr.optimize_many([("patch_rect", 2.4, 100), ("dipole", 0.9, 50)], method="de"):  # parallel, as they finish
+    print(r['index'], r['error'] or r['result']['fun'])
+'''
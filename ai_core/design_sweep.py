@@ -0,0 +1,215 @@
+# ai_core/design_sweep.py
+"""
+Chunked forward-model sweeps of a family's design space.
+
+The grid is the Cartesian product of per-dimension axes (linspace over the
+optimizer bounds; fixed dimensions are a single value, substrate h and eps_r
+default to DEFAULT_SUBSTRATE_H / DEFAULT_EPS_R). It is never materialized:
+chunk i covers flat indices [i*chunk_rows, (i+1)*chunk_rows) and its
+parameters come from np.unravel_index over the axes. Each chunk's [Fr_GHz,
+BW_MHz] rows go into a float32 .npy memmap, and manifest.json records the
+finished chunks so an interrupted sweep resumes where it stopped.
+
+    sweeps/<family>/response.npy    (N,2) float32, row order = C order of the grid
+    sweeps/<family>/manifest.json   axes, shape, chunk_rows, done chunks, model digest
+
+    python -m ai_core.design_sweep run <family> [points_per_dim] [chunk_rows]
+    python -m ai_core.design_sweep info <family>
+"""
+import json
+import os
+import sys
+import time
+import numpy as np
+from pathlib import Path
+from ai_core.ai_config import *
+from ai_core import param_schema
+from ai_core.surrogate_index import model_digest, BW_METRIC_SCALE
+
+SWEEP_DIR = Path(SWEEP_DIR)
+PARAM_NAMES = ('param_a', 'param_b', 'feed_width_m', 'substrate_h', 'eps_r')
+
+def sweep_dir(family):
+    return SWEEP_DIR / family
+
+def sweep_axes(family, points_per_dim=SWEEP_POINTS_PER_DIM, bounds=None):
+    """
+    Per-dimension grid axes. points_per_dim: int or one count per dimension.
+    bounds: 5 (min,max) pairs (default: optimizer bounds with h / eps_r at the defaults)
+    """
+    if bounds is None:
+        bounds = list(param_schema.bounds(family))
+        bounds[3] = (DEFAULT_SUBSTRATE_H, DEFAULT_SUBSTRATE_H)
+        bounds[4] = (DEFAULT_EPS_R, DEFAULT_EPS_R)
+    counts = np.broadcast_to(np.asarray(points_per_dim, dtype=int), (5,))
+    return [np.array([float(lo)]) if lo == hi else np.linspace(lo, hi, int(n))
+            for (lo, hi), n in zip(bounds, counts)]
+
+def grid_params(axes, start, stop):
+    """
+    (stop-start, 5) parameters for flat grid indices [start, stop).
+    """
+    shape = tuple(len(a) for a in axes)
+    idx = np.unravel_index(np.arange(start, stop), shape)
+    return np.column_stack([a[i] for a, i in zip(axes, idx)])
+
+def _write_manifest(path, manifest):
+    tmp = Path(str(path) + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1))
+    os.replace(tmp, path)
+
+
+def run_sweep(ai_mgr, family, points_per_dim=SWEEP_POINTS_PER_DIM, chunk_rows=SWEEP_CHUNK_ROWS,
+              bounds=None, out_dir=None, restart=False):
+    """
+    Sweep family's grid chunk by chunk, resuming from the manifest when the
+    grid, chunking and forward model are unchanged (otherwise starting over).
+    returns: DesignSweep over the finished file
+    """
+    out_dir = Path(out_dir) if out_dir is not None else sweep_dir(family)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / "manifest.json"
+    response_path = out_dir / "response.npy"
+
+    axes = sweep_axes(family, points_per_dim, bounds)
+    shape = [len(a) for a in axes]
+    total = int(np.prod(shape))
+    chunk_rows = int(chunk_rows)
+    n_chunks = -(-total // chunk_rows)
+    digest = model_digest(ai_mgr.model_paths(family, "forward"), [(a[0], a[-1]) for a in axes], total)
+    config = {
+        "family": family, "shape": shape, "axes": [a.tolist() for a in axes],
+        "chunk_rows": chunk_rows, "n_chunks": n_chunks, "digest": digest,
+    }
+
+    done = set()
+    if not restart and manifest_path.exists() and response_path.exists():
+        try:
+            old = json.loads(manifest_path.read_text())
+            if {k: old.get(k) for k in config} == config:
+                done = set(old.get("done", []))
+        except ValueError:
+            pass
+    if done:
+        out = np.load(str(response_path), mmap_mode='r+')
+    else:
+        out = np.lib.format.open_memmap(str(response_path), mode='w+', dtype=np.float32, shape=(total, 2))
+    manifest = {**config, "done": sorted(done)}
+    _write_manifest(manifest_path, manifest)
+
+    todo = [c for c in range(n_chunks) if c not in done]
+    print(f"[sweep] {family}: {total} points in {n_chunks} chunks, {len(todo)} to run")
+    t0 = time.perf_counter()
+    written = 0
+    for c in todo:
+        start, stop = c*chunk_rows, min((c + 1)*chunk_rows, total)
+        X = grid_params(axes, start, stop)
+        for i in range(0, X.shape[0], INFERENCE_BATCH_SIZE):
+            block = X[i:i + INFERENCE_BATCH_SIZE]
+            out[start + i:start + i + len(block)] = ai_mgr.predict_forward_batch(family, block)
+        out.flush()  # data on disk before the chunk is marked done
+        done.add(c)
+        manifest["done"] = sorted(done)
+        _write_manifest(manifest_path, manifest)
+        written += stop - start
+        rate = written / max(time.perf_counter() - t0, 1e-9)
+        print(f"[sweep] {family}: chunk {c+1}/{n_chunks} ({rate:,.0f} points/s)")
+    del out
+    return DesignSweep(out_dir)
+
+
+class DesignSweep:
+    """
+    Read-only view of a finished (or partial) sweep; responses stay memory-mapped.
+    """
+    def __init__(self, path):
+        path = Path(path)
+        self.manifest = json.loads((path / "manifest.json").read_text())
+        self.family = self.manifest["family"]
+        self.axes = [np.asarray(a) for a in self.manifest["axes"]]
+        self.shape = tuple(self.manifest["shape"])
+        self.response = np.load(str(path / "response.npy"), mmap_mode='r')
+
+    def __len__(self):
+        return self.response.shape[0]
+
+    @property
+    def complete(self):
+        return len(self.manifest["done"]) == self.manifest["n_chunks"]
+
+    def computed_ranges(self):
+        # [(start, stop)] row ranges of the finished chunks; other rows are unwritten zeros
+        rows, n = int(self.manifest["chunk_rows"]), len(self)
+        return [(c*rows, min((c + 1)*rows, n)) for c in sorted(self.manifest["done"])]
+
+    @property
+    def computed(self):
+        """
+        (N,) bool mask of the rows whose response has been computed.
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        for start, stop in self.computed_ranges():
+            mask[start:stop] = True
+        return mask
+
+    def params(self, idx):
+        """
+        Parameters of flat grid indices idx -> (len(idx),5)
+        """
+        idx = np.unravel_index(np.asarray(idx, dtype=np.int64), self.shape)
+        return np.column_stack([a[i] for a, i in zip(self.axes, idx)])
+
+    def surface(self, **fixed):
+        """
+        Response over the varying axes with some dimensions held at a grid index,
+        e.g. surface(feed_width_m=3) -> (len(axis a), len(axis b), 1, 1, 1, 2) view.
+        """
+        grid = self.response.reshape(self.shape + (2,))
+        sl = [slice(None)]*5
+        for name, i in fixed.items():
+            d = PARAM_NAMES.index(name)
+            sl[d] = slice(int(i), int(i) + 1)
+        return grid[tuple(sl)]
+
+    def nearest(self, Fr_GHz, BW_MHz, k=8, block_rows=SWEEP_CHUNK_ROWS):
+        """
+        k grid designs closest to the target in the optimizer loss metric,
+        scanning the computed rows of the memmap block by block (a partial
+        or resumed sweep only searches its finished chunks).
+        returns: (params (k,5), responses (k,2), loss (k,)) nearest first
+        """
+        ranges = self.computed_ranges()
+        if not ranges:
+            raise RuntimeError(f"Sweep of {self.family} has no computed chunks yet")
+        blocks = [(a, min(a + int(block_rows), stop)) for lo, stop in ranges
+                  for a in range(lo, stop, int(block_rows))]
+        best_idx = np.empty(0, dtype=np.int64)
+        best_loss = np.empty(0)
+        for start, stop in blocks:
+            Y = np.asarray(self.response[start:stop], dtype=float)
+            loss = (Y[:, 0] - Fr_GHz)**2 + ((Y[:, 1] - BW_MHz)*BW_METRIC_SCALE)**2
+            loss = np.where(np.isfinite(loss), loss, np.inf)
+            take = np.argpartition(loss, min(k, len(loss)) - 1)[:k]
+            best_idx = np.concatenate([best_idx, take + start])
+            best_loss = np.concatenate([best_loss, loss[take]])
+            keep = np.argsort(best_loss)[:k]
+            best_idx, best_loss = best_idx[keep], best_loss[keep]
+        return self.params(best_idx), np.asarray(self.response[best_idx], dtype=float), best_loss
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 2 else None
+    if cmd == "run":
+        from ai_core.ai_core_manager import AICoreManager
+
+        points = int(sys.argv[3]) if len(sys.argv) > 3 else SWEEP_POINTS_PER_DIM
+        chunk = int(sys.argv[4]) if len(sys.argv) > 4 else SWEEP_CHUNK_ROWS
+        run_sweep(AICoreManager(), sys.argv[2], points, chunk)
+    elif cmd == "info":
+        sw = DesignSweep(sweep_dir(sys.argv[2]))
+        print(f"{sw.family}: grid {sw.shape}, {len(sw)} points, "
+              f"{len(sw.manifest['done'])}/{sw.manifest['n_chunks']} chunks done")
+    else:
+        print("usage: python -m ai_core.design_sweep run <family> [points_per_dim] [chunk_rows]\n"
+              "       python -m ai_core.design_sweep info <family>")
+        sys.exit(1)
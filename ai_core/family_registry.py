@@ -0,0 +1,176 @@
+# ai_core/family_registry.py
+"""
+Bounded, thread-safe cache of loaded per-family models.
+
+AICoreManager keeps its FamilyModels here instead of a plain dict. The cache
+holds at most max_families entries and/or max_bytes of model weights and
+evicts the least recently used family first. Pinned families are never
+evicted. preload() loads families on a background thread so the first
+request for them does not wait on disk I/O.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def model_nbytes(fm):
+    # approximate weight memory of a FamilyModels / NumpyFamilyModels entry
+    total = 0
+    for model in (getattr(fm, "fwd_model", None), getattr(fm, "inv_model", None)):
+        if model is None:
+            continue
+        if hasattr(model, "nbytes"):
+            total += int(model.nbytes)
+        else:
+            total += 4 * int(model.count_params())  # float32 Keras weights
+    return total
+
+
+class FamilyRegistry:
+    def __init__(self, loader, max_families=None, max_bytes=None, pinned=()):
+        """
+        loader: callable(family) -> loaded family models
+        max_families: max number of cached families (None = unbounded)
+        max_bytes: max approximate weight memory (None = unbounded)
+        pinned: families that are never evicted
+        """
+        self._loader = loader
+        self.max_families = max_families
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # family -> (models, nbytes), oldest first
+        self._pinned = set(pinned)
+        self._loading = {}  # family -> threading.Event for loads in flight
+        self._lock = threading.RLock()
+        self._counters = {"hits": 0, "misses": 0, "loads": 0, "load_errors": 0,
+                          "evictions": 0, "load_time": 0.0}
+
+    # -------------------------
+    # dict-style access
+    # -------------------------
+
+    def __contains__(self, family):
+        with self._lock:
+            return family in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    # -------------------------
+    # Loading / eviction
+    # -------------------------
+
+    def get(self, family):
+        """
+        Return the models for family, loading them (once) on a miss.
+        """
+        while True:
+            with self._lock:
+                if family in self._entries:
+                    self._entries.move_to_end(family)
+                    self._counters["hits"] += 1
+                    return self._entries[family][0]
+                event = self._loading.get(family)
+                if event is None:
+                    self._counters["misses"] += 1
+                    event = self._loading[family] = threading.Event()
+                    break
+            # another thread (e.g. preload) is loading it, wait and retry
+            event.wait()
+        return self._load(family, event)
+
+    def _load(self, family, event):
+        t0 = time.perf_counter()
+        try:
+            models = self._loader(family)
+        except Exception:
+            with self._lock:
+                self._counters["load_errors"] += 1
+                del self._loading[family]
+            event.set()
+            raise
+        nbytes = model_nbytes(models)
+        with self._lock:
+            self._counters["loads"] += 1
+            self._counters["load_time"] += time.perf_counter() - t0
+            self._entries[family] = (models, nbytes)
+            del self._loading[family]
+            self._evict(keep=family)
+        event.set()
+        return models
+
+    def _evict(self, keep=None):
+        # drop least recently used unpinned families until within budget
+        while self._over_budget():
+            victim = next((f for f in self._entries if f != keep and f not in self._pinned), None)
+            if victim is None:
+                return
+            del self._entries[victim]
+            self._counters["evictions"] += 1
+
+    def _over_budget(self):
+        if self.max_families is not None and len(self._entries) > self.max_families:
+            return True
+        if self.max_bytes is not None and self.memory_bytes() > self.max_bytes:
+            return True
+        return False
+
+    def evict(self, family):
+        with self._lock:
+            if self._entries.pop(family, None) is not None:
+                self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._counters["evictions"] += len(self._entries)
+            self._entries.clear()
+
+    def memory_bytes(self):
+        with self._lock:
+            return sum(nbytes for _, nbytes in self._entries.values())
+
+    # -------------------------
+    # Pinning / preloading
+    # -------------------------
+
+    def pin(self, family):
+        with self._lock:
+            self._pinned.add(family)
+
+    def unpin(self, family):
+        with self._lock:
+            self._pinned.discard(family)
+            self._evict()
+
+    def preload(self, families, background=True):
+        """
+        Load families ahead of use. Returns the loader thread when background=True.
+        """
+        def run():
+            for fam in families:
+                try:
+                    self.get(fam)
+                except Exception as e:
+                    print(f"[family_registry] preload failed for {fam}: {e}")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="family-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counters,
+                "cached": list(self._entries.keys()),
+                "pinned": sorted(self._pinned),
+                "memory_bytes": self.memory_bytes(),
+                "max_families": self.max_families,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,198 @@
+# ai_core/goal_seeker.py
+"""
+Goal-seeking mode: reach a target (Fr, BW) in as few solver (CST) runs as possible.
+
+The controller works on the family's free geometry slots in the unit box of
+param_schema (substrate h and eps_r stay at the start values, the material
+comes from the solver setup). Residuals are the Fr / BW errors divided by
+their tolerances, so |r| <= 1 in both components is exactly
+ParameterEngine.within_tolerance.
+
+    - start: engine.predict (no exploration) and the forward-model Jacobian
+      at that point (central differences, one batched forward call)
+    - step: Levenberg-Marquardt step of the linear model r + J s, limited to
+      a trust region in the unit box; slots pinned at a bound are dropped
+    - after each solve: Broyden rank-one update of J from the observed change,
+      trust radius grown / shrunk by the ratio of actual to predicted reduction,
+      steps that made things worse are not accepted; after two poor steps in a
+      row, one probe step along the least explored slot refreshes J there
+    - stop: within tolerance, max_solves reached, or the trust region collapsed
+
+    seeker = GoalSeeker(engine)
+    result = seeker.seek("patch_rect", 2.4, 100, solve)   # solve(params) -> (Fr_GHz, BW_MHz, ...)
+"""
+import time
+import numpy as np
+from ai_core.ai_config import *
+from ai_core import param_schema
+
+GEOMETRY_SLOTS = np.array([True, True, True, False, False])  # param_a, param_b, feed_width
+
+
+def lm_step(J, r, radius):
+    """
+    Minimize |r + J s| subject to |s| <= radius (Levenberg-Marquardt damping
+    found by bisection on log lambda). Returns (s, predicted |r + J s|^2).
+    """
+    JtJ, Jtr = J.T @ J, J.T @ r
+    I = np.eye(J.shape[1])
+    s = -np.linalg.lstsq(J, r, rcond=None)[0]  # minimum-norm Gauss-Newton step
+    if np.linalg.norm(s) > radius:
+        lo, hi = -12.0, 12.0
+        for _ in range(60):
+            lam = 10.0**((lo + hi) / 2)
+            s = -np.linalg.solve(JtJ + lam*I, Jtr)
+            if np.linalg.norm(s) > radius:
+                lo = np.log10(lam)
+            else:
+                hi = np.log10(lam)
+        s = -np.linalg.solve(JtJ + 10.0**hi*I, Jtr)
+    return s, float(np.sum((r + J @ s)**2))
+
+
+class GoalSeeker:
+    def __init__(
+            self,
+            engine,
+            tol_Fr=GOAL_TOL_FR_GHZ,
+            tol_BW=GOAL_TOL_BW_MHZ,
+            max_solves=GOAL_MAX_SOLVES,
+            trust_radius=GOAL_TRUST_RADIUS,
+            fd_step=1e-3
+    ):
+        """
+        engine: ParameterEngine (start point, forward model, within_tolerance)
+        tol_Fr / tol_BW: stop tolerance in GHz / MHz
+        trust_radius: initial step limit in the unit box of the free slots
+        fd_step: central-difference step (unit box) for the initial Jacobian
+        """
+        self.engine = engine
+        self.tol = np.array([tol_Fr, tol_BW], dtype=float)
+        self.max_solves = int(max_solves)
+        self.trust_radius = float(trust_radius)
+        self.fd_step = float(fd_step)
+
+    def _residual(self, y, target):
+        return (np.asarray(y[:2], dtype=float) - target) / self.tol
+
+    def model_jacobian(self, family, params, free):
+        """
+        d residual / d u (unit box) of the forward model at params, shape (2, n_free).
+        """
+        u0 = param_schema.normalize(family, [params])[0]
+        idx = np.flatnonzero(free)
+        U = np.repeat(u0[None, :], 2*len(idx), axis=0)
+        for k, i in enumerate(idx):
+            U[2*k, i] += self.fd_step
+            U[2*k + 1, i] -= self.fd_step
+        X = param_schema.denormalize(family, U)
+        X[:, ~free] = params[~free]
+        Y = self.engine.ai_mgr.predict_forward_batch(family, X)
+        J = (Y[0::2] - Y[1::2]).T / (2*self.fd_step)
+        return J / self.tol[:, None]
+
+    @staticmethod
+    def _bounded_step(J, r, radius, u):
+        # trust-region step with slots pinned at a bound (and pushing outward) dropped
+        active = np.ones(J.shape[1], dtype=bool)
+        s = np.zeros(J.shape[1])
+        for _ in range(J.shape[1]):
+            s[:] = 0.0
+            if not active.any():
+                break
+            s[active] = lm_step(J[:, active], r, radius)[0]
+            blocked = active & (((u <= 0.0) & (s < 0)) | ((u >= 1.0) & (s > 0)))
+            if not blocked.any():
+                break
+            active &= ~blocked
+        return s
+
+    def seek(self, family, target_Fr, target_BW, solve, params0=None, callback=None):
+        """
+        solve(params) -> (Fr_GHz, BW_MHz[, ...]) runs one simulation.
+        params0: start design (default: engine.predict without exploration)
+        callback(step_dict) is called after every solve.
+        Returns dict: {'success', 'params', 'Fr', 'BW', 'n_solves', 'history', 'wall_time'}
+        """
+        t_start = time.perf_counter()
+        target = np.array([target_Fr, target_BW], dtype=float)
+        if params0 is None:
+            params0 = self.engine.predict(family, target_Fr, target_BW, explore=False)
+        x = param_schema.clamp(family, [params0])[0]
+        free = param_schema.free_mask(family) & GEOMETRY_SLOTS
+
+        J = self.model_jacobian(family, x, free)
+        radius = self.trust_radius
+        history = []
+
+        def run(params, step, accepted):
+            y = solve([float(v) for v in params])
+            entry = {'step': step, 'params': [float(v) for v in params],
+                     'Fr': float(y[0]), 'BW': float(y[1]), 'radius': radius, 'accepted': accepted}
+            history.append(entry)
+            if callback is not None:
+                callback(entry)
+            return y
+
+        y = run(x, 0, True)
+        r = self._residual(y, target)
+        best = (x, y)
+        explored = np.zeros(int(free.sum()))  # |step| taken along each free slot
+        stalls = 0
+
+        while len(history) < self.max_solves:
+            if self.engine.within_tolerance(target_Fr, target_BW, y[0], y[1], *self.tol):
+                break
+            if radius < 1e-4:
+                break
+
+            u = param_schema.normalize(family, [x])[0]
+            probe = stalls >= 2
+            if probe:
+                # J only learns along steps actually taken: move the least explored
+                # slot into the interior so the secant update sees that direction
+                i = int(np.argmin(explored))
+                s_free = np.zeros_like(explored)
+                s_free[i] = self.trust_radius if u[free][i] < 0.5 else -self.trust_radius
+                stalls = 0
+            else:
+                s_free = self._bounded_step(J, r, radius, u[free])
+            u_new = u.copy()
+            u_new[free] = np.clip(u[free] + s_free, 0.0, 1.0)
+            s_free = u_new[free] - u[free]
+            if np.linalg.norm(s_free) < 1e-9:
+                break  # no move left inside the bounds
+            pred = float(np.sum((r + J @ s_free)**2))
+
+            x_new = param_schema.denormalize(family, [u_new])[0]
+            x_new[~free] = x[~free]
+            y_new = run(x_new, len(history), False)
+            r_new = self._residual(y_new, target)
+
+            # Broyden ("good") rank-one update from the observed change
+            J = J + np.outer((r_new - r) - J @ s_free, s_free) / float(s_free @ s_free)
+            explored += np.abs(s_free)
+
+            actual_red = float(r @ r - r_new @ r_new)
+            pred_red = float(r @ r) - pred
+            rho = actual_red / pred_red if pred_red > 1e-12 else -1.0
+            stalls = 0 if rho >= 0.25 else stalls + 1
+            if probe:
+                pass  # probes say nothing about the trust region
+            elif rho < 0.25:
+                radius = 0.5*min(radius, np.linalg.norm(s_free))
+            elif rho > 0.75 and np.linalg.norm(s_free) > 0.9*radius:
+                radius = min(2.0*radius, 1.0)
+
+            if actual_red > 0:
+                x, y, r = x_new, y_new, r_new
+                history[-1]['accepted'] = True
+                best = (x, y)
+
+        x, y = best
+        return {
+            'success': bool(self.engine.within_tolerance(target_Fr, target_BW, y[0], y[1], *self.tol)),
+            'params': [float(v) for v in x], 'Fr': float(y[0]), 'BW': float(y[1]),
+            'n_solves': len(history), 'history': history,
+            'wall_time': time.perf_counter() - t_start,
+        }
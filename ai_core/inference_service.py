@@ -0,0 +1,500 @@
+# ai_core/inference_service.py
+"""
+Local inference service so several processes share one loaded copy of the models.
+
+The server speaks newline-delimited JSON over TCP on localhost (or a UNIX
+socket). predict_forward / predict_inverse requests that arrive within
+SERVICE_BATCH_WINDOW_MS of each other are merged into one mixed-family
+batch call; engine predict requests are batched the same way. Each batcher
+has a bounded queue: when it is full the request is rejected with
+{"busy": true} and the client backs off and retries. Per connection, at most
+SERVICE_MAX_INFLIGHT requests are read ahead, so a flooding client is slowed
+by TCP backpressure instead of growing server memory.
+
+AICoreManager is not safe to drive from two threads (lazy family loading,
+the model cache, compiled-function caches), so every model call, batched or
+not, runs on one model thread. optimize_parameters and warmup queue there
+too: a batch that arrives during an optimize waits for it.
+
+    python -m ai_core.inference_service [--host H] [--port P] [--unix PATH]
+
+InferenceClient mirrors the AICoreManager predict/optimize API and
+RemoteParameterEngine is a drop-in for ParameterEngine (USE_INFERENCE_SERVICE).
+"""
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ai_core.ai_config import *
+
+
+def _to_json(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (np.floating, np.integer)):
+        return obj.item()
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    raise TypeError(f"Not JSON serializable: {type(obj)}")
+
+
+class ServiceBusy(RuntimeError):
+    pass
+
+
+# -------------------------
+# Server
+# -------------------------
+
+class _Batcher:
+    """
+    Collects requests for up to `window` seconds (or max_rows rows) and runs
+    them with a single call of run_batch(list_of_args) -> list_of_results.
+    prepare(args) -> (args, rows) validates and reshapes a request before it
+    is queued; a bad request fails on its own future and never reaches the
+    batch loop.
+    """
+    def __init__(self, name, run_batch, prepare, executor, window, max_rows, max_queue, stats):
+        self.name = name
+        self.run_batch = run_batch
+        self.prepare = prepare
+        self.executor = executor
+        self.window = window
+        self.max_rows = max_rows
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.stats = stats
+
+    def submit(self, args):
+        fut = asyncio.get_running_loop().create_future()
+        try:
+            args, rows = self.prepare(args)
+        except Exception as e:
+            fut.set_exception(ValueError(f"bad {self.name} request: {type(e).__name__}: {e}"))
+            return fut
+        try:
+            self.queue.put_nowait((args, rows, fut))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise ServiceBusy(f"{self.name} queue full ({self.queue.maxsize})")
+        return fut
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            try:
+                await self._collect(loop, batch)
+                await self._run_batch(loop, batch)
+            except Exception as e:
+                # never let one batch end the loop: fail what is still pending
+                self.stats["batch_errors"] += 1
+                for _, _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    async def _collect(self, loop, batch):
+        rows = batch[0][1]
+        deadline = loop.time() + self.window
+        while rows < self.max_rows:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            rows += item[1]
+
+    async def _run_batch(self, loop, batch):
+        self.stats["batches"] += 1
+        self.stats["batched_requests"] += len(batch)
+        self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        try:
+            results = await loop.run_in_executor(self.executor, self.run_batch, [a for a, _, _ in batch])
+            outcomes = [(r, None) for r in results]
+        except Exception:
+            # isolate the failing request(s) instead of failing the whole batch
+            outcomes = []
+            for args, _, _ in batch:
+                try:
+                    outcomes.append(((await loop.run_in_executor(self.executor, self.run_batch, [args]))[0], None))
+                except Exception as e:
+                    outcomes.append((None, e))
+        for (_, _, fut), (result, err) in zip(batch, outcomes):
+            if fut.done():
+                continue
+            if err is not None:
+                fut.set_exception(err)
+            else:
+                fut.set_result(result)
+
+
+class InferenceService:
+    def __init__(
+            self,
+            engine=None,
+            host=SERVICE_HOST,
+            port=SERVICE_PORT,
+            unix_path=None,
+            batch_window_ms=SERVICE_BATCH_WINDOW_MS,
+            max_batch=INFERENCE_BATCH_SIZE,
+            max_queue=SERVICE_MAX_QUEUE,
+            max_inflight=SERVICE_MAX_INFLIGHT
+    ):
+        if engine is None:
+            from ai_core.parameter_engine import ParameterEngine
+            engine = ParameterEngine()
+        self.engine = engine
+        self.ai_mgr = engine.ai_mgr
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.window = batch_window_ms / 1000.0
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.max_inflight = max_inflight
+        # every call into ai_mgr runs here, one at a time (see module docstring)
+        self._model_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="infer")
+        self.stats = {"requests": 0, "errors": 0, "rejected": 0, "batches": 0,
+                      "batched_requests": 0, "max_batch": 0, "batch_errors": 0}
+        self._batchers = {}
+        self._server = None
+
+    # ---- batched ops ----
+
+    @staticmethod
+    def _families(fam, n):
+        # one family name per row
+        if isinstance(fam, str):
+            return [fam]*n
+        fam = list(fam)
+        if len(fam) != n or not all(isinstance(f, str) for f in fam):
+            raise ValueError(f"family must be a name or a list of {n} names")
+        return fam
+
+    @classmethod
+    def _prepare_rows(cls, args, key, width):
+        # {"family", key: (N, width) array, "single"}, rows
+        arr = np.asarray(args[key], dtype=float)
+        if arr.ndim not in (1, 2) or arr.shape[-1] != width:
+            raise ValueError(f"{key} must have {width} values per row, got shape {arr.shape}")
+        single = arr.ndim == 1
+        arr = np.atleast_2d(arr)
+        return {"family": cls._families(args["family"], arr.shape[0]), key: arr, "single": single}, arr.shape[0]
+
+    @classmethod
+    def _prepare_predict(cls, args):
+        Fr = np.atleast_1d(np.asarray(args["target_Fr"], dtype=float))
+        BW = np.atleast_1d(np.asarray(args["target_BW"], dtype=float))
+        if Fr.ndim != 1 or Fr.shape != BW.shape:
+            raise ValueError(f"target_Fr / target_BW shapes {Fr.shape} / {BW.shape} do not match")
+        prepared = {
+            "family": cls._families(args["family"], Fr.shape[0]), "target_Fr": Fr, "target_BW": BW,
+            "single": np.ndim(args["target_Fr"]) == 0,
+            "explore": bool(args.get("explore", True)),
+            "apply_correction": bool(args.get("apply_correction", True)),
+            "seed": None if args.get("seed") is None else int(args["seed"]),
+        }
+        return prepared, Fr.shape[0]
+
+    def _run_rows(self, fn, key, args_list):
+        # concatenate every request's rows (mixed families), one model call, split back
+        families, blocks, singles = [], [], []
+        for args in args_list:
+            families += args["family"]
+            blocks.append(args[key])
+            singles.append(args["single"])
+        out = fn(families, np.concatenate(blocks))
+        results, i = [], 0
+        for arr, single in zip(blocks, singles):
+            part = out[i:i + arr.shape[0]]
+            i += arr.shape[0]
+            results.append(part[0] if single else part)
+        return results
+
+    def _run_forward(self, args_list):
+        return self._run_rows(self.ai_mgr.predict_forward_batch, "params", args_list)
+
+    def _run_inverse(self, args_list):
+        return self._run_rows(self.ai_mgr.predict_inverse_batch, "targets", args_list)
+
+    def _run_engine_predict(self, args_list):
+        # one predict_batch per (explore, apply_correction) group; seeded requests run on their own
+        groups = {}
+        for i, a in enumerate(args_list):
+            key = (a["explore"], a["apply_correction"])
+            groups.setdefault(i if a["seed"] is not None else key, []).append(i)
+        results = [None]*len(args_list)
+        for idx in groups.values():
+            first = args_list[idx[0]]
+            families, Fr, BW, singles = [], [], [], []
+            for i in idx:
+                a = args_list[i]
+                families += a["family"]
+                Fr.append(a["target_Fr"])
+                BW.append(a["target_BW"])
+                singles.append(a["single"])
+            out = self.engine.predict_batch(families, np.concatenate(Fr), np.concatenate(BW),
+                                            explore=first["explore"],
+                                            apply_correction=first["apply_correction"],
+                                            seed=first["seed"])
+            j = 0
+            for i, fr, single in zip(idx, Fr, singles):
+                part = out[j:j + fr.shape[0]]
+                j += fr.shape[0]
+                results[i] = part[0] if single else part
+        return results
+
+    # ---- request dispatch ----
+
+    async def _dispatch(self, op, args):
+        loop = asyncio.get_running_loop()
+        if op in ("predict_forward", "predict_forward_batch"):
+            return await self._batchers["forward"].submit(args)
+        if op in ("predict_inverse", "predict_inverse_batch"):
+            if op == "predict_inverse":
+                args = {"family": args["family"], "targets": [args["Fr_GHz"], args["BW_MHz"]]}
+            return await self._batchers["inverse"].submit(args)
+        if op in ("predict", "predict_batch"):
+            return await self._batchers["predict"].submit(args)
+        if op == "refine":
+            return self.engine.refine(**args)
+        if op == "optimize_parameters":
+            return await loop.run_in_executor(self._model_executor, lambda: self.ai_mgr.optimize_parameters(**args))
+        if op == "warmup":
+            return await loop.run_in_executor(self._model_executor, lambda: self.ai_mgr.warmup(**args))
+        if op == "stats":
+            return {**self.stats, "queue_depth": {k: b.queue.qsize() for k, b in self._batchers.items()},
+                    "model_cache": self.ai_mgr.model_cache_stats(),
+                    "correction": self.engine.correction_stats()}
+        raise ValueError(f"Unknown op: {op}")
+
+    async def _serve_one(self, line, writer, write_lock, sem):
+        req_id = None
+        try:
+            req = json.loads(line)
+            req_id = req.get("id")
+            self.stats["requests"] += 1
+            result = await self._dispatch(req["op"], req.get("args", {}))
+            resp = {"id": req_id, "ok": True, "result": result}
+        except ServiceBusy as e:
+            resp = {"id": req_id, "ok": False, "busy": True, "error": str(e)}
+        except Exception as e:
+            self.stats["errors"] += 1
+            resp = {"id": req_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            sem.release()
+        data = (json.dumps(resp, default=_to_json) + "\n").encode()
+        async with write_lock:
+            writer.write(data)
+            await writer.drain()
+
+    async def _handle(self, reader, writer):
+        sem = asyncio.Semaphore(self.max_inflight)
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                await sem.acquire()  # stop reading while this connection has max_inflight pending
+                line = await reader.readline()
+                if not line:
+                    sem.release()
+                    break
+                task = asyncio.create_task(self._serve_one(line, writer, write_lock, sem))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self._batchers = {
+            "forward": _Batcher("forward", self._run_forward, lambda a: self._prepare_rows(a, "params", 5),
+                                self._model_executor, self.window, self.max_batch, self.max_queue, self.stats),
+            "inverse": _Batcher("inverse", self._run_inverse, lambda a: self._prepare_rows(a, "targets", 2),
+                                self._model_executor, self.window, self.max_batch, self.max_queue, self.stats),
+            "predict": _Batcher("predict", self._run_engine_predict, self._prepare_predict,
+                                self._model_executor, self.window, self.max_batch, self.max_queue, self.stats),
+        }
+        self._tasks = [asyncio.create_task(b.run()) for b in self._batchers.values()]
+        limit = 1 << 24  # large batch requests are single JSON lines
+        if self.unix_path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.unix_path, limit=limit)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=limit)
+        return self._server
+
+    async def serve_forever(self):
+        server = await self.start()
+        where = self.unix_path or f"{self.host}:{self.port}"
+        print(f"[inference_service] listening on {where} (window {self.window*1e3:.1f} ms)")
+        async with server:
+            await server.serve_forever()
+
+
+# -------------------------
+# Client
+# -------------------------
+
+class InferenceClient:
+    """
+    Blocking client with the AICoreManager predict/optimize API. Thread-safe.
+    """
+    def __init__(self, host=SERVICE_HOST, port=SERVICE_PORT, unix_path=None,
+                 timeout=120.0, busy_retries=20, busy_backoff=0.01):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.timeout = timeout
+        self.busy_retries = busy_retries
+        self.busy_backoff = busy_backoff
+        self._lock = threading.Lock()
+        self._sock = None
+        self._file = None
+        self._next_id = 0
+
+    def _connect(self):
+        if self.unix_path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.unix_path)
+        else:
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._sock = sock
+        self._file = sock.makefile("rwb")
+
+    def _drop(self):
+        # close and forget the connection; the next call reconnects (caller holds _lock)
+        if self._sock is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = self._file = None
+
+    def close(self):
+        with self._lock:
+            self._drop()
+
+    def call(self, op, **args):
+        for attempt in range(self.busy_retries + 1):
+            with self._lock:
+                if self._sock is None:
+                    self._connect()
+                self._next_id += 1
+                try:
+                    self._file.write((json.dumps({"id": self._next_id, "op": op, "args": args},
+                                                 default=_to_json) + "\n").encode())
+                    self._file.flush()
+                    line = self._file.readline()
+                except OSError:
+                    self._drop()
+                    raise
+                if not line:
+                    self._drop()
+                    raise ConnectionError("inference service closed the connection")
+            resp = json.loads(line)
+            if resp.get("ok"):
+                return resp["result"]
+            if resp.get("busy") and attempt < self.busy_retries:
+                time.sleep(self.busy_backoff * (2 ** min(attempt, 6)))
+                continue
+            if resp.get("busy"):
+                raise ServiceBusy(resp.get("error"))
+            raise RuntimeError(resp.get("error"))
+
+    # ---- AICoreManager API ----
+
+    def predict_forward(self, family, params):
+        y = self.call("predict_forward", family=family, params=list(map(float, params)))
+        return float(y[0]), float(y[1])
+
+    def predict_inverse(self, family, Fr_GHz, BW_MHz):
+        return [float(v) for v in self.call("predict_inverse", family=family, Fr_GHz=float(Fr_GHz), BW_MHz=float(BW_MHz))]
+
+    def predict_forward_batch(self, family, X):
+        return np.asarray(self.call("predict_forward_batch", family=family,
+                                    params=np.atleast_2d(np.asarray(X, dtype=float))), dtype=float)
+
+    def predict_inverse_batch(self, family, targets):
+        return np.asarray(self.call("predict_inverse_batch", family=family,
+                                    targets=np.atleast_2d(np.asarray(targets, dtype=float))), dtype=float)
+
+    def optimize_parameters(self, family, Fr_GHz, BW_MHz, **kwargs):
+        return self.call("optimize_parameters", family=family, Fr_GHz=float(Fr_GHz), BW_MHz=float(BW_MHz), **kwargs)
+
+    def warmup(self, families=FAMILIES, **kwargs):
+        return self.call("warmup", families=list(families), **kwargs)
+
+    def stats(self):
+        return self.call("stats")
+
+
+class RemoteParameterEngine:
+    """
+    Drop-in for ParameterEngine that runs predict/refine in the inference service.
+    """
+    def __init__(self, client=None):
+        self.ai_mgr = client if client is not None else InferenceClient()
+
+    def predict(self, family, target_Fr, target_BW, explore=True, apply_correction=True, seed=None):
+        return self.ai_mgr.call("predict", family=family, target_Fr=float(target_Fr), target_BW=float(target_BW),
+                                explore=explore, apply_correction=apply_correction, seed=seed)
+
+    def predict_batch(self, families, target_Fr, target_BW, explore=True, apply_correction=True, seed=None):
+        return np.asarray(self.ai_mgr.call(
+            "predict_batch", family=families if isinstance(families, str) else list(families),
+            target_Fr=np.atleast_1d(np.asarray(target_Fr, dtype=float)),
+            target_BW=np.atleast_1d(np.asarray(target_BW, dtype=float)),
+            explore=explore, apply_correction=apply_correction, seed=seed
+        ), dtype=float)
+
+    def refine(self, family, params, target_Fr, target_BW, actual_Fr, actual_BW, step_scale=1.0):
+        return np.asarray(self.ai_mgr.call(
+            "refine", family=family, params=list(map(float, params)),
+            target_Fr=float(target_Fr), target_BW=float(target_BW),
+            actual_Fr=float(actual_Fr), actual_BW=float(actual_BW), step_scale=float(step_scale)
+        ))
+
+    def within_tolerance(self, target_Fr, target_BW, actual_Fr, actual_BW, tol_Fr, tol_BW):
+        return (
+            abs(actual_Fr - target_Fr) <= tol_Fr and
+            abs(actual_BW - target_BW) <= tol_BW
+        )
+
+
+def make_engine():
+    # ParameterEngine, or the service-backed drop-in when USE_INFERENCE_SERVICE is set
+    if USE_INFERENCE_SERVICE:
+        return RemoteParameterEngine()
+    from ai_core.parameter_engine import ParameterEngine
+    return ParameterEngine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local batched inference service")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--unix", default=None, help="UNIX socket path (instead of TCP)")
+    parser.add_argument("--window-ms", type=float, default=SERVICE_BATCH_WINDOW_MS)
+    parser.add_argument("--warmup", action="store_true", help="compile all families before serving")
+    a = parser.parse_args()
+
+    service = InferenceService(host=a.host, port=a.port, unix_path=a.unix, batch_window_ms=a.window_ms)
+    if a.warmup:
+        service.ai_mgr.warmup()
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
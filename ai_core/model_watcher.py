@@ -0,0 +1,182 @@
+# ai_core/model_watcher.py
+"""
+Change-driven background reload of a model file.
+
+A daemon thread stats the file every interval seconds. Only when its
+(mtime, size) changes is the file read, and only when the content hash also
+changed is it deserialized, into a new object that then replaces the current
+snapshot in one attribute assignment. Readers take `watcher.snapshot` once
+and never wait on disk I/O or see a half-loaded model; a failed load keeps
+the previous model.
+
+Writers use publish(): every version goes to its own file
+(name.v000012.save, written to a temp file and renamed), then the watched
+path is swapped to it with os.replace, so a reader opening the path gets
+either the old or the new file, never a partial one.
+"""
+import glob
+import hashlib
+import io
+import os
+import re
+import shutil
+import threading
+import time
+import joblib
+
+
+def versioned_path(path, version):
+    stem, ext = os.path.splitext(str(path))
+    return f"{stem}.v{int(version):06d}{ext}"
+
+def published_versions(path):
+    # [(version, file)] of path's versioned files, oldest first
+    stem, ext = os.path.splitext(str(path))
+    pattern = re.compile(re.escape(os.path.basename(stem)) + r"\.v(\d+)" + re.escape(ext) + "$")
+    found = []
+    for f in glob.glob(glob.escape(stem) + ".v[0-9]*" + ext):
+        m = pattern.match(os.path.basename(f))
+        if m:
+            found.append((int(m.group(1)), f))
+    return sorted(found)
+
+def latest_version(path):
+    found = published_versions(path)
+    return found[-1][0] if found else 0
+
+def publish(obj, path, version, keep=5, dump=joblib.dump):
+    """
+    Write obj as version `version` of path and make path point at it.
+    keep: versioned files kept, by version number; older ones are deleted,
+    the one just written never is.
+    Returns the versioned file name.
+    """
+    path = str(path)
+    target = versioned_path(path, version)
+    tmp = f"{target}.tmp{os.getpid()}"
+    dump(obj, tmp)
+    os.replace(tmp, target)
+
+    # hard link (or copy) next to path, then one atomic rename over it
+    tmp = f"{path}.tmp{os.getpid()}"
+    try:
+        os.link(target, tmp)
+    except OSError:
+        shutil.copyfile(target, tmp)
+    os.replace(tmp, path)
+
+    if keep:
+        old = [f for _, f in published_versions(path) if f != target]
+        for f in old[:max(len(old) - (keep - 1), 0)]:
+            try:
+                os.remove(f)
+            except OSError:
+                pass
+    return target
+
+
+class ModelSnapshot:
+    """
+    One loaded version of the file (model is None when the file is missing).
+    """
+    __slots__ = ("model", "version", "sha1", "loaded_at", "load_s")
+
+    def __init__(self, model=None, version=0, sha1="", loaded_at=0.0, load_s=0.0):
+        self.model = model
+        self.version = version
+        self.sha1 = sha1
+        self.loaded_at = loaded_at
+        self.load_s = load_s
+
+    @property
+    def fingerprint(self):
+        # cache-invalidation fingerprint, same role as result_cache.file_fingerprint
+        return (("model_sha1", self.sha1),) if self.model is not None else ()
+
+
+class ModelWatcher:
+    def __init__(self, path, interval=2.0, loader=None, name="model", start=True):
+        """
+        path: file to watch; loader(fileobj) -> model (default joblib.load)
+        interval: seconds between stat checks; start: load now and start the thread
+        """
+        self.path = str(path)
+        self.interval = float(interval)
+        self.loader = loader or joblib.load
+        self.name = name
+        self.snapshot = ModelSnapshot()
+        self._stat = None
+        self._check_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"checks": 0, "reloads": 0, "failures": 0, "last_error": None}
+        if start:
+            self.check()
+            self.start()
+
+    @property
+    def model(self):
+        return self.snapshot.model
+
+    def check(self):
+        """
+        Reload if the file changed. Returns True when a new snapshot was swapped in.
+        """
+        with self._check_lock:
+            self.stats["checks"] += 1
+            try:
+                st = os.stat(self.path)
+                stat = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                stat = None
+            if stat == self._stat:
+                return False
+            if stat is None:
+                # file removed: drop the model
+                self._stat = None
+                self.snapshot = ModelSnapshot(version=self.snapshot.version + 1, loaded_at=time.time())
+                return True
+
+            t0 = time.perf_counter()
+            try:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+                sha1 = hashlib.sha1(data).hexdigest()
+                if sha1 == self.snapshot.sha1 and self.snapshot.model is not None:
+                    self._stat = stat  # touched, content unchanged
+                    return False
+                model = self.loader(io.BytesIO(data))
+            except Exception as e:
+                # keep serving the previous model; retry on the next change
+                self._stat = stat
+                self.stats["failures"] += 1
+                self.stats["last_error"] = f"{type(e).__name__}: {e}"
+                return False
+
+            self._stat = stat
+            self.snapshot = ModelSnapshot(model, self.snapshot.version + 1, sha1,
+                                          time.time(), time.perf_counter() - t0)
+            self.stats["reloads"] += 1
+            self.stats["last_error"] = None
+            return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+            self._thread = None
+
+    def metrics(self):
+        snap = self.snapshot
+        return {"path": self.path, "loaded": snap.model is not None, "version": snap.version,
+                "sha1": snap.sha1, "loaded_at": snap.loaded_at, "load_s": snap.load_s, **self.stats}
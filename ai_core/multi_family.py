@@ -0,0 +1,168 @@
+# ai_core/multi_family.py
+"""
+One shared forward and one shared inverse network for every family.
+
+The family is a one-hot block appended to the (per-family standardized)
+inputs, and outputs are un-standardized with per-family statistics, so a
+mixed-family batch is a single model call. Trained by
+trainers/train_multi_family.py and used by AICoreManager(backend="multi").
+
+Files:
+    models/forward_multi.keras
+    models/inverse_multi.keras
+    models/multi_family_scalers.save   (per-family mean/scale arrays, rows in FAMILIES order)
+"""
+import joblib
+import numpy as np
+from pathlib import Path
+from ai_core.ai_config import *
+
+MODELS_DIR = Path(MODELS_DIR)
+MULTI_FORWARD_PATH = MODELS_DIR / "forward_multi.keras"
+MULTI_INVERSE_PATH = MODELS_DIR / "inverse_multi.keras"
+MULTI_SCALERS_PATH = MODELS_DIR / "multi_family_scalers.save"
+
+FAMILY_TO_ID = {f: i for i, f in enumerate(FAMILIES)}
+
+
+def family_ids(families):
+    try:
+        return np.array([FAMILY_TO_ID[f] for f in families], dtype=int)
+    except KeyError as e:
+        raise ValueError("Unknown family: " + str(e.args[0]))
+
+def one_hot(ids):
+    out = np.zeros((len(ids), len(FAMILIES)), dtype=np.float32)
+    out[np.arange(len(ids)), ids] = 1.0
+    return out
+
+def encode_inputs(ids, Xs):
+    # standardized features followed by the family one-hot block
+    return np.hstack([np.asarray(Xs, dtype=np.float32), one_hot(ids)])
+
+def fit_family_scalers(ids, A):
+    """
+    Per-family StandardScaler statistics.
+    returns: (mean, scale) arrays of shape (len(FAMILIES), A.shape[1]); scale is 1 for
+    constant columns, including ones whose std is only the round-off of averaging
+    n copies of a fixed value (sklearn's test: var <= n eps var + (n eps mean)^2),
+    so e.g. a substrate_h off the dataset's fixed value is not blown up by 1/1e-16
+    """
+    A = np.asarray(A, dtype=float)
+    mean = np.zeros((len(FAMILIES), A.shape[1]))
+    scale = np.ones((len(FAMILIES), A.shape[1]))
+    for i in np.unique(ids):
+        rows = A[ids == i]
+        mean[i] = rows.mean(axis=0)
+        var = rows.var(axis=0)
+        n_eps = len(rows) * np.finfo(float).eps
+        constant = var <= n_eps * var + (n_eps * mean[i])**2
+        scale[i] = np.where(constant, 1.0, np.sqrt(var))
+    return mean, scale
+
+
+class MultiFamilyModels:
+    def __init__(self):
+        self.fwd_model = None
+        self.inv_model = None
+        self.scalers = None
+        self._compiled = {}
+        self.load_models()
+
+    def load_models(self):
+        from tensorflow.keras.models import load_model
+
+        if MULTI_SCALERS_PATH.exists():
+            self.scalers = joblib.load(str(MULTI_SCALERS_PATH))
+        if MULTI_FORWARD_PATH.exists():
+            self.fwd_model = load_model(str(MULTI_FORWARD_PATH))
+        if MULTI_INVERSE_PATH.exists():
+            self.inv_model = load_model(str(MULTI_INVERSE_PATH))
+
+    @property
+    def nbytes(self):
+        return sum(4 * int(m.count_params()) for m in (self.fwd_model, self.inv_model) if m is not None)
+
+    def _run(self, direction, ids, Xs):
+        from ai_core.ai_core_manager import compile_fixed_shape, run_bucketed
+
+        model = self.fwd_model if direction == "forward" else self.inv_model
+
+        def get_fn(bucket):
+            if (direction, bucket) not in self._compiled:
+                self._compiled[(direction, bucket)] = compile_fixed_shape(model, bucket)
+            return self._compiled[(direction, bucket)]
+
+        return run_bucketed(get_fn, encode_inputs(ids, Xs), model.output_shape[-1])
+
+    def forward(self, families, X):
+        """
+        families: N family names, X: (N,5) params -> (N,2) [Fr_GHz, BW_MHz]
+        """
+        if self.fwd_model is None or self.scalers is None:
+            raise RuntimeError("Multi-family forward model missing (run trainers/train_multi_family.py)")
+        ids = family_ids(families)
+        sc = self.scalers
+        Xs = (np.asarray(X, dtype=float) - sc["fwd_X_mean"][ids]) / sc["fwd_X_scale"][ids]
+        return self._run("forward", ids, Xs) * sc["fwd_y_scale"][ids] + sc["fwd_y_mean"][ids]
+
+    def inverse(self, families, targets):
+        """
+        families: N family names, targets: (N,2) [Fr_GHz, BW_MHz] -> (N,5) params
+        """
+        if self.inv_model is None or self.scalers is None:
+            raise RuntimeError("Multi-family inverse model missing (run trainers/train_multi_family.py)")
+        ids = family_ids(families)
+        sc = self.scalers
+        Ts = (np.asarray(targets, dtype=float) - sc["inv_X_mean"][ids]) / sc["inv_X_scale"][ids]
+        return self._run("inverse", ids, Ts) * sc["inv_y_scale"][ids] + sc["inv_y_mean"][ids]
+
+    def forward_loss_grad(self, family, X, Fr_GHz, BW_MHz):
+        import tensorflow as tf
+        from ai_core.ai_core_manager import target_loss
+
+        if self.fwd_model is None or self.scalers is None:
+            raise RuntimeError("Multi-family forward model missing (run trainers/train_multi_family.py)")
+        i = FAMILY_TO_ID[family]
+        sc = self.scalers
+        x = tf.constant(X, tf.float32)
+        hot = tf.constant(np.repeat(one_hot([i]), len(X), axis=0))
+        with tf.GradientTape() as tape:
+            tape.watch(x)
+            xs = (x - sc["fwd_X_mean"][i].astype(np.float32)) / sc["fwd_X_scale"][i].astype(np.float32)
+            y_s = self.fwd_model(tf.concat([xs, hot], axis=1), training=False)
+            y = y_s * sc["fwd_y_scale"][i].astype(np.float32) + sc["fwd_y_mean"][i].astype(np.float32)
+            loss_rows = target_loss(y, Fr_GHz, BW_MHz)
+            loss = tf.reduce_sum(loss_rows)
+        return loss_rows.numpy().astype(float), tape.gradient(loss, x).numpy().astype(float)
+
+    def warmup(self, buckets=INFERENCE_BUCKETS):
+        for b in buckets:
+            ids = np.zeros(b, dtype=int)
+            if self.fwd_model is not None:
+                self._run("forward", ids, np.zeros((b, 5)))
+            if self.inv_model is not None:
+                self._run("inverse", ids, np.zeros((b, 2)))
+
+
+class MultiFamilyView:
+    """
+    Per-family adapter over the shared models, with the FamilyModels interface.
+    Holds no weights of its own, so the model registry counts it as free.
+    """
+    def __init__(self, shared, family):
+        self.shared = shared
+        self.family = family
+
+    def forward(self, X):
+        return self.shared.forward([self.family]*len(X), X)
+
+    def inverse(self, targets):
+        return self.shared.inverse([self.family]*len(targets), targets)
+
+    def forward_loss_grad(self, X, Fr_GHz, BW_MHz):
+        return self.shared.forward_loss_grad(self.family, X, Fr_GHz, BW_MHz)
+
+    def warmup(self, buckets=INFERENCE_BUCKETS):
+        self.shared.warmup(buckets)
+
@@ -0,0 +1,228 @@
+# ai_core/numpy_runtime.py
+"""
+TensorFlow-free inference for the per-family MLPs.
+
+export_family() turns models/forward_<family>.keras, inverse_<family>.keras and
+their joblib scalers into plain weight arrays (models/*_numpy.npz) with the
+scalers folded into the first and last Dense layers. NumpyFamilyModels runs
+those arrays with NumPy only and is used by AICoreManager(backend="numpy").
+
+    python -m ai_core.numpy_runtime export      # write .npz files for all families
+    python -m ai_core.numpy_runtime check       # Keras vs NumPy parity over all families
+"""
+import sys
+import numpy as np
+from pathlib import Path
+from ai_core.ai_config import *
+
+MODELS_DIR = Path(MODELS_DIR)
+
+ACTIVATIONS = {
+    "relu": lambda z: np.maximum(z, 0.0),
+    "linear": lambda z: z,
+}
+
+def forward_npz_path(family):
+    return MODELS_DIR / f"forward_{family}_numpy.npz"
+
+def inverse_npz_path(family):
+    return MODELS_DIR / f"inverse_{family}_numpy.npz"
+
+# -------------------------
+# Runtime
+# -------------------------
+
+class NumpyMLP:
+    """
+    Stack of Dense layers: y = act_k(... act_0(x @ W_0 + b_0) ...)
+    """
+    def __init__(self, weights, biases, activations):
+        for act in activations:
+            if act not in ACTIVATIONS:
+                raise ValueError(f"Unsupported activation: {act}")
+        self.weights = [np.asarray(W, dtype=np.float32) for W in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(str(path), allow_pickle=False)
+        n = len(data["activations"])
+        return cls(
+            [data[f"W{i}"] for i in range(n)],
+            [data[f"b{i}"] for i in range(n)],
+            [str(a) for a in data["activations"]],
+        )
+
+    def save(self, path):
+        arrays = {"activations": np.array(self.activations)}
+        for i, (W, b) in enumerate(zip(self.weights, self.biases)):
+            arrays[f"W{i}"] = W
+            arrays[f"b{i}"] = b
+        np.savez(str(path), **arrays)
+
+    @property
+    def nbytes(self):
+        return sum(W.nbytes + b.nbytes for W, b in zip(self.weights, self.biases))
+
+    def predict(self, X):
+        h = np.asarray(X, dtype=np.float32)
+        for W, b, act in zip(self.weights, self.biases, self.activations):
+            h = ACTIVATIONS[act](h @ W + b)
+        return h.astype(float)
+
+    def input_gradient(self, X, grad_out):
+        """
+        Backpropagate grad_out = d loss / d y (N,out) to d loss / d X (N,in).
+        """
+        h = np.asarray(X, dtype=np.float32)
+        pre = []
+        for W, b, act in zip(self.weights, self.biases, self.activations):
+            z = h @ W + b
+            pre.append(z)
+            h = ACTIVATIONS[act](z)
+        g = np.asarray(grad_out, dtype=np.float32)
+        for W, z, act in zip(reversed(self.weights), reversed(pre), reversed(self.activations)):
+            if act == "relu":
+                g = g * (z > 0)
+            g = g @ W.T
+        return g.astype(float)
+
+
+class NumpyFamilyModels:
+    """
+    Same interface as ai_core_manager.FamilyModels, backed by exported .npz weights.
+    """
+    def __init__(self, family):
+        self.family = family
+        self.fwd_model = None
+        self.inv_model = None
+        self.load_models()
+
+    def load_models(self):
+        if forward_npz_path(self.family).exists():
+            self.fwd_model = NumpyMLP.load(forward_npz_path(self.family))
+        if inverse_npz_path(self.family).exists():
+            self.inv_model = NumpyMLP.load(inverse_npz_path(self.family))
+
+    def forward(self, X):
+        if self.fwd_model is None:
+            raise RuntimeError(f"Forward model missing for {self.family} (run python -m ai_core.numpy_runtime export)")
+        return self.fwd_model.predict(X)
+
+    def inverse(self, targets):
+        if self.inv_model is None:
+            raise RuntimeError(f"Inverse model missing for {self.family} (run python -m ai_core.numpy_runtime export)")
+        return self.inv_model.predict(targets)
+
+    def forward_loss_grad(self, X, Fr_GHz, BW_MHz):
+        from ai_core.ai_core_manager import target_loss, target_loss_grad
+
+        y = self.forward(X)
+        g = self.fwd_model.input_gradient(X, target_loss_grad(y, Fr_GHz, BW_MHz))
+        return target_loss(y, Fr_GHz, BW_MHz), g
+
+# -------------------------
+# Export (needs TensorFlow)
+# -------------------------
+
+def _dense_layers(model):
+    weights, biases, activations = [], [], []
+    for layer in model.layers:
+        W, b = layer.get_weights()
+        weights.append(W.astype(float))
+        biases.append(b.astype(float))
+        activations.append(layer.get_config().get("activation", "linear"))
+    return weights, biases, activations
+
+def fold_input_scaler(W, b, mean, scale):
+    # ((x - mean) / scale) @ W + b  ==  x @ W' + b'
+    W_f = W / scale[:, None]
+    return W_f, b - (mean / scale) @ W
+
+def fold_output_scaler(W, b, mean, scale):
+    # (h @ W + b) * scale + mean  ==  h @ W' + b'
+    return W * scale[None, :], b * scale + mean
+
+def export_family(family):
+    """
+    Write forward/inverse .npz files for one family. Returns the list of paths written.
+    """
+    import joblib
+    from tensorflow.keras.models import load_model
+
+    written = []
+    fwd_path = MODELS_DIR / f"forward_{family}.keras"
+    fwd_scaler = MODELS_DIR / f"forward_{family}_scaler.save"
+    if fwd_path.exists() and fwd_scaler.exists():
+        weights, biases, acts = _dense_layers(load_model(str(fwd_path)))
+        sc = joblib.load(str(fwd_scaler))
+        weights[0], biases[0] = fold_input_scaler(weights[0], biases[0], sc.mean_, sc.scale_)
+        NumpyMLP(weights, biases, acts).save(forward_npz_path(family))
+        written.append(forward_npz_path(family))
+
+    inv_path = MODELS_DIR / f"inverse_{family}.keras"
+    inv_scalerX = MODELS_DIR / f"inverse_{family}_scalerX.save"
+    inv_scalerY = MODELS_DIR / f"inverse_{family}_scalerY.save"
+    if inv_path.exists() and inv_scalerX.exists() and inv_scalerY.exists():
+        weights, biases, acts = _dense_layers(load_model(str(inv_path)))
+        scX = joblib.load(str(inv_scalerX))
+        scY = joblib.load(str(inv_scalerY))
+        weights[0], biases[0] = fold_input_scaler(weights[0], biases[0], scX.mean_, scX.scale_)
+        weights[-1], biases[-1] = fold_output_scaler(weights[-1], biases[-1], scY.mean_, scY.scale_)
+        NumpyMLP(weights, biases, acts).save(inverse_npz_path(family))
+        written.append(inverse_npz_path(family))
+    return written
+
+def export_all(families=FAMILIES):
+    written = []
+    for fam in families:
+        paths = export_family(fam)
+        print(f"[numpy_runtime] exported {fam}: {[p.name for p in paths]}")
+        written += paths
+    return written
+
+def check_parity(families=FAMILIES, n=512, rtol=1e-4, seed=RANDOM_SEED):
+    """
+    Compare Keras and NumPy outputs on random forward inputs and inverse targets.
+    Returns {family: (max_rel_err_forward, max_rel_err_inverse)}; raises AssertionError past rtol.
+    """
+    from ai_core.ai_core_manager import AICoreManager
+
+    keras_mgr = AICoreManager(backend="keras")
+    numpy_mgr = AICoreManager(backend="numpy")
+    rng = np.random.default_rng(seed)
+    results = {}
+    failures = []
+    for fam in families:
+        # inputs around what the inverse model produces for the usual target range
+        targets = np.column_stack([rng.uniform(1.0, 10.0, n), rng.uniform(50.0, 800.0, n)])
+        params = keras_mgr.predict_inverse_batch(fam, targets)
+        params *= rng.uniform(0.8, 1.2, params.shape)
+
+        errs = []
+        for ref, got in (
+            (keras_mgr.predict_forward_batch(fam, params), numpy_mgr.predict_forward_batch(fam, params)),
+            (keras_mgr.predict_inverse_batch(fam, targets), numpy_mgr.predict_inverse_batch(fam, targets)),
+        ):
+            # relative to each output column's magnitude, so near-zero entries don't dominate
+            col_scale = np.maximum(np.abs(ref).max(axis=0), 1e-12)
+            errs.append(float(np.max(np.abs(got - ref) / col_scale)))
+        results[fam] = tuple(errs)
+        status = "ok" if max(errs) <= rtol else "FAIL"
+        if status == "FAIL":
+            failures.append(fam)
+        print(f"[numpy_runtime] {fam:14s} forward={errs[0]:.2e} inverse={errs[1]:.2e} {status}")
+    assert not failures, f"NumPy runtime differs from Keras for: {failures}"
+    return results
+
+
+if __name__ == "__main__":
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "export"
+    fams = sys.argv[2:] or FAMILIES
+    if cmd == "export":
+        export_all(fams)
+    elif cmd == "check":
+        check_parity(fams)
+    else:
+        print("usage: python -m ai_core.numpy_runtime [export|check] [family ...]")
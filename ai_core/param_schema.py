@@ -0,0 +1,109 @@
+# ai_core/param_schema.py
+"""
+Per-family parameter schema: what each slot of the 5-element params vector
+means, its bounds and which slots the family does not use.
+
+    params = [param_a, param_b, feed_width_m, substrate_h, eps_r]
+
+Unused slots are fixed (lo == hi) at the value the dataset generator writes.
+The bounds live in (len(FAMILIES)+1, 5) arrays, the last row being a generic
+fallback for unknown family names, so clamp / normalize / denormalize work
+on (N,5) batches of mixed families in one NumPy expression. Used by
+ParameterEngine clamping, the AICoreManager optimizers, design sweeps, the
+surrogate index and the dataset generator.
+"""
+import numpy as np
+from ai_core.ai_config import *
+
+PARAM_SLOTS = ('param_a', 'param_b', 'feed_width_m', 'substrate_h', 'eps_r')
+
+_H = ("substrate_h", SUBSTRATE_H_RANGE)
+_EPS = ("eps_r", EPS_R_RANGE)
+_UNUSED = (None, (0.0, 0.0))
+
+# family -> (name, (lo, hi)) per slot; name None = slot not used by the family
+SCHEMAS = {
+    "patch_rect":    [("width", PATCH_W_RANGE), ("length", PATCH_L_RANGE), ("feed_width", FEED_W_RANGE), _H, _EPS],
+    "patch_circ":    [("radius", CIRC_RADIUS_RANGE), _UNUSED, ("feed_width", FEED_W_RANGE), _H, _EPS],
+    "patch_meander": [("width", PATCH_W_RANGE), ("length", PATCH_L_RANGE), ("feed_width", FEED_W_RANGE), _H, _EPS],
+    "patch_u-slot":  [("width", PATCH_W_RANGE), ("length", PATCH_L_RANGE), ("feed_width", FEED_W_RANGE), _H, _EPS],
+    "patch_e-shape": [("width", PATCH_W_RANGE), ("length", PATCH_L_RANGE), ("feed_width", FEED_W_RANGE), _H, _EPS],
+    "monopole":      [("length", MONOPOLE_LENGTH_RANGE), ("width", MONOPOLE_WIDTH_RANGE), _UNUSED, _H, _EPS],
+    "dipole":        [("length", DIPOLE_LENGTH_RANGE), ("width", DIPOLE_WIDTH_RANGE), _UNUSED, _H, _EPS],
+    "cpw_uwb":       [("width", CPW_W_RANGE), _UNUSED, _UNUSED, _H, _EPS],
+    "slot":          [("slot_width", SLOT_W_RANGE), _UNUSED, _UNUSED, _H, _EPS],
+    "vivaldi":       [("mouth_width", VIVALDI_MOUTH_RANGE), _UNUSED, _UNUSED, _H, _EPS],
+}
+_FALLBACK = [("param_a", (1e-4, 0.2)), ("param_b", (1e-4, 0.2)), ("feed_width", (1e-4, 0.02)), _H, _EPS]
+
+FAMILY_TO_ROW = {f: i for i, f in enumerate(FAMILIES)}
+_ROWS = [SCHEMAS[f] for f in FAMILIES] + [_FALLBACK]
+LO = np.array([[b[0] for _, b in r] for r in _ROWS], dtype=float)
+HI = np.array([[b[1] for _, b in r] for r in _ROWS], dtype=float)
+FIXED = LO == HI
+SPAN = np.where(FIXED, 1.0, HI - LO)  # 1 on fixed slots so normalize never divides by 0
+
+
+def family_rows(families, n=None):
+    """
+    Row index into LO / HI per params row. families: one name (repeated n times),
+    a sequence of names, or an int array of rows (returned as is).
+    """
+    if isinstance(families, np.ndarray) and families.dtype.kind in "iu":
+        return families
+    if isinstance(families, str):
+        return np.full(1 if n is None else n, FAMILY_TO_ROW.get(families, len(FAMILIES)), dtype=int)
+    rows = np.array([FAMILY_TO_ROW.get(f, len(FAMILIES)) for f in families], dtype=int)
+    if n is not None and rows.shape[0] != n:
+        raise ValueError(f"Expected {n} family names, got {rows.shape[0]}")
+    return rows
+
+def slot_names(family):
+    # per-slot meaning for this family (None = unused)
+    return [name for name, _ in SCHEMAS.get(family, _FALLBACK)]
+
+def param_range(family, slot):
+    """
+    (lo, hi) of one slot, by index or PARAM_SLOTS name.
+    """
+    i = PARAM_SLOTS.index(slot) if isinstance(slot, str) else int(slot)
+    r = FAMILY_TO_ROW.get(family, len(FAMILIES))
+    return float(LO[r, i]), float(HI[r, i])
+
+def bounds(family):
+    # optimizer bounds: 5 (lo, hi) pairs, (x, x) marks a fixed slot
+    r = FAMILY_TO_ROW.get(family, len(FAMILIES))
+    return [(float(a), float(b)) for a, b in zip(LO[r], HI[r])]
+
+def free_mask(family):
+    return ~FIXED[FAMILY_TO_ROW.get(family, len(FAMILIES))]
+
+def clamp(families, P):
+    """
+    Clip (N,5) params into each row's family bounds; NaN/inf become 0 first,
+    fixed slots take their fixed value.
+    """
+    P = np.nan_to_num(np.atleast_2d(np.asarray(P, dtype=float)), nan=0.0, posinf=0.0, neginf=0.0)
+    rows = family_rows(families, P.shape[0])
+    return np.clip(P, LO[rows], HI[rows])
+
+def normalize(families, P):
+    # (N,5) params -> unit box per family bounds (fixed slots -> 0)
+    P = np.atleast_2d(np.asarray(P, dtype=float))
+    rows = family_rows(families, P.shape[0])
+    return np.where(FIXED[rows], 0.0, (P - LO[rows]) / SPAN[rows])
+
+def denormalize(families, U):
+    # unit box -> (N,5) params; fixed slots take their fixed value
+    U = np.atleast_2d(np.asarray(U, dtype=float))
+    rows = family_rows(families, U.shape[0])
+    return LO[rows] + np.where(FIXED[rows], 0.0, U) * SPAN[rows]
+
+def sample(families, n=None, rng=None):
+    """
+    Uniform params inside each row's family bounds: one family name and n rows,
+    or a sequence of names (one row each).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    rows = family_rows(families, n)
+    return denormalize(rows, rng.random((rows.shape[0], len(PARAM_SLOTS))))
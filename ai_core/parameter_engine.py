@@ -1,24 +1,17 @@
-import os
-import time
 import numpy as np
-import joblib
 
 from ai_core.ai_core_manager import AICoreManager
-from ai_core.ai_config import (
-    FAMILIES,
-    PATCH_W_RANGE, PATCH_L_RANGE, FEED_W_RANGE,
-    MONOPOLE_LENGTH_RANGE, MONOPOLE_WIDTH_RANGE,
-    DIPOLE_LENGTH_RANGE, DIPOLE_WIDTH_RANGE,
-)
-
-CORRECTION_MODEL_PATH = r"feedback\ai_quick_retrain.save"
+from ai_core.model_watcher import ModelWatcher
+from ai_core import param_schema
+from ai_core.ai_config import FAMILIES, CORRECTION_POLL_INTERVAL, CORRECTION_MODEL_PATH
+from feedback.ai_quick_retrain import X_COLS as CORRECTION_COLS
 
 class ParameterEngine:
     def __init__(
             self,
             alpha=0.3, # correction step size (ex. 0.2 or 0.4)
             exploration_sigma=0.03, # ultiplicative noise level
-            reload_interval=300 # seconds between correction model reloads
+            reload_interval=CORRECTION_POLL_INTERVAL # seconds between checks of the correction model file
     ):
         self.ai_mgr = AICoreManager()
         self.alpha = float(alpha)
@@ -27,77 +20,80 @@ class ParameterEngine:
 
         self.family_to_id = {f: i for i, f in enumerate(FAMILIES)}
 
-        self._correction_model = None
-        self._last_reload_time = 0.0
-        self._load_correction_model(force=True)
+        # loads now, then reloads in the background only when the file changes
+        self._correction = ModelWatcher(str(CORRECTION_MODEL_PATH), interval=reload_interval, name="correction")
+        self.correction_failures = 0
+        self.last_correction_error = None
+        self._logged_errors = set()
     
     #----------------------------------------------------------------------
     #       Internal Methods
     #----------------------------------------------------------------------
 
-    def _load_correction_model(self, force=False):
-        # load or reload the correction model if enough time has passed
-        now = time.time()
-        if not force and (now - self._last_reload_time) < self.reload_interval:
-            return
-        
-        self._last_reload_time = now
-        self._correction_model = None
+    @property
+    def _correction_model(self):
+        return self._correction.model
 
-        if os.path.exists(CORRECTION_MODEL_PATH):
-            try:
-                self._correction_model = joblib.load(CORRECTION_MODEL_PATH)
-            except:
-                self._correction_model = None
-    
-    def _apply_exploration(self, params):
-        # Small multiplicative noise to avoid stagnation
+    def _apply_exploration(self, params, rng=None):
+        # Small multiplicative noise to avoid stagnation, params: (N,5)
 
-        noise = np.random.normal(
+        rng = np.random.default_rng() if rng is None else rng
+        noise = rng.normal(
             loc=0.0,
             scale=self.exploration_sigma,
-            size=len(params)
+            size=np.shape(params)
         )
         return params * (1.0 + noise)
-    
+
+    def _clamp_params_batch(self, families, P):
+        # Safety feature to limit cst crashes, P: (N,5), bounds from param_schema
+        return param_schema.clamp(families, P)
+
     def _clamp_params(self, family, params):
-        # Safety feature to limit cst crashes
-
-        p = np.array(params, dtype = float)
-        p = np.nan_to_num(p, nan=0.0, posinf=0.0, neginf=0.0)
-
-        # Normal Structure : [param_a, param_b, feed_width, substrate_h, eps_r]
-
-        if family.startswith("patch"):
-            p[0] = np.clip(p[0], *PATCH_W_RANGE)
-            p[1] = np.clip(p[1], *PATCH_L_RANGE)
-            p[2] = np.clip(p[2], *FEED_W_RANGE)
-            p[3] = np.clip(p[3], 0.0005, 0.005)
-            p[4] = np.clip([4], 2.0, 10.0)  # default eps_r=4.0
-        
-        elif family == "monopole":
-            p[0] = np.clip(p[0], *MONOPOLE_LENGTH_RANGE)
-            p[1] = np.clip(p[1], *MONOPOLE_WIDTH_RANGE)
-            p[2] = 0.0  # feed_width not used
-            p[3] = np.clip(p[3], 0.0005, 0.005)
-            p[4] = np.clip([4], 2.0, 10.0)  
-        
-        elif family == "dipole":
-            p[0] = np.clip(p[0], *DIPOLE_LENGTH_RANGE)
-            p[1] = np.clip(p[1], *DIPOLE_WIDTH_RANGE)
-            p[2] = 0.0  # feed_width not used
-            p[3] = np.clip(p[3], 0.0005, 0.005)
-            p[4] = np.clip([4], 2.0, 10.0)  
-        
-        else:
-            # General fallback
-            p[0:2] = np.clip(p[0:2], 1e-4, 0.2)
-            p[2] = np.clip(p[2], 1e-4, 0.02)
-            p[3] = np.clip(p[3], 0.0005, 0.005)
-            p[4] = np.clip([4], 2.0, 10.0)
-        
-        return p.tolist()
-    
+        return self._clamp_params_batch(family, [params])[0].tolist()
+
+    @staticmethod
+    def _correction_features(model, rows, Fr, BW, params):
+        # (N, k) correction-model input in the model's feature_cols order
+        # (feedback/ai_quick_retrain.py X_COLS)
+        known = {"family_id": rows, "target_Fr_GHz": Fr, "target_BW_MHz": BW}
+        known.update({f"param_{i}": params[:, i] for i in range(params.shape[1])})
+        cols = list(model.get("feature_cols", CORRECTION_COLS))
+        missing = [c for c in cols if c not in known]
+        if missing:
+            raise ValueError(f"correction model needs features not known before simulation: {missing} "
+                             f"(retrain it with feedback/ai_quick_retrain.py)")
+        return np.column_stack([known[c] for c in cols]).astype(float)
+
+    def _correction_failed(self, e):
+        # counted on every call, printed once per distinct error
+        self.correction_failures += 1
+        self.last_correction_error = f"{type(e).__name__}: {e}"
+        if self.last_correction_error not in self._logged_errors:
+            self._logged_errors.add(self.last_correction_error)
+            print(f"[parameter_engine] correction skipped: {self.last_correction_error}")
+
+    def _corrected_batch(self, families, rows, Fr, BW, model):
+        # Inverse prediction plus learned correction (model None = no correction),
+        # before exploration and clamping: (N,5)
+
+        params = self.ai_mgr.predict_inverse_batch(list(families), np.column_stack([Fr, BW]))
+
+        if model is not None:
+            try:
+                X = self._correction_features(model, rows, Fr, BW, params)
+
+                Xn = (X - model['X_mean']) / model['X_std']
+                delta_norm = model["sk_model"].predict(Xn)
+                delta = delta_norm * model['y_std'] + model['y_mean']
+
+                params = params + self.alpha * delta
+
+            except Exception as e:
+                self._correction_failed(e)
+
+        return params
+
     #----------------------------------------------------------------------
     #       Public Methods
     #----------------------------------------------------------------------
@@ -108,48 +104,79 @@ class ParameterEngine:
             target_Fr,
             target_BW,
             explore=True,
-            apply_correction=True
+            apply_correction=True,
+            seed=None
     ):
         # Uniiversal parameter prediction method
         # Used By UI, Automatic Self Training Mode, Goal-Seeking Mode
 
-        self._load_correction_model()
+        return self.predict_batch(
+            [family], [target_Fr], [target_BW],
+            explore=explore, apply_correction=apply_correction, seed=seed
+        )[0].tolist()
 
-        base_params = self.ai_mgr.predict_inverse(
-            family, target_Fr, target_BW
-        )
-        params = np.array(base_params, dtype=float)
-
-        if apply_correction and self._correction_model is not None:
-            try:
-                fam_id = self.family_to_id[family]
-
-                X = np.array([[
-                    fam_id,
-                    target_Fr,
-                    target_BW,
-                    *params
-                ]])
-
-                Xn = (X - self._correction_model['X_mean']) / self._correction_model['X_std']
-                delta_norm = self._correction_model["sk_model"].predict(Xn)[0]
-                delta = (
-                    delta_norm * self._correction_model['y_std']
-                    + self._correction_model['y_mean']
+    def predict_batch(
+            self,
+            families,
+            target_Fr,
+            target_BW,
+            explore=True,
+            apply_correction=True,
+            seed=None
+    ):
+        # predict() for N targets as whole-array operations
+        # families: one family name or N names, target_Fr / target_BW: N values
+        # seed: exploration noise seed for this call (None = fresh entropy)
+        # returns: (N,5) array of clamped params
+
+        # one snapshot for the whole call, even if the watcher swaps in a new model meanwhile
+        correction = self._correction.snapshot
+        model = correction.model if apply_correction else None
+
+        Fr = np.atleast_1d(np.asarray(target_Fr, dtype=float))
+        BW = np.atleast_1d(np.asarray(target_BW, dtype=float))
+        n = Fr.shape[0]
+        if isinstance(families, str):
+            families = [families]*n
+        rows = param_schema.family_rows(families, n)
+
+        # Cached values are taken before exploration, so noise still applies on a hit
+        cache = self.ai_mgr.result_cache
+        if cache is not None:
+            use_correction = model is not None
+            params = np.empty((n, 5))
+            keys, fingerprints, miss = [], {}, []
+            for i, fam in enumerate(families):
+                if fam not in fingerprints:
+                    fingerprints[fam] = self.ai_mgr.model_fingerprint(fam) + (
+                        correction.fingerprint if use_correction else ()
+                    )
+                keys.append(cache.key("engine", fam, Fr[i], BW[i], use_correction, self.alpha))
+                hit = cache.get(keys[i], fingerprints[fam])
+                if hit is None:
+                    miss.append(i)
+                else:
+                    params[i] = hit
+            if miss:
+                miss = np.array(miss)
+                params[miss] = self._corrected_batch(
+                    [families[i] for i in miss], rows[miss], Fr[miss], BW[miss], model
                 )
+                for i in miss:
+                    cache.put(keys[i], params[i].copy(), fingerprints[families[i]])
+        else:
+            params = self._corrected_batch(families, rows, Fr, BW, model)
 
-                params = params + self.alpha * delta
-
-            except Exception:
-                pass
-        
         if explore:
-            params = self._apply_exploration(params)
-        
-        params = self._clamp_params(family, params)
+            params = self._apply_exploration(params, np.random.default_rng(seed))
+
+        return self._clamp_params_batch(rows, params)
+
+    def correction_stats(self):
+        # correction model version, load time, reload counters and failed applications
+        return {**self._correction.metrics(), "failures": self.correction_failures,
+                "last_error": self.last_correction_error}
 
-        return params
-    
     def refine(
             self,
             family,
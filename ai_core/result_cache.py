@@ -0,0 +1,149 @@
+# ai_core/result_cache.py
+"""
+Bounded cache for inverse predictions and optimizer results.
+
+Keys are the family plus the target quantized to a fixed resolution
+(default 1 MHz on Fr, 0.1 MHz on BW), so near-identical requests from the UI
+and automate.py share one entry. Entries expire by LRU order and an optional
+TTL, and each one stores a fingerprint of the files it was computed from;
+a lookup whose current fingerprint differs (model retrained, correction
+model republished) is treated as a miss and dropped.
+"""
+import atexit
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import joblib
+
+
+def file_fingerprint(paths):
+    # (name, mtime, size) of each existing file; changes when a file is rewritten
+    fp = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+        except OSError:
+            continue
+        fp.append((str(p), st.st_mtime_ns, st.st_size))
+    return tuple(fp)
+
+
+class ResultCache:
+    def __init__(
+            self,
+            max_entries=4096,
+            ttl=None,               # seconds, None = no expiry
+            fr_resolution=0.001,    # GHz (1 MHz)
+            bw_resolution=0.1,      # MHz
+            path=None,              # optional on-disk persistence
+            autosave_every=32       # puts between saves when path is set
+    ):
+        self.max_entries = int(max_entries)
+        self.ttl = ttl
+        self.fr_resolution = float(fr_resolution)
+        self.bw_resolution = float(bw_resolution)
+        self.path = path
+        self.autosave_every = autosave_every
+        self._entries = OrderedDict()  # key -> (value, fingerprint, stored_at)
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self._counters = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "evictions": 0}
+        if path is not None:
+            self.load()
+            atexit.register(self.save)
+
+    def key(self, kind, family, Fr_GHz, BW_MHz, *extra):
+        return (
+            kind, family,
+            int(round(float(Fr_GHz) / self.fr_resolution)),
+            int(round(float(BW_MHz) / self.bw_resolution)),
+            *extra
+        )
+
+    def get(self, key, fingerprint=()):
+        """
+        returns: a copy of the cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            value, fp, stored_at = entry
+            if fp != fingerprint:
+                del self._entries[key]
+                self._counters["stale"] += 1
+                self._counters["misses"] += 1
+                return None
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return copy.deepcopy(value)
+
+    def put(self, key, value, fingerprint=()):
+        with self._lock:
+            self._entries[key] = (copy.deepcopy(value), fingerprint, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+            self._dirty += 1
+            autosave = self.path is not None and self._dirty >= self.autosave_every
+        if autosave:
+            self.save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "max_entries": self.max_entries}
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = list(self._entries.items())
+            self._dirty = 0
+        tmp = str(self.path) + ".tmp"
+        joblib.dump(
+            {"fr_resolution": self.fr_resolution, "bw_resolution": self.bw_resolution, "entries": snapshot},
+            tmp
+        )
+        os.replace(tmp, str(self.path))
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            data = joblib.load(self.path)
+        except Exception as e:
+            print(f"[result_cache] ignoring unreadable cache file {self.path}: {e}")
+            return
+        # keys depend on the quantization, entries from another resolution are useless
+        if (data.get("fr_resolution"), data.get("bw_resolution")) != (self.fr_resolution, self.bw_resolution):
+            return
+        with self._lock:
+            for key, entry in data.get("entries", []):
+                self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
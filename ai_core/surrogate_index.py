@@ -0,0 +1,141 @@
+# ai_core/surrogate_index.py
+"""
+Precomputed (Fr, BW) response index per family.
+
+build_index() runs the family's forward model over a scrambled Sobol sample
+of the optimizer bounds and keeps the (params, Fr, BW) table on disk under
+models/surrogate_index/. SurrogateIndex.query() returns the k designs whose
+predicted response is closest to a target, using a KD-tree in the same
+metric as the optimizer loss. Used as multi-start seeds in
+optimize_parameters and as a fast inverse lookup (AICoreManager.nearest_designs).
+
+Each inference backend (keras, numpy, multi) keeps its own file, so
+switching INFERENCE_BACKEND does not overwrite the other backends' indexes.
+The stored file records a content digest of the forward model files and the
+bounds it was sampled from; load_or_build_index() rebuilds when either changes.
+
+    python -m ai_core.surrogate_index build [family ...]
+"""
+import hashlib
+import sys
+import numpy as np
+from pathlib import Path
+from scipy.spatial import cKDTree
+from scipy.stats import qmc
+from ai_core.ai_config import *
+from ai_core import param_schema
+
+INDEX_DIR = Path(MODELS_DIR) / "surrogate_index"
+
+# BW axis scale so Euclidean distance matches target_loss: (dFr)^2 + 0.001*(dBW)^2
+BW_METRIC_SCALE = np.sqrt(0.001)
+
+def index_path(family, backend=INFERENCE_BACKEND):
+    return INDEX_DIR / f"surrogate_{family}_{backend}.npz"
+
+def model_digest(paths, bounds, n_samples):
+    # content digest, stable across checkouts (unlike mtimes)
+    h = hashlib.sha1()
+    for p in paths:
+        p = Path(p)
+        if p.exists():
+            h.update(p.name.encode())
+            h.update(p.read_bytes())
+    h.update(np.asarray(bounds, dtype=float).tobytes())
+    h.update(str(int(n_samples)).encode())
+    return h.hexdigest()
+
+
+class SurrogateIndex:
+    def __init__(self, family, params, outputs, digest=""):
+        """
+        params: (N,5) designs, outputs: (N,2) forward predictions [Fr_GHz, BW_MHz]
+        """
+        self.family = family
+        self.params = np.asarray(params, dtype=float)
+        self.outputs = np.asarray(outputs, dtype=float)
+        self.digest = digest
+        self._tree = cKDTree(self._metric(self.outputs))
+
+    @staticmethod
+    def _metric(outputs):
+        outputs = np.atleast_2d(outputs)
+        return np.column_stack([outputs[:, 0], outputs[:, 1] * BW_METRIC_SCALE])
+
+    def __len__(self):
+        return self.params.shape[0]
+
+    def query(self, Fr_GHz, BW_MHz, k=8):
+        """
+        returns: (params (k,5), predicted outputs (k,2), loss (k,)) nearest first
+        """
+        k = min(int(k), len(self))
+        dist, idx = self._tree.query(self._metric([[Fr_GHz, BW_MHz]])[0], k=k)
+        idx = np.atleast_1d(idx)
+        return self.params[idx], self.outputs[idx], np.atleast_1d(dist)**2
+
+    def save(self, path):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(str(path) + ".tmp.npz")
+        np.savez(str(tmp), params=self.params.astype(np.float32),
+                 outputs=self.outputs.astype(np.float32), digest=np.array(self.digest))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, family, path):
+        data = np.load(str(path), allow_pickle=False)
+        return cls(family, data["params"], data["outputs"], str(data["digest"]))
+
+
+def build_index(ai_mgr, family, n_samples=SURROGATE_INDEX_SAMPLES, seed=RANDOM_SEED):
+    """
+    Sample the family's optimizer bounds and record forward-model responses.
+    """
+    bounds = param_schema.bounds(family)
+    lo = np.array([b[0] for b in bounds], dtype=float)
+    hi = np.array([b[1] for b in bounds], dtype=float)
+    free = hi > lo
+
+    # Sobol wants a power of two for its balance properties
+    m = int(np.ceil(np.log2(max(int(n_samples), 2))))
+    U = qmc.Sobol(d=int(free.sum()), scramble=True, seed=seed).random_base2(m)
+    X = np.tile(lo, (U.shape[0], 1))
+    X[:, free] = lo[free] + U*(hi[free] - lo[free])
+
+    Y = np.concatenate([
+        ai_mgr.predict_forward_batch(family, X[i:i + INFERENCE_BATCH_SIZE])
+        for i in range(0, X.shape[0], INFERENCE_BATCH_SIZE)
+    ])
+    ok = np.all(np.isfinite(Y), axis=1)
+    digest = model_digest(ai_mgr.model_paths(family, "forward"), bounds, n_samples)
+    return SurrogateIndex(family, X[ok], Y[ok], digest)
+
+
+def load_or_build_index(ai_mgr, family, n_samples=SURROGATE_INDEX_SAMPLES, rebuild=False):
+    """
+    Load the stored index for family, rebuilding it if the forward model or bounds changed.
+    """
+    path = index_path(family, ai_mgr.backend)
+    digest = model_digest(ai_mgr.model_paths(family, "forward"), param_schema.bounds(family), n_samples)
+    if not rebuild and path.exists():
+        try:
+            index = SurrogateIndex.load(family, path)
+            if index.digest == digest:
+                return index
+        except Exception as e:
+            print(f"[surrogate_index] rebuilding unreadable index for {family}: {e}")
+    index = build_index(ai_mgr, family, n_samples=n_samples)
+    index.save(path)
+    print(f"[surrogate_index] built {family}: {len(index)} designs -> {path}")
+    return index
+
+
+if __name__ == "__main__":
+    from ai_core.ai_core_manager import AICoreManager
+
+    if len(sys.argv) < 2 or sys.argv[1] != "build":
+        print("usage: python -m ai_core.surrogate_index build [family ...]")
+        sys.exit(1)
+    mgr = AICoreManager()
+    for fam in sys.argv[2:] or FAMILIES:
+        load_or_build_index(mgr, fam, rebuild=True)
@@ -4,16 +4,18 @@ import random
 import os
 from datetime import datetime
 
-from ai_core.parameter_engine import ParameterEngine
+from ai_core.inference_service import make_engine
 from cst_interface.cst_driver_mode2 import CSTDriverMode2
 from feedback.feedback_logger import log_feedback
 from feedback.ai_quick_retrain import quick_retrain
-from ai_core.ai_config import ANTENNA_PATH
+from feedback.retrain_worker import request_retrain, start_worker
+from ai_core.ai_config import ANTENNA_PATH, RETRAIN_BACKGROUND
+from ai_core.goal_seeker import GoalSeeker
+from ai_core.active_learning import ActiveTargetSelector
 
 # ----------------------------------------------------------
 # CONFIGURATION
 # ----------------------------------------------------------
-FEEDBACK_CSV = r"feedback\ai_feedback_mode2.csv"
 
 # define a frequency sweep range (GHz)
 FREQ_MIN = 1.0
@@ -29,6 +31,15 @@ RUNS = None  # set to integer if you want a fixed number
 # delay between runs (so you don’t overload CST)
 DELAY_SECONDS = 3
 
+# goal-seeking: re-run CST with Jacobian/Broyden steps until the target is
+# within tolerance (GOAL_* in ai_config); False = one simulation per target
+GOAL_SEEK = False
+
+# target choice: "random" (uniform in the ranges above) or "uncertainty"
+# (candidates where the inverse and forward models disagree most, kept
+# diverse; ACQ_* in ai_config)
+TARGET_SELECTION = "random"
+
 # substrate and conductor pool
 SUBSTRATES = [
     "FR-4 (lossy)",
@@ -46,7 +57,7 @@ CONDUCTORS = [
 # INITIALIZE
 # ----------------------------------------------------------
 
-engine = ParameterEngine()
+engine = make_engine()  # ParameterEngine, or the shared inference service
 cst = CSTDriverMode2()
 
 print("\n==============================================================")
@@ -66,6 +77,27 @@ def random_targets():
     return round(f, 4), round(bw, 3)
 
 
+_selectors = {}  # family -> ActiveTargetSelector
+
+
+def select_targets(family):
+    """Next (Fr, BW) target according to TARGET_SELECTION."""
+    if TARGET_SELECTION != "uncertainty":
+        return random_targets()
+    if family not in _selectors:
+        _selectors[family] = ActiveTargetSelector(
+            engine.ai_mgr, family, (FREQ_MIN, FREQ_MAX), (BW_MIN, BW_MAX)
+        )
+    f, bw = _selectors[family].next_target()
+    return round(f, 4), round(bw, 3)
+
+
+def observe_design(family, params):
+    """Tell the family's selector which design went to CST."""
+    if family in _selectors:
+        _selectors[family].observe(params)
+
+
 def random_family():
     """Pick a random antenna family."""
     return 'patch_rect'
@@ -75,67 +107,100 @@ def random_materials():
     """Random substrate and conductor."""
     return random.choice(SUBSTRATES), random.choice(CONDUCTORS)
 
+# ----------------------------------------------------------
+# MODEL WARM-UP
+# ----------------------------------------------------------
+
+def warmup_models():
+    """Compile inference graphs for the families in use before the first cycle."""
+    for fam, r in engine.ai_mgr.warmup([random_family()]).items():
+        if "error" in r:
+            print(f"Warm-up failed for {fam}: {r['error']}")
+        else:
+            print(f"Warm-up {fam}: first call {r['cold_s']*1e3:.1f} ms -> {r['warm_s']*1e3:.1f} ms")
+
 # ----------------------------------------------------------
 # MAIN LOOP EXECUTION
 # ----------------------------------------------------------
 
+def simulate(family, target_Fr, target_BW, params, substrate, conductor):
+    """Run one CST simulation of params and log it as feedback."""
+    # CST parameter mapping
+    cst_params = {
+        "patch_W": params[0],
+        "patch_L": params[1],
+        "eps_eff": 1.0,
+        "substrate_h": params[3],
+        "eps_r": params[4],
+        "feed_width": params[2],
+        "substrate_W": params[0] + 6 * params[3],
+        "substrate_L": params[1] + 6 * params[3],
+        "feed_type": 0
+    }
+
+    print("Running CST...")
+    cst.standard_antenna(
+        "Microstrip Patch",
+        "Rectangular",
+        target_Fr,
+        substrate,
+        conductor,
+        cst_params
+    )
+
+    Fr_actual, BW_actual, S11 = cst.extract_s11_results(ANTENNA_PATH)
+
+    print(f"CST → Fr={Fr_actual:.4f} GHz, BW={BW_actual:.2f} MHz, S11={S11:.2f} dB")
+
+    # Log consistent feedback (params actually used)
+    log_feedback(
+        family,
+        target_Fr,
+        target_BW,
+        params[:5],
+        Fr_actual,
+        BW_actual,
+        S11
+    )
+    return Fr_actual, BW_actual, S11
+
+
 def run_cycle():
     try:
         family = random_family()
-        target_Fr, target_BW = random_targets()
+        target_Fr, target_BW = select_targets(family)
         substrate, conductor = random_materials()
 
         print(f"\n[{datetime.now()}] Cycle start")
         print(f"Family={family}, Target Fr={target_Fr} GHz, BW={target_BW} MHz")
 
-        # Unified parameter prediction (inverse + correction + exploration)
-        params = engine.predict(
-            family=family,
-            target_Fr=target_Fr,
-            target_BW=target_BW,
-            explore=True
-        )
-
-        # CST parameter mapping
-        cst_params = {
-            "patch_W": params[0],
-            "patch_L": params[1],
-            "eps_eff": 1.0,
-            "substrate_h": params[3],
-            "eps_r": params[4],
-            "feed_width": params[2],
-            "substrate_W": params[0] + 6 * params[3],
-            "substrate_L": params[1] + 6 * params[3],
-            "feed_type": 0
-        }
-
-        print("Running CST...")
-        cst.standard_antenna(
-            "Microstrip Patch",
-            "Rectangular",
-            target_Fr,
-            substrate,
-            conductor,
-            cst_params
-        )
-
-        Fr_actual, BW_actual, S11 = cst.extract_s11_results(ANTENNA_PATH)
-
-        print(f"CST → Fr={Fr_actual:.4f} GHz, BW={BW_actual:.2f} MHz, S11={S11:.2f} dB")
-
-        # Log consistent feedback (params actually used)
-        log_feedback(
-            family,
-            target_Fr,
-            target_BW,
-            params[:5],
-            Fr_actual,
-            BW_actual,
-            S11
-        )
-
-        # Incremental correction learning
-        quick_retrain()
+        if GOAL_SEEK:
+            # every CST run of the search is logged as feedback too
+            result = GoalSeeker(engine).seek(
+                family, target_Fr, target_BW,
+                lambda p: simulate(family, target_Fr, target_BW, p, substrate, conductor)
+            )
+            for step in result['history']:
+                observe_design(family, step['params'])
+            status = "reached" if result['success'] else "not reached"
+            print(f"Goal {status} after {result['n_solves']} CST runs: "
+                  f"Fr={result['Fr']:.4f} GHz, BW={result['BW']:.2f} MHz")
+        else:
+            # Unified parameter prediction (inverse + correction + exploration)
+            params = engine.predict(
+                family=family,
+                target_Fr=target_Fr,
+                target_BW=target_BW,
+                explore=True
+            )
+            simulate(family, target_Fr, target_BW, params, substrate, conductor)
+            observe_design(family, params)
+
+        # Incremental correction learning (in the retrain worker, or inline)
+        if RETRAIN_BACKGROUND:
+            request_retrain()
+        else:
+            quick_retrain()
 
         print("Cycle complete ✔")
 
@@ -147,6 +212,9 @@ def run_cycle():
 # ----------------------------------------------------------
 
 def main():
+    if RETRAIN_BACKGROUND:
+        start_worker()
+    warmup_models()
     count = 0
     while True:
         run_cycle()
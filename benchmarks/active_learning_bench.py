@@ -0,0 +1,93 @@
+# benchmarks/active_learning_bench.py
+# Model error vs solver calls: uncertainty-driven target selection vs random targets.
+#
+# Each selected target is designed with ParameterEngine.predict and "solved"
+# with the synthetic cavity solver of goal_seek_bench (board and loss model
+# differ from the training data). A residual model (GP on the normalized
+# design, the same role as the quick-retrain correction) is refit after each
+# batch, and the error of forward model + residual is measured on designs for
+# a fixed set of held-out targets.
+#
+#   python benchmarks/active_learning_bench.py [solver_calls] [repeats]
+import sys
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import *
+from ai_core import param_schema
+from ai_core.active_learning import ActiveTargetSelector, candidate_pool
+from ai_core.parameter_engine import ParameterEngine
+from benchmarks.goal_seek_bench import SyntheticSolver, FAMILY
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import RBF, WhiteKernel
+
+FR_RANGE = (1.0, 10.0)   # automate.py FREQ_MIN / FREQ_MAX
+BW_RANGE = (50.0, 800.0)  # automate.py BW_MIN / BW_MAX
+
+
+def features(params):
+    return param_schema.normalize(FAMILY, params)[:, param_schema.free_mask(FAMILY)]
+
+
+def model_error(engine, X, Y, test_params, test_actual):
+    # mean relative |solver - (forward + residual)| on the held-out designs
+    pred = engine.ai_mgr.predict_forward_batch(FAMILY, test_params)
+    if len(X) >= 2:
+        base = engine.ai_mgr.predict_forward_batch(FAMILY, X)
+        gp = GaussianProcessRegressor(RBF(0.2) + WhiteKernel(1e-3), normalize_y=True)
+        gp.fit(features(X), np.asarray(Y) - base)
+        pred = pred + gp.predict(features(test_params))
+    rel = np.abs(pred - test_actual) / np.abs(test_actual)
+    return float(np.mean(rel))
+
+
+def run(engine, pick, n_calls, test_params, test_actual, observe=None):
+    solver = SyntheticSolver()
+    X, Y, curve = [], [], []
+    while solver.calls < n_calls:
+        for Fr, BW in pick():
+            params = engine.predict(FAMILY, Fr, BW, explore=False)
+            if observe is not None:
+                observe(params)
+            X.append(params)
+            Y.append(solver(params))
+        curve.append((solver.calls, model_error(engine, np.array(X), Y, test_params, test_actual)))
+    return curve
+
+
+def main(n_calls=96, repeats=3):
+    engine = ParameterEngine()
+    rng = np.random.default_rng(RANDOM_SEED)
+    test_targets = candidate_pool(300, FR_RANGE, BW_RANGE, rng)
+    test_params = engine.predict_batch(FAMILY, test_targets[:, 0], test_targets[:, 1], explore=False)
+    solver = SyntheticSolver()
+    test_actual = np.array([solver(p) for p in test_params])
+
+    curves = {"random": [], "uncertainty": []}
+    for rep in range(repeats):
+        r_rng = np.random.default_rng(rep)
+        curves["random"].append(run(
+            engine, lambda: candidate_pool(ACQ_BATCH_SIZE, FR_RANGE, BW_RANGE, r_rng),
+            n_calls, test_params, test_actual))
+
+        sel = ActiveTargetSelector(engine.ai_mgr, FAMILY, FR_RANGE, BW_RANGE, seed=rep)
+        curves["uncertainty"].append(run(engine, sel.next_batch, n_calls, test_params, test_actual,
+                                         observe=sel.observe))
+
+    print(f"{FAMILY}, targets Fr {FR_RANGE} GHz / BW {BW_RANGE} MHz, batch {ACQ_BATCH_SIZE}, "
+          f"mean of {repeats} runs, error = mean relative |solver - model| on 300 held-out designs")
+    calls = [c for c, _ in curves["random"][0]]
+    print(f"{'solver calls':>12s} {'random':>10s} {'uncertainty':>12s}")
+    for i, c in enumerate(calls):
+        if c % (4*ACQ_BATCH_SIZE) and c != calls[-1]:
+            continue
+        r = np.mean([cv[i][1] for cv in curves["random"]])
+        u = np.mean([cv[i][1] for cv in curves["uncertainty"]])
+        print(f"{c:12d} {r:10.4f} {u:12.4f}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 96, int(args[1]) if len(args) > 1 else 3)
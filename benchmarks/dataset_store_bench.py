@@ -0,0 +1,78 @@
+# benchmarks/dataset_store_bench.py
+# Load time and peak memory of one family's training arrays:
+# pd.read_csv of the whole dataset + family filter (old trainers) vs the
+# partitioned float32 memmap store (dataset_store.py).
+#
+# Each measurement runs in a fresh interpreter, so peak RSS (ru_maxrss) is not
+# polluted by the other method; "baseline" is the same interpreter with the
+# imports only. Needs dataset_mode2.csv and the converted store.
+#
+#   python benchmarks/dataset_store_bench.py [family]
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PARAM_COLS = ['param_a', 'param_b', 'feed_width_m', 'substrate_h', 'eps_r']
+
+
+def load_csv(family):
+    import pandas as pd
+    from ai_core.ai_config import DATASET_PATH
+    df = pd.read_csv(DATASET_PATH)
+    df_f = df[df['family'] == family].copy()
+    X = df_f[PARAM_COLS].values
+    y = df_f[['freq_Hz', 'bandwidth_Hz']].to_numpy(copy=True)
+    y[:, 0] = y[:, 0] / 1e9
+    y[:, 1] = y[:, 1] / 1e6
+    return X, y
+
+def load_store(family):
+    from dataset_store import DatasetStore
+    store = DatasetStore()
+    return store.load(family, "features"), store.load(family, "targets")
+
+
+def measure(method, family):
+    # child process: imports, then one timed load; prints a JSON line
+    import numpy as np
+    import pandas as pd  # imported up front in every mode: baseline RSS includes it
+    import dataset_store  # noqa: F401
+    t0 = time.perf_counter()
+    if method == "baseline":
+        n, checksum = 0, 0.0
+    else:
+        X, y = {"csv": load_csv, "store": load_store}[method](family)
+        n, checksum = len(X), float(np.sum(X, dtype=np.float64) + np.sum(y, dtype=np.float64))  # touch every value
+    t = time.perf_counter() - t0
+    print(json.dumps({"method": method, "rows": n, "seconds": t, "checksum": checksum,
+                      "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def main(family="patch_rect"):
+    res = {}
+    for method in ("baseline", "csv", "store"):
+        out = subprocess.run([sys.executable, __file__, "--child", method, family], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout
+        res[method] = json.loads(out.strip().splitlines()[-1])
+
+    base = res["baseline"]["maxrss_mb"]
+    print(f"{family}: {res['store']['rows']} rows (checksum csv {res['csv']['checksum']:.4g}, "
+          f"store {res['store']['checksum']:.4g})")
+    print(f"{'method':8s} {'load + touch':>13s} {'peak RSS over baseline':>24s}")
+    for method in ("csv", "store"):
+        r = res[method]
+        print(f"{method:8s} {r['seconds']*1e3:10.1f} ms {r['maxrss_mb'] - base:20.1f} MB")
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        i = sys.argv.index("--child")
+        measure(sys.argv[i + 1], sys.argv[i + 2])
+    else:
+        main(sys.argv[1] if len(sys.argv) > 1 else "patch_rect")
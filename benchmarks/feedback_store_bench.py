@@ -0,0 +1,86 @@
+# benchmarks/feedback_store_bench.py
+# Per-cycle feedback cost: CSV append + full pd.read_csv (old feedback_logger /
+# quick_retrain) vs FeedbackStore buffered append + incremental read_since.
+#
+# The file starts with n_existing rows; every cycle appends one row and then
+# reads what the retrain step needs (the whole CSV, or the rows since the
+# last offset).
+#
+#   python benchmarks/feedback_store_bench.py [n_existing] [cycles]
+import csv
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import *
+from feedback.feedback_store import FeedbackStore, COLUMNS
+
+CSV_HEADER = (["timestamp", "family", "target_Fr_GHz", "target_BW_MHz"]
+              + [f"param_{i}" for i in range(5)]
+              + ["substrate_h", "eps_r", "actual_Fr_GHz", "actual_BW_MHz", "S11_dB"])
+
+
+def make_rows(n, rng):
+    P = rng.random((n, 5))
+    return [(time.time(), "patch_rect", 2.4, 100.0, *p, 2.3, 90.0, -15.0) for p in P.tolist()]
+
+
+def csv_cycle(path, row):
+    # feedback_logger.log_feedback + quick_retrain's read, as before the store
+    if not os.path.exists(path):
+        with open(path, "w", newline="") as f:
+            csv.writer(f).writerow(CSV_HEADER)
+    with open(path, "a", newline="") as f:
+        csv.writer(f).writerow(list(row[:9]) + [row[7], row[8]] + list(row[9:]))
+    return len(pd.read_csv(path).dropna())
+
+
+def main(n_existing=20000, cycles=200):
+    rng = np.random.default_rng(RANDOM_SEED)
+    seed_rows = make_rows(n_existing, rng)
+    rows = make_rows(cycles, rng)
+    tmp = tempfile.mkdtemp()
+
+    path = os.path.join(tmp, "feedback.csv")
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(CSV_HEADER)
+        for r in seed_rows:
+            w.writerow(list(r[:9]) + [r[7], r[8]] + list(r[9:]))
+    t0 = time.perf_counter()
+    for r in rows:
+        csv_cycle(path, r)
+    t_csv = (time.perf_counter() - t0) / cycles
+
+    store = FeedbackStore(os.path.join(tmp, "feedback.sqlite"))
+    store.append_many(seed_rows)
+    offset = store.last_id()
+    t0 = time.perf_counter()
+    seen = 0
+    for r in rows:
+        store.append(r[1], r[2], r[3], r[4:9], r[9], r[10], r[11], timestamp=r[0])
+        df, offset = store.read_since(offset)
+        seen += len(df)
+    t_store = (time.perf_counter() - t0) / cycles
+    assert seen == cycles and store.count() == n_existing + cycles
+
+    t0 = time.perf_counter()
+    full = store.read()
+    t_full = time.perf_counter() - t0
+    store.close()
+
+    print(f"{n_existing} existing rows, {cycles} cycles of append + read")
+    print(f"{'csv append + read_csv':32s} {t_csv*1e3:9.2f} ms/cycle")
+    print(f"{'store append + read_since':32s} {t_store*1e3:9.2f} ms/cycle  ({t_csv/t_store:.0f}x)")
+    print(f"{'store full read':32s} {t_full*1e3:9.2f} ms ({len(full)} rows, {len(COLUMNS)} typed columns)")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 20000, int(args[1]) if len(args) > 1 else 200)
@@ -0,0 +1,92 @@
+# benchmarks/goal_seek_bench.py
+# Solver calls needed to reach tolerance: GoalSeeker vs repeated ParameterEngine.refine.
+#
+# The "CST" here is the analytic cavity model the dataset generator uses for
+# patch_rect (resonance from L, bandwidth from W / h / eps_r), evaluated on a
+# different board (h, eps_r) with a different loss factor than the training
+# data, so it disagrees with the trained forward model the way a real solver does.
+#
+#   python benchmarks/goal_seek_bench.py [n_targets]
+import math
+import sys
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import *
+from ai_core.goal_seeker import GoalSeeker
+from ai_core.parameter_engine import ParameterEngine
+from utils import effective_eps, bandwidth_estimate_patch
+
+FAMILY = "patch_rect"
+
+
+class SyntheticSolver:
+    """
+    patch_rect response from the transmission-line cavity model; counts calls.
+    The board is fixed by the solver setup (the material choice), not by params.
+    """
+    def __init__(self, h=1.52e-3, eps_r=4.0, bw_factor=0.75):
+        self.h, self.eps_r, self.bw_factor = h, eps_r, bw_factor
+        self.calls = 0
+
+    def __call__(self, params):
+        self.calls += 1
+        W, L = params[0], params[1]
+        h, eps_r = self.h, self.eps_r
+        eps_eff = effective_eps(eps_r, W, h)
+        dL = 0.412*h*((eps_eff + 0.3)*(W/h + 0.264)) / ((eps_eff - 0.258)*(W/h + 0.8))
+        f = C / (2*(L + 2*dL)*math.sqrt(eps_eff))
+        return f/1e9, self.bw_factor*bandwidth_estimate_patch(f, W, h, eps_r)/1e6
+
+
+def make_targets(n, seed=RANDOM_SEED):
+    # reachable targets: responses of random designs inside the schema bounds
+    rng = np.random.default_rng(seed)
+    solver = SyntheticSolver()
+    out = []
+    while len(out) < n:
+        W = rng.uniform(*PATCH_W_RANGE)
+        L = rng.uniform(*PATCH_L_RANGE)
+        Fr, BW = solver([W, L])
+        if 1.0 <= Fr <= 6.0:
+            out.append((Fr, BW))
+    return out
+
+
+def refine_loop(engine, target_Fr, target_BW, solve, max_solves):
+    # baseline: the fixed-direction refine() heuristic until tolerance
+    params = engine.predict(FAMILY, target_Fr, target_BW, explore=False)
+    for n in range(1, max_solves + 1):
+        Fr, BW = solve(params)
+        if engine.within_tolerance(target_Fr, target_BW, Fr, BW, GOAL_TOL_FR_GHZ, GOAL_TOL_BW_MHZ):
+            return True, n
+        params = engine.refine(FAMILY, params, target_Fr, target_BW, Fr, BW)
+    return False, max_solves
+
+
+def main(n_targets=40):
+    engine = ParameterEngine()
+    seeker = GoalSeeker(engine)
+    rows = {"goal_seeker": [], "refine": []}
+    for Fr, BW in make_targets(n_targets):
+        solver = SyntheticSolver()
+        res = seeker.seek(FAMILY, Fr, BW, solver)
+        rows["goal_seeker"].append((res['success'], solver.calls))
+
+        solver = SyntheticSolver()
+        rows["refine"].append(refine_loop(engine, Fr, BW, solver, GOAL_MAX_SOLVES))
+
+    print(f"{n_targets} reachable {FAMILY} targets, tolerance {GOAL_TOL_FR_GHZ*1e3:.0f} MHz / "
+          f"{GOAL_TOL_BW_MHZ:.0f} MHz, at most {GOAL_MAX_SOLVES} solves each")
+    print(f"{'method':12s} {'reached':>8s} {'mean solves':>12s} {'median (reached)':>17s} {'total solves':>13s}")
+    for name, r in rows.items():
+        ok = np.array([a for a, _ in r])
+        calls = np.array([b for _, b in r])
+        med = np.median(calls[ok]) if ok.any() else float("nan")
+        print(f"{name:12s} {ok.sum():4d}/{len(r):<3d} {calls.mean():12.2f} {med:17.1f} {calls.sum():13d}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 40)
@@ -0,0 +1,58 @@
+# benchmarks/optimize_many_bench.py
+# Wall time of AICoreManager.optimize_many against worker count.
+#
+#   python benchmarks/optimize_many_bench.py [n_targets] [method] [backend]
+import os
+import sys
+import time
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import *
+from ai_core.ai_core_manager import AICoreManager
+
+
+def make_targets(n, seed=RANDOM_SEED):
+    # random (family, Fr, BW) targets over the dataset generator's 1-6 GHz span
+    rng = np.random.default_rng(seed)
+    fams = rng.choice(FAMILIES, n)
+    Fr = rng.uniform(1.0, 6.0, n)
+    BW = rng.uniform(20.0, 300.0, n)
+    return [(str(f), float(a), float(b)) for f, a, b in zip(fams, Fr, BW)]
+
+
+def run(mgr, targets, workers, method):
+    t0 = time.perf_counter()
+    first = None
+    errors = 0
+    for r in mgr.optimize_many(targets, workers=workers, method=method):
+        if first is None:
+            first = time.perf_counter() - t0
+        errors += r['error'] is not None
+    return time.perf_counter() - t0, first, errors
+
+
+def main(n_targets=64, method="de", backend=INFERENCE_BACKEND):
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    targets = make_targets(n_targets)
+    print(f"{n_targets} targets, method={method}, backend={backend}, {cores} cores")
+    if cores == 1:
+        print("only one core available: no parallel speedup to measure")
+
+    base = None
+    print(f"{'workers':>8s} {'total s':>9s} {'first s':>9s} {'targets/s':>10s} {'speedup':>8s} {'errors':>7s}")
+    for workers in counts:
+        # fresh manager without a result cache so every run does the full work
+        mgr = AICoreManager(backend=backend)
+        mgr.result_cache = None
+        total, first, errors = run(mgr, targets, workers, method)
+        base = base or total
+        print(f"{workers:8d} {total:9.2f} {first:9.2f} {n_targets/total:10.2f} {base/total:8.2f} {errors:7d}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 64, *args[1:3])
@@ -0,0 +1,80 @@
+# benchmarks/quick_retrain_bench.py
+# quick_retrain cost against feedback history: full refit vs incremental update.
+#
+# A temporary feedback store is filled with synthetic patch_rect results
+# (goal_seek_bench cavity solver, targets = response + noise). For each history
+# size the correction model is fully refit once, then RETRAIN_EVERY new rows
+# arrive and are trained both ways. The held-out error (normalized MSE of the
+# correction targets) shows the incremental model keeps up with the full one.
+#
+#   python benchmarks/quick_retrain_bench.py [history sizes ...]
+import os
+import sys
+import tempfile
+import time
+import joblib
+import numpy as np
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import *
+from ai_core import param_schema
+from benchmarks.goal_seek_bench import SyntheticSolver, FAMILY
+from feedback import ai_quick_retrain as qr
+from feedback.feedback_store import FeedbackStore
+
+
+def make_rows(n, rng):
+    solver = SyntheticSolver()
+    P = param_schema.sample(FAMILY, n, rng)
+    rows = []
+    for p in P:
+        Fr, BW = solver(p)
+        rows.append((time.time(), FAMILY, Fr*(1 + 0.05*rng.normal()), BW*(1 + 0.1*rng.normal()),
+                     *p, Fr, BW, -15.0))
+    return rows
+
+
+def holdout_error(rows):
+    import pandas as pd
+    from feedback.feedback_store import COLUMNS
+    X, y = qr._features(pd.DataFrame(rows, columns=COLUMNS))
+    b = joblib.load(qr.MODEL_PATH)
+    pred = b["sk_model"].predict((X - b["X_mean"]) / b["X_std"])
+    return float(np.mean((pred - (y - b["y_mean"]) / b["y_std"])**2))
+
+
+def main(sizes=(500, 2000, 8000)):
+    rng = np.random.default_rng(RANDOM_SEED)
+    tmp = tempfile.mkdtemp()
+    qr.MODEL_PATH = os.path.join(tmp, "correction.save")
+    qr.META_PATH = os.path.join(tmp, "meta.json")
+    test = make_rows(500, rng)
+
+    print(f"{'history':>8s} {'path':>12s} {'seconds':>9s} {'holdout mse':>12s}")
+    for n in sizes:
+        store = FeedbackStore(os.path.join(tmp, f"fb_{n}.sqlite"))
+        qr.default_store = lambda: store
+        store.append_many(make_rows(n, rng))
+        for f in (qr.MODEL_PATH, qr.META_PATH):
+            if os.path.exists(f):
+                os.remove(f)
+        qr.quick_retrain("full")
+
+        store.append_many(make_rows(qr.RETRAIN_EVERY, rng))
+        snapshot = (open(qr.MODEL_PATH, "rb").read(), open(qr.META_PATH).read())
+        for path in ("full", "incremental"):
+            with open(qr.MODEL_PATH, "wb") as f:
+                f.write(snapshot[0])
+            with open(qr.META_PATH, "w") as f:
+                f.write(snapshot[1])
+            qr.quick_retrain(path)
+            last = qr._load_meta()["last"]
+            print(f"{n:8d} {last['path']:>12s} {last['seconds']:9.3f} {holdout_error(test):12.4f}")
+        store.close()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(args or (500, 2000, 8000))
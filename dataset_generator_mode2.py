@@ -1,77 +1,161 @@
 # dataset_generator_mode2.py
+"""
+Synthetic mode-2 dataset: analytic responses of random designs per family.
+
+Rows are generated in chunks of DATASET_CHUNK_ROWS. Chunk i draws from its
+own Generator seeded with SeedSequence(seed, spawn_key=(i,)) and fills each
+family's rows as one vectorized NumPy block, so a chunk depends only on
+(seed, chunk size, i): chunks can run in any process, and the file is the
+same for any worker count. Chunks are appended to the CSV in order as they
+finish; memory holds a few chunks, not the dataset.
+
+    python dataset_generator_mode2.py [samples] [--workers N] [--out path]
+"""
+import os
+import sys
+import time
+import multiprocessing as mp
 import numpy as np
 import pandas as pd
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from ai_core.ai_config import *
+from ai_core.param_schema import param_range
 from utils import rect_patch_L_from_freq, bandwidth_estimate_patch, effective_eps
 
-def generate_mode2_dataset(samples=SAMPLES, seed=RANDOM_SEED):
-    np.random.seed(seed)
-    rows = []
-    families = np.random.choice(FAMILIES, samples)
-    for fam in families:
-        f = np.random.uniform(1.0e9, 6.0e9)  # Hz
+COLUMNS = [
+    "family", "freq_Hz", "bandwidth_Hz",
+    "param_a", "param_b", "eps_eff",
+    "substrate_h", "eps_r", "feed_width_m", "extra"
+]
+_NUM_COLS = COLUMNS[1:]
+_H, _EPS = DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R
+
+
+def _family_block(fam, f, rng):
+    """
+    Columns param_a, param_b, eps_eff, feed_width_m, extra, BW for the rows
+    of one family (f: their frequencies in Hz). Unused columns stay 0.
+    """
+    n = len(f)
+    zeros = np.zeros(n)
+    uniform = lambda lo_hi: rng.uniform(*lo_hi, size=n)
+
+    if fam in ("patch_rect", "patch_meander", "patch_u-slot", "patch_e-shape"):
+        W = uniform(param_range(fam, 'param_a'))
+        L, eps_eff = rect_patch_L_from_freq(f, _EPS, _H, W)
+        feed_w = uniform(param_range(fam, 'feed_width_m'))
         if fam == "patch_rect":
-            W = np.random.uniform(*PATCH_W_RANGE)
-            L, eps_eff = rect_patch_L_from_freq(f, DEFAULT_EPS_R, DEFAULT_SUBSTRATE_H, W)
-            feed_w = np.random.uniform(*FEED_W_RANGE)
-            feed_type = np.random.randint(0, 4)
-            BW = bandwidth_estimate_patch(f, W, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, feed_factor=1.0 + (feed_type-1)*0.05)
-            rows.append([fam, f, BW, W, L, eps_eff, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, feed_w, feed_type])
-        elif fam == "patch_circ":
-            r = np.random.uniform(*CIRC_RADIUS_RANGE)
-            # quick circular patch heuristic — map radius to f roughly
-            # Use W ≈ 2r for bandwidth heuristics
-            BW = bandwidth_estimate_patch(f, 2*r, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, feed_factor=1.02)
-            rows.append([fam, f, BW, r, 0.0, effective_eps(DEFAULT_EPS_R, 2*r, DEFAULT_SUBSTRATE_H), DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, np.random.uniform(*FEED_W_RANGE), 0])
+            extra = rng.integers(0, 4, size=n).astype(float)  # feed type
+            feed_factor = 1.0 + (extra - 1)*0.05
         elif fam == "patch_meander":
-            W = np.random.uniform(*PATCH_W_RANGE)
-            L, eps_eff = rect_patch_L_from_freq(f, DEFAULT_EPS_R, DEFAULT_SUBSTRATE_H, W)
-            meander = np.random.uniform(*MEANDER_DEPTH_RANGE)
-            feed_w = np.random.uniform(*FEED_W_RANGE)
-            BW = bandwidth_estimate_patch(f, W, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, feed_factor=1.08)
-            rows.append([fam, f, BW, W, L, eps_eff, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, feed_w, meander])
-        elif fam == "patch_u-slot" or fam == "patch_e-shape":
-            W = np.random.uniform(*PATCH_W_RANGE)
-            L, eps_eff = rect_patch_L_from_freq(f, DEFAULT_EPS_R, DEFAULT_SUBSTRATE_H, W)
-            slot_depth = np.random.uniform(1e-3, 8e-3)
-            feed_w = np.random.uniform(*FEED_W_RANGE)
-            BW = bandwidth_estimate_patch(f, W, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, feed_factor=1.1)
-            rows.append([fam, f, BW, W, L, eps_eff, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, feed_w, slot_depth])
-        elif fam == "monopole":
-            L = np.random.uniform(*MONOPOLE_LENGTH_RANGE)
-            W = np.random.uniform(*MONOPOLE_WIDTH_RANGE)
-            BW = 0.03 * f
-            rows.append([fam, f, BW, L, W, 0.0, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, 0.0, 0])
-        elif fam == "dipole":
-            L = np.random.uniform(*DIPOLE_LENGTH_RANGE)
-            W = np.random.uniform(*DIPOLE_WIDTH_RANGE)
-            BW = 0.02 * f
-            rows.append([fam, f, BW, L, W, 0.0, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, 0.0, 0])
-        elif fam == "cpw_uwb":
-            W = np.random.uniform(10e-3, 80e-3)
-            BW = 0.25 * f  # UWB wide BW heuristic
-            rows.append([fam, f, BW, W, 0.0, 0.0, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, 0.0, 0])
-        elif fam == "slot":
-            slot_w = np.random.uniform(1e-3, 20e-3)
-            BW = 0.08 * f
-            rows.append([fam, f, BW, slot_w, 0.0, 0.0, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, 0.0, 0])
-        elif fam == "vivaldi":
-            mouth = np.random.uniform(10e-3, 120e-3)
-            BW = 0.4 * f
-            rows.append([fam, f, BW, mouth, 0.0, 0.0, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, 0.0, 0])
+            extra = uniform(MEANDER_DEPTH_RANGE)
+            feed_factor = 1.08
         else:
-            # placeholder generic row
-            rows.append([fam, f, 0.01*f, 0.02, 0.02, 0.0, DEFAULT_SUBSTRATE_H, DEFAULT_EPS_R, 0.001, 0])
-
-    cols = [
-        "family", "freq_Hz", "bandwidth_Hz",
-        "param_a", "param_b", "eps_eff",
-        "substrate_h", "eps_r", "feed_width_m", "extra"
-    ]
-    df = pd.DataFrame(rows, columns=cols)
-    df.to_csv(DATASET_PATH, index=False)
-    print("Saved dataset to:", DATASET_PATH, "rows:", len(df))
+            extra = uniform(SLOT_DEPTH_RANGE)
+            feed_factor = 1.1
+        BW = bandwidth_estimate_patch(f, W, _H, _EPS, feed_factor=feed_factor)
+        return W, L, eps_eff, feed_w, extra, BW
+    if fam == "patch_circ":
+        # quick circular patch heuristic, W ≈ 2r for bandwidth
+        r = uniform(param_range(fam, 'param_a'))
+        feed_w = uniform(param_range(fam, 'feed_width_m'))
+        BW = bandwidth_estimate_patch(f, 2*r, _H, _EPS, feed_factor=1.02)
+        return r, zeros, effective_eps(_EPS, 2*r, _H), feed_w, zeros, BW
+    if fam in ("monopole", "dipole"):
+        L = uniform(param_range(fam, 'param_a'))
+        W = uniform(param_range(fam, 'param_b'))
+        return L, W, zeros, zeros, zeros, (0.03 if fam == "monopole" else 0.02) * f
+    # single-parameter families: fractional bandwidth heuristic
+    frac = {"cpw_uwb": 0.25, "slot": 0.08, "vivaldi": 0.4}
+    if fam in frac:
+        a = uniform(param_range(fam, 'param_a'))
+        return a, zeros, zeros, zeros, zeros, frac[fam] * f
+    # placeholder generic rows
+    return np.full(n, 0.02), np.full(n, 0.02), zeros, np.full(n, 0.001), zeros, 0.01 * f
+
+
+def generate_chunk(index, rows, seed=RANDOM_SEED):
+    """
+    Chunk `index` of the dataset (rows rows) as a DataFrame.
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(int(index),)))
+    fam_idx = rng.integers(0, len(FAMILIES), size=rows)
+    f = rng.uniform(1.0e9, 6.0e9, size=rows)  # Hz
+
+    out = np.zeros((rows, len(_NUM_COLS)))
+    out[:, 0] = f
+    out[:, 5] = _H
+    out[:, 6] = _EPS
+    for k, fam in enumerate(FAMILIES):
+        sel = np.flatnonzero(fam_idx == k)
+        if len(sel) == 0:
+            continue
+        a, b, eps_eff, feed_w, extra, BW = _family_block(fam, f[sel], rng)
+        out[sel, 1] = BW
+        out[sel, 2] = a
+        out[sel, 3] = b
+        out[sel, 4] = eps_eff
+        out[sel, 7] = feed_w
+        out[sel, 8] = extra
+
+    df = pd.DataFrame(out, columns=_NUM_COLS)
+    df.insert(0, "family", np.asarray(FAMILIES, dtype=object)[fam_idx])
     return df
 
+def _chunk_csv(args):
+    # worker: one chunk rendered as CSV text (no header)
+    index, rows, seed = args
+    return generate_chunk(index, rows, seed).to_csv(index=False, header=False)
+
+def chunk_sizes(samples, chunk_rows=DATASET_CHUNK_ROWS):
+    full, rest = divmod(int(samples), int(chunk_rows))
+    return [int(chunk_rows)] * full + ([rest] if rest else [])
+
+
+def generate_mode2_dataset(samples=SAMPLES, seed=RANDOM_SEED, workers=None,
+                           chunk_rows=DATASET_CHUNK_ROWS, path=DATASET_PATH):
+    """
+    Write the dataset CSV chunk by chunk. workers: processes (default
+    os.cpu_count(), 1 = in this process); the file does not depend on it.
+
+    Returns the number of rows written, not the DataFrame the in-memory
+    version returned: the full dataset is never held in memory. Read it
+    back with pandas.read_csv(path) or dataset_store.DatasetStore.
+    """
+    jobs = [(i, n, seed) for i, n in enumerate(chunk_sizes(samples, chunk_rows))]
+    workers = min(workers or os.cpu_count() or 1, max(len(jobs), 1))
+    tmp = f"{path}.tmp{os.getpid()}"
+    t0 = time.perf_counter()
+
+    with open(tmp, "w", newline="") as fh:
+        fh.write(",".join(COLUMNS) + "\n")
+        if workers <= 1:
+            for job in jobs:
+                fh.write(_chunk_csv(job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as ex:
+                # written in chunk order; at most 2 chunks per worker in flight
+                pending = deque()
+                for job in jobs:
+                    if len(pending) >= 2*workers:
+                        fh.write(pending.popleft().result())
+                    pending.append(ex.submit(_chunk_csv, job))
+                while pending:
+                    fh.write(pending.popleft().result())
+    os.replace(tmp, path)  # readers never see a partial dataset
+
+    n = sum(j[1] for j in jobs)
+    print(f"Saved dataset to: {path} rows: {n} ({len(jobs)} chunks, {workers} workers, "
+          f"{time.perf_counter() - t0:.1f} s)")
+    return n
+
 if __name__ == "__main__":
-    generate_mode2_dataset()
+    args = sys.argv[1:]
+    opt = lambda name, default: args[args.index(name) + 1] if name in args else default
+    pos = [a for i, a in enumerate(args) if not a.startswith("--") and (i == 0 or not args[i-1].startswith("--"))]
+    generate_mode2_dataset(
+        samples=int(pos[0]) if pos else SAMPLES,
+        workers=int(opt("--workers", 0)) or None,
+        path=opt("--out", DATASET_PATH),
+    )
@@ -0,0 +1,180 @@
+# dataset_store.py
+"""
+Family-partitioned, float32, memory-mapped training dataset.
+
+    dataset_mode2/manifest.json            source, columns, rows and per-column ranges per family
+    dataset_mode2/<family>/features.npy    (N,5) param_a, param_b, feed_width_m, substrate_h, eps_r
+    dataset_mode2/<family>/targets.npy     (N,2) Fr_GHz, BW_MHz
+    dataset_mode2/<family>/aux.npy         (N,2) eps_eff, extra
+
+A trainer opens only its family's files with np.load(mmap_mode="r"): no
+parse, no float64 / object columns, no filtering of the whole dataset, and
+pages are read from disk only when touched.
+
+The converter reads the CSV twice in chunks (family counts, then the rows),
+so memory stays at one chunk plus the open memmaps; the store is built in a
+temp directory and renamed into place.
+
+    python dataset_store.py convert [dataset_mode2.csv] [--out dataset_mode2]
+    python dataset_store.py info
+"""
+import json
+import os
+import shutil
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from numpy.lib.format import open_memmap
+from ai_core.ai_config import *
+
+FEATURES = ['param_a', 'param_b', 'feed_width_m', 'substrate_h', 'eps_r']
+TARGETS = ['Fr_GHz', 'BW_MHz']   # from freq_Hz / 1e9, bandwidth_Hz / 1e6
+AUX = ['eps_eff', 'extra']
+PARTS = {"features": FEATURES, "targets": TARGETS, "aux": AUX}
+DTYPE = np.float32
+
+
+def _frame_parts(df):
+    # CSV rows -> {part: float32 array}
+    targets = np.column_stack([df['freq_Hz'].values / 1e9, df['bandwidth_Hz'].values / 1e6])
+    return {
+        "features": df[FEATURES].values.astype(DTYPE),
+        "targets": targets.astype(DTYPE),
+        "aux": df[AUX].values.astype(DTYPE),
+    }
+
+
+def convert_csv(csv_path=DATASET_PATH, out_dir=DATASET_STORE_DIR, chunk_rows=DATASET_CHUNK_ROWS):
+    """
+    Build the partitioned store from a dataset CSV. Returns the manifest.
+    """
+    t0 = time.perf_counter()
+    out_dir = Path(out_dir)
+    read = lambda **kw: pd.read_csv(csv_path, chunksize=int(chunk_rows), **kw)
+
+    # pass 1: rows per family (family column only)
+    counts = {}
+    for chunk in read(usecols=['family']):
+        for fam, n in chunk['family'].value_counts().items():
+            counts[fam] = counts.get(fam, 0) + int(n)
+
+    order = lambda f: (FAMILIES.index(f) if f in FAMILIES else len(FAMILIES), f)
+    counts = {f: counts[f] for f in sorted(counts, key=order)}
+
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    arrays, filled, lo, hi = {}, {}, {}, {}
+    for fam, n in counts.items():
+        (tmp / fam).mkdir(parents=True)
+        arrays[fam] = {p: open_memmap(tmp / fam / f"{p}.npy", mode="w+", dtype=DTYPE, shape=(n, len(cols)))
+                       for p, cols in PARTS.items()}
+        filled[fam] = 0
+        lo[fam] = {p: np.full(len(cols), np.inf) for p, cols in PARTS.items()}
+        hi[fam] = {p: np.full(len(cols), -np.inf) for p, cols in PARTS.items()}
+
+    # pass 2: rows into their family's memmaps, in file order
+    dtypes = {c: np.float64 for c in FEATURES + AUX + ['freq_Hz', 'bandwidth_Hz']}
+    for chunk in read(dtype=dtypes):
+        for fam, df_f in chunk.groupby('family', sort=False):
+            a, n = filled[fam], len(df_f)
+            for p, block in _frame_parts(df_f).items():
+                arrays[fam][p][a:a + n] = block
+                if n:
+                    lo[fam][p] = np.minimum(lo[fam][p], block.min(axis=0))
+                    hi[fam][p] = np.maximum(hi[fam][p], block.max(axis=0))
+            filled[fam] = a + n
+
+    families = {}
+    for fam, parts in arrays.items():
+        for m in parts.values():
+            m.flush()
+        families[fam] = {
+            "rows": filled[fam],
+            "ranges": {c: [float(lo[fam][p][i]), float(hi[fam][p][i])]
+                       for p, cols in PARTS.items() for i, c in enumerate(cols)},
+        }
+    del arrays
+
+    st = os.stat(csv_path)
+    manifest = {
+        "source": str(csv_path), "source_size": st.st_size, "source_mtime": st.st_mtime,
+        "dtype": np.dtype(DTYPE).name, "parts": PARTS,
+        "rows": sum(f["rows"] for f in families.values()),
+        "families": families, "created": time.time(),
+    }
+    (tmp / "manifest.json").write_text(json.dumps(manifest, indent=1))
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    os.replace(tmp, out_dir)
+    print(f"[dataset_store] {manifest['rows']} rows, {len(families)} families -> {out_dir} "
+          f"in {time.perf_counter() - t0:.1f} s")
+    return manifest
+
+
+class DatasetStore:
+    def __init__(self, root=DATASET_STORE_DIR):
+        self.root = Path(root)
+        path = self.root / "manifest.json"
+        if not path.exists():
+            raise FileNotFoundError(
+                f"No dataset store at {self.root} (build it with: python dataset_store.py convert)")
+        self.manifest = json.loads(path.read_text())
+
+    @property
+    def families(self):
+        return list(self.manifest["families"])
+
+    def __contains__(self, family):
+        return family in self.manifest["families"]
+
+    def rows(self, family):
+        return self.manifest["families"].get(family, {}).get("rows", 0)
+
+    def ranges(self, family):
+        # {column: [min, max]} over the family's rows
+        return self.manifest["families"][family]["ranges"]
+
+    def load(self, family, part="features"):
+        """
+        (N, k) read-only float32 memmap of one part ('features', 'targets', 'aux').
+        """
+        if family not in self:
+            raise KeyError(f"Family {family!r} not in dataset store {self.root}")
+        return np.load(self.root / family / f"{part}.npy", mmap_mode="r")
+
+    def family(self, family):
+        # {'features', 'targets', 'aux'} memmaps of one family
+        return {p: self.load(family, p) for p in PARTS}
+
+    def is_stale(self, csv_path=DATASET_PATH):
+        # True when the source CSV changed after the conversion
+        try:
+            st = os.stat(csv_path)
+        except OSError:
+            return False
+        return (st.st_size, st.st_mtime) != (self.manifest["source_size"], self.manifest["source_mtime"])
+
+
+def main(argv):
+    cmd = argv[0] if argv else "info"
+    out = argv[argv.index("--out") + 1] if "--out" in argv else DATASET_STORE_DIR
+    if cmd == "convert":
+        pos = [a for i, a in enumerate(argv[1:], 1) if not a.startswith("--") and argv[i-1] != "--out"]
+        convert_csv(pos[0] if pos else DATASET_PATH, out)
+    elif cmd == "info":
+        store = DatasetStore(out)
+        print(f"{store.root}: {store.manifest['rows']} rows from {store.manifest['source']}"
+              f"{' (stale)' if store.is_stale(store.manifest['source']) else ''}")
+        for fam in store.families:
+            r = store.ranges(fam)
+            print(f"  {fam:15s} {store.rows(fam):9d} rows, Fr {r['Fr_GHz'][0]:.2f}-{r['Fr_GHz'][1]:.2f} GHz")
+    else:
+        print(__doc__)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
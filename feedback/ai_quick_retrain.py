@@ -1,109 +1,245 @@
 import os
+import json
+import time
 import joblib
 import numpy as np
-import pandas as pd
 
 from sklearn.neural_network import MLPRegressor
 from sklearn.preprocessing import StandardScaler
 
-from ai_core.ai_config import FAMILIES, RANDOM_SEED
+from ai_core.ai_config import (
+    FAMILIES, RANDOM_SEED, RETRAIN_INCREMENTAL, RETRAIN_FULL_EVERY,
+    RETRAIN_REPLAY_SIZE, RETRAIN_INCREMENTAL_EPOCHS, RETRAIN_KEEP_VERSIONS, CORRECTION_MODEL_PATH,
+    RETRAIN_META_PATH
+)
+from ai_core.model_watcher import publish, latest_version
+from feedback.feedback_store import default_store
 
-FEEDBACK_FILE = r"feedback\ai_feedback_mode2.csv"
-MODEL_PATH = r"feedback\ai_quick_retrain.save"
-META_PATH = r".ai_retrain_meta_mode2"
+MODEL_PATH = str(CORRECTION_MODEL_PATH)
+META_PATH = str(RETRAIN_META_PATH)
 
 RETRAIN_MIN_SAMPLES = 30
 RETRAIN_EVERY = 10
 
+# only what ParameterEngine knows before CST runs: the errors are the training
+# target, not a feature
+X_COLS = (
+    ["family_id", "target_Fr_GHz", "target_BW_MHz"]
+    + [f"param_{i}" for i in range(5)]
+)
 
-def quick_retrain():
-    if not os.path.exists(FEEDBACK_FILE):
-        return False
-
-    df = pd.read_csv(FEEDBACK_FILE).dropna()
-    n = len(df)
-
-    if n < RETRAIN_MIN_SAMPLES:
-        return False
-
-    last_trained = 0
-    if os.path.exists(META_PATH):
-        try:
-            last_trained = int(open(META_PATH).read().strip())
-        except Exception:
-            last_trained = 0
-
-    if (n - last_trained) < RETRAIN_EVERY:
-        return False
-
-    # ---------------------------------
-    # Feature engineering
-    # ---------------------------------
+# ---------------------------------
+# Feature engineering
+# ---------------------------------
 
+def _features(df):
+    # feedback rows -> (X, y) with X in X_COLS order
     fam_to_id = {f: i for i, f in enumerate(FAMILIES)}
+    df = df.copy()
     df["family_id"] = df["family"].map(fam_to_id)
 
     df["err_Fr"] = df["actual_Fr_GHz"] - df["target_Fr_GHz"]
     df["err_BW"] = df["actual_BW_MHz"] - df["target_BW_MHz"]
 
-    X_cols = (
-        ["family_id", "target_Fr_GHz", "target_BW_MHz"]
-        + [f"param_{i}" for i in range(5)]
-        + ["err_Fr", "err_BW"]
-    )
-
     # Target: parameter correction (negative error direction)
-    y = np.zeros((n, 5))
+    y = np.zeros((len(df), 5))
     y[:, 0] = -df["err_Fr"].values
     y[:, 1] = -df["err_Fr"].values
     y[:, 2] = -0.1 * df["err_BW"].values
-    y[:, 3] = 0.0
-    y[:, 4] = 0.0
 
-    X = df[X_cols].values
+    return df[X_COLS].values.astype(float), y
+
+def _new_model():
+    return MLPRegressor(
+        hidden_layer_sizes=(128, 64),
+        max_iter=600,
+        random_state=RANDOM_SEED,
+        early_stopping=True
+    )
 
-    # ---------------------------------
-    # Normalization
-    # ---------------------------------
+# ---------------------------------
+# Saved state
+# ---------------------------------
 
+def _load_meta():
+    """
+    {'n_trained', 'offset', 'since_full', 'version', 'last'}; the old plain
+    row-count file has no offset, which forces a full refit.
+    """
+    meta = {"n_trained": 0, "offset": None, "since_full": 0, "version": 0, "last": None}
+    if os.path.exists(META_PATH):
+        try:
+            text = open(META_PATH).read().strip()
+            if text.startswith("{"):
+                meta.update(json.loads(text))
+            else:
+                meta["n_trained"] = int(text)
+        except Exception:
+            pass
+    return meta
+
+def _save_meta(meta):
+    tmp = f"{META_PATH}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, META_PATH)
+
+def _load_bundle():
+    # saved model with the incremental state, or None (missing / older format)
+    try:
+        bundle = joblib.load(MODEL_PATH)
+    except Exception:
+        return None
+    if "X_scaler" not in bundle or bundle.get("feature_cols") != X_COLS:
+        return None
+    return bundle
+
+def _make_bundle(model, X_scaler, y_scaler, replay_X, replay_y, replay_seen):
+    # X_mean ... feature_cols are what ParameterEngine reads; the rest is incremental state
+    return {
+        "sk_model": model,
+        "X_mean": X_scaler.mean_,
+        "X_std": X_scaler.scale_,
+        "y_mean": y_scaler.mean_,
+        "y_std": y_scaler.scale_,
+        "feature_cols": X_COLS,
+        "X_scaler": X_scaler,
+        "y_scaler": y_scaler,
+        "replay_X": replay_X,
+        "replay_y": replay_y,
+        "replay_seen": int(replay_seen),
+    }
+
+def _update_replay(replay_X, replay_y, seen, X, y, rng):
+    # reservoir sample (RETRAIN_REPLAY_SIZE rows) over every row trained on so far
+    replay_X, replay_y = list(replay_X), list(replay_y)
+    for i in range(len(X)):
+        seen += 1
+        if len(replay_X) < RETRAIN_REPLAY_SIZE:
+            replay_X.append(X[i])
+            replay_y.append(y[i])
+        else:
+            j = int(rng.integers(seen))
+            if j < RETRAIN_REPLAY_SIZE:
+                replay_X[j], replay_y[j] = X[i], y[i]
+    return (np.array(replay_X).reshape(-1, len(X_COLS)),
+            np.array(replay_y).reshape(-1, 5), seen)
+
+# ---------------------------------
+# Training paths
+# ---------------------------------
+
+def _full_refit(store):
+    # fresh model and scalers on every row in the store; returns (bundle, rows, offset)
+    df, offset = store.read_since(0)
+    df = df.dropna()
+    if len(df) < RETRAIN_MIN_SAMPLES:
+        return None, 0, offset
+
+    X, y = _features(df)
     X_scaler = StandardScaler()
     y_scaler = StandardScaler()
-
     Xn = X_scaler.fit_transform(X)
     yn = y_scaler.fit_transform(y)
 
-    # ---------------------------------
-    # Train correction model
-    # ---------------------------------
+    model = _new_model()
+    model.fit(Xn, yn)
 
-    model = MLPRegressor(
-        hidden_layer_sizes=(128, 64),
-        max_iter=600,
-        random_state=RANDOM_SEED,
-        early_stopping=True
+    rng = np.random.default_rng(RANDOM_SEED)
+    replay_X, replay_y, seen = _update_replay([], [], 0, X, y, rng)
+    return _make_bundle(model, X_scaler, y_scaler, replay_X, replay_y, seen), len(df), offset
+
+def _incremental_update(store, bundle, offset):
+    """
+    Continue the saved model on the rows after offset plus a replay sample of
+    older rows: scalers updated with partial_fit (running mean / variance),
+    then RETRAIN_INCREMENTAL_EPOCHS shuffled partial_fit passes.
+    Returns (bundle, rows, offset).
+    """
+    df, new_offset = store.read_since(offset)
+    df = df.dropna()
+    if df.empty:
+        return None, 0, new_offset
+
+    X, y = _features(df)
+    X_scaler, y_scaler = bundle["X_scaler"], bundle["y_scaler"]
+    X_scaler.partial_fit(X)
+    y_scaler.partial_fit(y)
+
+    X_train = np.vstack([X, bundle["replay_X"]])
+    y_train = np.vstack([y, bundle["replay_y"]])
+    Xn = X_scaler.transform(X_train)
+    yn = y_scaler.transform(y_train)
+
+    model = bundle["sk_model"]
+    if model.early_stopping:
+        # the validation split only applies to a full fit; partial_fit tracks training loss
+        model.set_params(early_stopping=False)
+        model.best_loss_ = np.inf
+    rng = np.random.default_rng(RANDOM_SEED + bundle["replay_seen"])
+    for _ in range(RETRAIN_INCREMENTAL_EPOCHS):
+        idx = rng.permutation(len(Xn))
+        model.partial_fit(Xn[idx], yn[idx])
+
+    replay_X, replay_y, seen = _update_replay(
+        bundle["replay_X"], bundle["replay_y"], bundle["replay_seen"], X, y, rng
     )
+    return _make_bundle(model, X_scaler, y_scaler, replay_X, replay_y, seen), len(df), new_offset
 
-    model.fit(Xn, yn)
 
-    joblib.dump(
-        {
-            "sk_model": model,
-            "X_mean": X_scaler.mean_,
-            "X_std": X_scaler.scale_,
-            "y_mean": y_scaler.mean_,
-            "y_std": y_scaler.scale_,
-            "feature_cols": X_cols
-        },
-        MODEL_PATH
+def quick_retrain(mode="auto"):
+    """
+    Retrain the correction model once RETRAIN_EVERY new feedback rows exist.
+    mode: "auto" (incremental when possible, full refit every
+    RETRAIN_FULL_EVERY updates), "incremental" or "full".
+    Each model is published as a new version (ai_core.model_watcher.publish):
+    written to its own file, then swapped in over MODEL_PATH by a rename.
+    Returns True when a new model was published.
+    """
+    store = default_store()
+    n = store.count()
+
+    if n < RETRAIN_MIN_SAMPLES:
+        return False
+
+    meta = _load_meta()
+    if (n - meta["n_trained"]) < RETRAIN_EVERY:
+        return False
+
+    incremental = mode == "incremental" or (
+        mode == "auto" and RETRAIN_INCREMENTAL and meta["since_full"] < RETRAIN_FULL_EVERY
     )
+    # falls back to a full refit when there is no usable saved state
+    bundle = _load_bundle() if incremental and meta["offset"] is not None else None
+
+    t0 = time.perf_counter()
+    if bundle is not None:
+        path = "incremental"
+        bundle, rows, offset = _incremental_update(store, bundle, meta["offset"])
+    else:
+        path = "full"
+        bundle, rows, offset = _full_refit(store)
+    if bundle is None:
+        return False
+    seconds = time.perf_counter() - t0
+
+    # never reuse a number still on disk (e.g. after the meta file was reset)
+    version = max(int(meta["version"]), latest_version(MODEL_PATH)) + 1
+    bundle["version"] = version
+    publish(bundle, MODEL_PATH, version, keep=RETRAIN_KEEP_VERSIONS)
 
-    with open(META_PATH, "w") as f:
-        f.write(str(n))
+    meta["since_full"] = meta["since_full"] + 1 if path == "incremental" else 0
+    meta["n_trained"] = n
+    meta["offset"] = offset
+    meta["version"] = version
+    meta["last"] = {"path": path, "rows": rows, "seconds": round(seconds, 4), "version": version}
+    _save_meta(meta)
 
-    print(f"[quick_retrain] correction model trained on {n} samples")
+    print(f"[quick_retrain] {path} update on {rows} samples ({n} total) in {seconds:.2f} s, version {version}")
 
     return True
 
 
 if __name__ == "__main__":
-    quick_retrain()
+    import sys
+    quick_retrain(sys.argv[1] if len(sys.argv) > 1 else "full")
@@ -0,0 +1,208 @@
+# feedback/feedback_aggregates.py
+"""
+Per-family feedback statistics kept up to date in a small JSON sidecar
+(FEEDBACK_AGG_PATH), so the dashboard never scans the feedback history.
+
+Per family (and "all"):
+    count, mean / variance of the Fr and BW error (Welford, actual - target),
+    rolling window of the last FEEDBACK_AGG_WINDOW |errors|,
+    S11 histogram over FEEDBACK_S11_EDGES (dB),
+    hits: |Fr error| <= GOAL_TOL_FR_GHZ and |BW error| <= GOAL_TOL_BW_MHZ
+
+The sidecar remembers the last feedback-store id it has counted. refresh()
+catches up on the rows after it, so every writer process keeps the same file
+correct; log_feedback hooks it to the store's flush. Rebuild from the raw
+feedback:
+
+    python -m feedback.feedback_aggregates rebuild
+    python -m feedback.feedback_aggregates show
+"""
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from ai_core.ai_config import *
+
+ALL = "all"
+
+
+class FamilyStats:
+    def __init__(self, window=FEEDBACK_AGG_WINDOW):
+        self.count = 0
+        self.hits = 0
+        self.mean = [0.0, 0.0]  # Fr error (GHz), BW error (MHz)
+        self.m2 = [0.0, 0.0]
+        self.recent = deque(maxlen=int(window))  # (|Fr error|, |BW error|)
+        self.s11 = [0] * (len(FEEDBACK_S11_EDGES) + 1)
+
+    def update(self, err_Fr, err_BW, S11):
+        self.count += 1
+        for k, e in enumerate((err_Fr, err_BW)):
+            d = e - self.mean[k]
+            self.mean[k] += d / self.count
+            self.m2[k] += d * (e - self.mean[k])
+        self.recent.append((abs(err_Fr), abs(err_BW)))
+        self.s11[sum(S11 >= edge for edge in FEEDBACK_S11_EDGES)] += 1
+        if abs(err_Fr) <= GOAL_TOL_FR_GHZ and abs(err_BW) <= GOAL_TOL_BW_MHZ:
+            self.hits += 1
+
+    def summary(self):
+        n = self.count
+        var = [m / (n - 1) if n > 1 else 0.0 for m in self.m2]
+        w = len(self.recent)
+        return {
+            "count": n,
+            "mean_err_Fr_GHz": self.mean[0], "std_err_Fr_GHz": math.sqrt(var[0]),
+            "mean_err_BW_MHz": self.mean[1], "std_err_BW_MHz": math.sqrt(var[1]),
+            "recent_n": w,
+            "recent_abs_err_Fr_GHz": sum(a for a, _ in self.recent) / w if w else 0.0,
+            "recent_abs_err_BW_MHz": sum(b for _, b in self.recent) / w if w else 0.0,
+            "hit_rate": self.hits / n if n else 0.0,
+            "s11_buckets": dict(zip(s11_labels(), self.s11)),
+        }
+
+    def to_dict(self):
+        return {"count": self.count, "hits": self.hits, "mean": self.mean, "m2": self.m2,
+                "recent": [list(r) for r in self.recent], "s11": self.s11}
+
+    @classmethod
+    def from_dict(cls, d, window=FEEDBACK_AGG_WINDOW):
+        s = cls(window)
+        s.count, s.hits = int(d["count"]), int(d["hits"])
+        s.mean, s.m2 = list(d["mean"]), list(d["m2"])
+        s.recent.extend(tuple(r) for r in d["recent"])
+        if len(d["s11"]) == len(s.s11):
+            s.s11 = list(d["s11"])
+        return s
+
+
+def s11_labels():
+    e = FEEDBACK_S11_EDGES
+    return ([f"<{e[0]:g}"] + [f"{a:g}..{b:g}" for a, b in zip(e[:-1], e[1:])] + [f">={e[-1]:g}"])
+
+
+class FeedbackAggregates:
+    def __init__(self):
+        self.families = {}
+        self.last_id = 0
+        self.updated_at = 0.0
+
+    def update(self, family, target_Fr, target_BW, actual_Fr, actual_BW, S11):
+        err_Fr = float(actual_Fr) - float(target_Fr)
+        err_BW = float(actual_BW) - float(target_BW)
+        if not all(map(math.isfinite, (err_Fr, err_BW, float(S11)))):
+            return
+        for key in (family, ALL):
+            if key not in self.families:
+                self.families[key] = FamilyStats()
+            self.families[key].update(err_Fr, err_BW, float(S11))
+
+    def update_frame(self, df):
+        # feedback-store rows (with 'id'), oldest first
+        cols = ["family", "target_Fr_GHz", "target_BW_MHz", "actual_Fr_GHz", "actual_BW_MHz", "S11_dB"]
+        for row in df[cols].itertuples(index=False, name=None):
+            self.update(*row)
+        if len(df):
+            self.last_id = max(self.last_id, int(df["id"].iloc[-1]))
+
+    def catch_up(self, store, chunk=FEEDBACK_AGG_CHUNK):
+        """
+        Count the store rows after last_id. Returns the number of rows added.
+        """
+        added = 0
+        while True:
+            df, offset = store.read_since(self.last_id, limit=chunk)
+            if df.empty:
+                return added
+            self.update_frame(df)
+            self.last_id = offset
+            added += len(df)
+
+    def summary(self):
+        return {fam: s.summary() for fam, s in self.families.items()}
+
+    def to_dict(self):
+        return {"last_id": self.last_id, "updated_at": self.updated_at,
+                "window": FEEDBACK_AGG_WINDOW, "s11_edges": list(FEEDBACK_S11_EDGES),
+                "families": {f: s.to_dict() for f, s in self.families.items()}}
+
+    @classmethod
+    def from_dict(cls, d):
+        agg = cls()
+        agg.last_id = int(d.get("last_id", 0))
+        agg.updated_at = float(d.get("updated_at", 0.0))
+        agg.families = {f: FamilyStats.from_dict(s) for f, s in d.get("families", {}).items()}
+        return agg
+
+
+def load(path=FEEDBACK_AGG_PATH):
+    # sidecar contents, or empty aggregates when missing / unreadable
+    try:
+        with open(path) as f:
+            return FeedbackAggregates.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return FeedbackAggregates()
+
+def save(agg, path=FEEDBACK_AGG_PATH):
+    # temp file + rename: the dashboard never reads a partial file
+    agg.updated_at = time.time()
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(agg.to_dict(), f)
+    os.replace(tmp, path)
+
+def refresh(store, path=FEEDBACK_AGG_PATH):
+    """
+    Bring the sidecar up to date with the store (new rows only). Used as a
+    FeedbackStore flush listener.
+    """
+    agg = load(path)
+    if agg.catch_up(store):
+        save(agg, path)
+    return agg
+
+def rebuild(store, path=FEEDBACK_AGG_PATH):
+    # recompute from every row in the store
+    agg = FeedbackAggregates()
+    agg.catch_up(store)
+    save(agg, path)
+    return agg
+
+def format_summary(summary, families=None):
+    lines = []
+    for fam in families or sorted(summary, key=lambda f: (f != ALL, f)):
+        s = summary[fam]
+        lines.append(
+            f"{fam}: n={s['count']}, Fr err {s['mean_err_Fr_GHz']:+.3f}±{s['std_err_Fr_GHz']:.3f} GHz, "
+            f"BW err {s['mean_err_BW_MHz']:+.2f}±{s['std_err_BW_MHz']:.2f} MHz, "
+            f"last {s['recent_n']}: |Fr| {s['recent_abs_err_Fr_GHz']:.3f} GHz / |BW| {s['recent_abs_err_BW_MHz']:.2f} MHz, "
+            f"hit rate {s['hit_rate']:.1%}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv):
+    cmd = argv[0] if argv else "show"
+    if cmd == "rebuild":
+        from feedback.feedback_store import default_store
+        t0 = time.perf_counter()
+        agg = rebuild(default_store())
+        print(f"rebuilt {FEEDBACK_AGG_PATH} from {agg.families[ALL].count if ALL in agg.families else 0} rows "
+              f"in {time.perf_counter() - t0:.2f} s")
+    elif cmd == "show":
+        summary = load().summary()
+        if not summary:
+            print("no aggregates yet (run: python -m feedback.feedback_aggregates rebuild)")
+            return 1
+        print(format_summary(summary))
+        print("S11 buckets:", summary[ALL]["s11_buckets"])
+    else:
+        print(__doc__)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,284 @@
+# feedback/feedback_store.py
+"""
+Feedback store: CST results in an embedded SQLite database (WAL mode).
+
+Replaces the per-row CSV appends of feedback_logger. Rows are buffered in
+memory and written in one transaction when FEEDBACK_FLUSH_ROWS rows are
+pending, FEEDBACK_FLUSH_SECONDS have passed since the last write, before
+any read through the same store, and at interpreter exit. A crash loses at
+most the unflushed buffer; the database itself is never left half-written.
+CST results (feedback_logger.log_feedback) are too expensive to lose, so
+they are appended with flush=True and committed before the call returns.
+Readers in other processes (UI, retrain worker) are not blocked by the
+writer in WAL mode.
+
+Columns are typed (REAL / TEXT); substrate_h and eps_r are not stored twice,
+read() adds them back as copies of param_3 / param_4 for older consumers.
+Every row has an increasing integer id, so a consumer keeps the last id it
+has seen and asks only for what came after it:
+
+    store = default_store()
+    store.append("patch_rect", 2.4, 100, params, 2.38, 95.0, -21.3)
+    df, offset = store.read_since(offset)
+
+One-time import of the legacy CSV (also done automatically the first time
+default_store() opens an empty database):
+
+    python -m feedback.feedback_store import [feedback/ai_feedback_mode2.csv]
+    python -m feedback.feedback_store info
+"""
+import atexit
+import os
+import sqlite3
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from ai_core.ai_config import *
+
+PARAM_COLS = [f"param_{i}" for i in range(5)]
+COLUMNS = (
+    ["timestamp", "family", "target_Fr_GHz", "target_BW_MHz"]
+    + PARAM_COLS
+    + ["actual_Fr_GHz", "actual_BW_MHz", "S11_dB"]
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    family TEXT NOT NULL,
+    target_Fr_GHz REAL, target_BW_MHz REAL,
+    param_0 REAL, param_1 REAL, param_2 REAL, param_3 REAL, param_4 REAL,
+    actual_Fr_GHz REAL, actual_BW_MHz REAL, S11_dB REAL
+);
+CREATE INDEX IF NOT EXISTS feedback_family ON feedback(family, id);
+CREATE TABLE IF NOT EXISTS imports (
+    source TEXT PRIMARY KEY,
+    rows INTEGER,
+    imported_at REAL
+);
+"""
+_INSERT = f"INSERT INTO feedback ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+
+
+class FeedbackStore:
+    def __init__(
+            self,
+            path=FEEDBACK_DB_PATH,
+            flush_rows=FEEDBACK_FLUSH_ROWS,
+            flush_seconds=FEEDBACK_FLUSH_SECONDS
+    ):
+        """
+        path: SQLite database file (created with its directory if missing)
+        flush_rows / flush_seconds: write the buffer once either is reached
+        """
+        self.path = str(path)
+        self.flush_rows = int(flush_rows)
+        self.flush_seconds = float(flush_seconds)
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.on_flush = []  # listener(store) called after rows were written
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # one connection shared by the threads of this process, guarded by _lock
+        self._conn = sqlite3.connect(self.path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        atexit.register(self.close)
+
+    # ---------- writing ----------
+
+    def append(self, family, target_Fr, target_BW, params, actual_Fr, actual_BW, S11, timestamp=None,
+               flush=False):
+        """
+        Buffer one result. params: list length >= 5
+        (param_a, param_b, feed_width, substrate_h, eps_r).
+        flush: write it (with anything buffered) now instead of at the thresholds
+        """
+        row = (time.time() if timestamp is None else float(timestamp), str(family),
+               float(target_Fr), float(target_BW), *(float(params[i]) for i in range(5)),
+               float(actual_Fr), float(actual_BW), float(S11))
+        with self._lock:
+            self._buffer.append(row)
+            wrote = False
+            if (flush or len(self._buffer) >= self.flush_rows
+                    or time.monotonic() - self._last_flush >= self.flush_seconds):
+                wrote = self._flush_locked()
+        if wrote:
+            self._notify()
+
+    def append_many(self, rows):
+        # rows: tuples in COLUMNS order, written in one transaction
+        with self._lock:
+            self._buffer.extend(tuple(r) for r in rows)
+            wrote = self._flush_locked()
+        if wrote:
+            self._notify()
+
+    def flush(self):
+        with self._lock:
+            wrote = self._flush_locked()
+        if wrote:
+            self._notify()
+
+    def _flush_locked(self):
+        # True when rows were written
+        wrote = bool(self._buffer)
+        if wrote:
+            with self._conn:  # one transaction, rolled back on error
+                self._conn.executemany(_INSERT, self._buffer)
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+        return wrote
+
+    def _notify(self):
+        # outside the lock: listeners read the store
+        for listener in list(self.on_flush):
+            try:
+                listener(self)
+            except Exception as e:
+                print(f"[feedback_store] flush listener failed: {type(e).__name__}: {e}")
+
+    def close(self):
+        if self._conn is None:
+            return
+        self.flush()
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._conn = None
+        atexit.unregister(self.close)
+
+    # ---------- reading ----------
+
+    def count(self, family=None):
+        self.flush()
+        with self._lock:
+            if family is None:
+                return self._conn.execute("SELECT COUNT(*) FROM feedback").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM feedback WHERE family = ?", (family,)).fetchone()[0]
+
+    def last_id(self):
+        self.flush()
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM feedback").fetchone()[0]
+
+    def read_since(self, offset=0, columns=None, family=None, limit=None):
+        """
+        Rows with id > offset, oldest first.
+        columns: subset of COLUMNS (default all); family: only this family
+        returns: (DataFrame with an 'id' column, new offset = last id read or offset)
+        """
+        cols = list(COLUMNS if columns is None else columns)
+        unknown = set(cols) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown feedback columns: {sorted(unknown)}")
+        sql = f"SELECT id, {', '.join(cols)} FROM feedback WHERE id > ?"
+        args = [int(offset)]
+        if family is not None:
+            sql += " AND family = ?"
+            args.append(family)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(int(limit))
+
+        self.flush()
+        with self._lock:
+            df = pd.read_sql_query(sql, self._conn, params=args)
+        if "param_3" in df:
+            df["substrate_h"] = df["param_3"]
+        if "param_4" in df:
+            df["eps_r"] = df["param_4"]
+        new_offset = int(df["id"].iloc[-1]) if len(df) else int(offset)
+        return df, new_offset
+
+    def read(self, columns=None, family=None):
+        # all rows (oldest first) as one DataFrame
+        return self.read_since(0, columns=columns, family=family)[0]
+
+    # ---------- legacy CSV ----------
+
+    def imported(self, source):
+        with self._lock:
+            row = self._conn.execute("SELECT rows FROM imports WHERE source = ?", (str(source),)).fetchone()
+        return None if row is None else row[0]
+
+    def import_csv(self, csv_path=FEEDBACK_CSV_PATH, force=False):
+        """
+        One-time import of a feedback_logger CSV. A source already imported is
+        skipped unless force=True. Returns the number of rows added.
+        """
+        source = os.path.abspath(str(csv_path))
+        if not force and self.imported(source) is not None:
+            return 0
+        df = pd.read_csv(csv_path)
+        missing = set(COLUMNS) - set(df.columns)
+        if missing:
+            raise ValueError(f"{csv_path}: missing columns {sorted(missing)}")
+        df = df[COLUMNS].dropna(subset=["family"])
+        num = [c for c in COLUMNS if c != "family"]
+        df[num] = df[num].apply(pd.to_numeric, errors="coerce")
+        rows = [tuple(None if isinstance(v, float) and np.isnan(v) else v for v in r)
+                for r in df.itertuples(index=False, name=None)]
+        with self._lock:
+            self._flush_locked()
+            with self._conn:  # rows and import record commit together
+                # write lock first, then re-check: two processes opening the store must not both import
+                self._conn.execute("BEGIN IMMEDIATE")
+                if not force and self._conn.execute(
+                        "SELECT 1 FROM imports WHERE source = ?", (source,)).fetchone():
+                    return 0
+                self._conn.executemany(_INSERT, rows)
+                self._conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?)",
+                                   (source, len(rows), time.time()))
+        return len(rows)
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_store():
+    """
+    Process-wide store at FEEDBACK_DB_PATH. On first use, an empty database
+    imports the legacy CSV at FEEDBACK_CSV_PATH if there is one.
+    """
+    global _default
+    with _default_lock:
+        if _default is None:
+            store = FeedbackStore()
+            if store.count() == 0 and os.path.exists(FEEDBACK_CSV_PATH):
+                n = store.import_csv(FEEDBACK_CSV_PATH)
+                if n:
+                    print(f"[feedback_store] imported {n} rows from {FEEDBACK_CSV_PATH}")
+            _default = store
+        return _default
+
+
+def main(argv):
+    cmd = argv[0] if argv else "info"
+    store = FeedbackStore()
+    if cmd == "import":
+        src = argv[1] if len(argv) > 1 else FEEDBACK_CSV_PATH
+        n = store.import_csv(src, force="--force" in argv)
+        print(f"imported {n} rows from {src}" if n else f"{src} already imported (use --force)")
+    elif cmd == "info":
+        df = store.read(columns=["family"])
+        print(f"{store.path}: {len(df)} rows")
+        for fam, n in df["family"].value_counts().items():
+            print(f"  {fam:15s} {n}")
+    else:
+        print(__doc__)
+        return 2
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
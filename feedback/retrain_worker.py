@@ -0,0 +1,156 @@
+# feedback/retrain_worker.py
+"""
+Correction-model retraining in a separate process.
+
+The simulation loop (automate.py, the Flet UI) only calls request_retrain():
+it flushes the feedback store and atomically rewrites a small signal file
+(RETRAIN_SIGNAL_PATH). The worker polls that file, coalesces however many
+requests arrived while it was busy into one quick_retrain() run, and writes
+the outcome to RETRAIN_STATUS_PATH. quick_retrain publishes every model as a
+new version swapped in by a rename, and ParameterEngine's ModelWatcher picks
+it up without a restart.
+
+    worker = start_worker()      # child process: python -m feedback.retrain_worker
+    request_retrain()            # after each logged simulation
+    python -m feedback.retrain_worker [--once] [--mode auto|full|incremental]
+
+A subprocess (not multiprocessing) so the child never re-imports the
+caller's main module, which opens CST and loads the models at import time.
+"""
+import atexit
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from ai_core.ai_config import *
+from feedback.feedback_store import default_store
+
+
+def _write_json(path, obj):
+    # temp file + rename: readers never see a partial file
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+def _read_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def request_retrain(signal_path=RETRAIN_SIGNAL_PATH):
+    """
+    Ask the worker for a retrain: pending feedback rows are flushed first so
+    the worker sees them. Cheap, never blocks on training.
+    """
+    store = default_store()
+    store.flush()
+    _write_json(signal_path, {"requested_at": time.time(), "last_id": store.last_id(), "pid": os.getpid()})
+
+def retrain_status(status_path=RETRAIN_STATUS_PATH):
+    # last worker outcome ({'trained', 'version', 'seconds', 'error', ...}) or None
+    return _read_json(status_path)
+
+def start_worker(mode="auto"):
+    """
+    Launch the worker process (stopped at interpreter exit). Returns the Popen.
+    """
+    root = str(Path(__file__).resolve().parent.parent)
+    proc = subprocess.Popen([sys.executable, "-m", "feedback.retrain_worker", "--mode", mode], cwd=root)
+
+    def _stop():
+        if proc.poll() is None:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+    atexit.register(_stop)
+    return proc
+
+
+class RetrainWorker:
+    def __init__(
+            self,
+            mode="auto",
+            signal_path=RETRAIN_SIGNAL_PATH,
+            status_path=RETRAIN_STATUS_PATH,
+            interval=RETRAIN_POLL_INTERVAL
+    ):
+        """
+        mode: quick_retrain mode; interval: seconds between signal-file checks
+        """
+        self.mode = mode
+        self.signal_path = str(signal_path)
+        self.status_path = str(status_path)
+        self.interval = float(interval)
+        self._handled = None  # a request left from before the worker started triggers one run
+        self.runs = 0
+
+    def _signal_stat(self):
+        try:
+            st = os.stat(self.signal_path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)  # every request is a new file (rename)
+        except OSError:
+            return None
+
+    def pending(self):
+        stat = self._signal_stat()
+        return stat is not None and stat != self._handled
+
+    def run_once(self):
+        """
+        One quick_retrain() for every request seen so far; writes the status file.
+        """
+        from feedback.ai_quick_retrain import quick_retrain, _load_meta
+
+        self._handled = self._signal_stat()
+        request = _read_json(self.signal_path) or {}
+        t0 = time.perf_counter()
+        status = {"mode": self.mode, "requested_at": request.get("requested_at"), "error": None}
+        try:
+            status["trained"] = bool(quick_retrain(self.mode))
+        except Exception as e:
+            status["trained"] = False
+            status["error"] = f"{type(e).__name__}: {e}"
+        meta = _load_meta()
+        status.update(seconds=round(time.perf_counter() - t0, 4), finished_at=time.time(),
+                      version=meta.get("version"), last=meta.get("last"))
+        _write_json(self.status_path, status)
+        self.runs += 1
+        return status
+
+    def serve(self):
+        # poll the signal file until interrupted
+        print(f"[retrain_worker] watching {self.signal_path} (pid {os.getpid()})")
+        try:
+            while True:
+                if self.pending():
+                    status = self.run_once()
+                    if status["error"]:
+                        print(f"[retrain_worker] retrain failed: {status['error']}")
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def main(argv):
+    mode = argv[argv.index("--mode") + 1] if "--mode" in argv else "auto"
+    worker = RetrainWorker(mode=mode)
+    if "--once" in argv:
+        print(worker.run_once())
+    else:
+        import signal
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        worker.serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,51 @@
+# tests/test_numpy_runtime.py
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import FAMILIES, MODELS_DIR, RANDOM_SEED
+from ai_core.numpy_runtime import NumpyFamilyModels
+from ai_core import param_schema
+
+N = 256
+RTOL = 1e-4
+
+
+def _keras(family):
+    # (forward, fwd_scaler, inverse, scalerX, scalerY), or skip when Keras can't read the files
+    try:
+        import joblib
+        from tensorflow.keras.models import load_model
+        return (
+            load_model(str(MODELS_DIR / f"forward_{family}.keras")),
+            joblib.load(str(MODELS_DIR / f"forward_{family}_scaler.save")),
+            load_model(str(MODELS_DIR / f"inverse_{family}.keras")),
+            joblib.load(str(MODELS_DIR / f"inverse_{family}_scalerX.save")),
+            joblib.load(str(MODELS_DIR / f"inverse_{family}_scalerY.save")),
+        )
+    except Exception as e:
+        pytest.skip(f"Keras cannot load the {family} models: {type(e).__name__}: {e}")
+
+def _max_rel_err(ref, got):
+    # relative to each output column's magnitude, as in numpy_runtime.check_parity
+    col_scale = np.maximum(np.abs(ref).max(axis=0), 1e-12)
+    return float(np.max(np.abs(got - ref) / col_scale))
+
+
+@pytest.mark.parametrize("family", FAMILIES)
+def test_numpy_matches_keras(family):
+    fwd, fwd_sc, inv, scX, scY = _keras(family)
+    np_models = NumpyFamilyModels(family)
+    rng = np.random.default_rng(RANDOM_SEED)
+
+    X = param_schema.sample(family, N, rng)
+    ref = np.asarray(fwd(fwd_sc.transform(X), training=False), dtype=float)
+    assert _max_rel_err(ref, np_models.forward(X)) <= RTOL
+
+    targets = np.column_stack([rng.uniform(1.0, 10.0, N), rng.uniform(50.0, 800.0, N)])
+    ref = scY.inverse_transform(np.asarray(inv(scX.transform(targets), training=False), dtype=float))
+    assert _max_rel_err(ref, np_models.inverse(targets)) <= RTOL
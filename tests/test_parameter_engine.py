@@ -0,0 +1,71 @@
+# tests/test_parameter_engine.py
+import sys
+import warnings
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.neural_network import MLPRegressor
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.parameter_engine import ParameterEngine
+from feedback.ai_quick_retrain import X_COLS
+
+FAMILIES = ["patch_rect", "dipole", "slot"]
+FR, BW = [2.4, 1.5, 5.0], [80.0, 40.0, 300.0]
+PARAMS = np.array([
+    [0.03, 0.028, 0.003, 1.6e-3, 4.4],
+    [0.06, 0.002, 0.0, 1.6e-3, 4.4],
+    [0.004, 0.0, 0.0, 1.6e-3, 4.4],
+])
+
+
+class _Inverse:
+    # fixed inverse predictions, no model files needed
+    result_cache = None
+
+    def predict_inverse_batch(self, families, targets):
+        return PARAMS[:len(families)].copy()
+
+
+def _bundle(cols, seed=0):
+    rng = np.random.default_rng(seed)
+    X, y = rng.normal(size=(64, len(cols))), rng.normal(size=(64, 5))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", ConvergenceWarning)
+        model = MLPRegressor(hidden_layer_sizes=(8,), max_iter=50, random_state=seed).fit(X, y)
+    return {"sk_model": model, "X_mean": np.zeros(len(cols)), "X_std": np.ones(len(cols)),
+            "y_mean": np.zeros(5), "y_std": np.full(5, 1e-3), "feature_cols": list(cols)}
+
+
+def _engine(bundle):
+    engine = ParameterEngine()
+    engine.ai_mgr = _Inverse()
+    engine._correction = SimpleNamespace(snapshot=SimpleNamespace(model=bundle, fingerprint=()),
+                                         metrics=lambda: {})
+    return engine
+
+
+def _both(engine):
+    on = engine.predict_batch(FAMILIES, FR, BW, explore=False, apply_correction=True)
+    off = engine.predict_batch(FAMILIES, FR, BW, explore=False, apply_correction=False)
+    return on, off
+
+
+def test_correction_changes_prediction():
+    engine = _engine(_bundle(X_COLS))
+    on, off = _both(engine)
+    assert not np.allclose(on, off)
+    assert engine.correction_stats()["failures"] == 0
+
+
+def test_unusable_correction_model_is_counted():
+    # older models were trained on the post-simulation errors
+    engine = _engine(_bundle(X_COLS + ["err_Fr", "err_BW"]))
+    on, off = _both(engine)
+    np.testing.assert_allclose(on, off)
+    stats = engine.correction_stats()
+    assert stats["failures"] == 1
+    assert "err_Fr" in stats["last_error"]
@@ -0,0 +1,129 @@
+# trainers/compare_multi_family.py
+# Accuracy, load time and memory of the shared multi-family models vs the 20 per-family models.
+# The dataset keeps substrate_h / eps_r at their defaults, so the accuracy table
+# is also repeated with both redrawn from SUBSTRATE_H_RANGE / EPS_R_RANGE ("off-default"):
+# no ground truth there, but the forward drift from the default-substrate prediction
+# must stay on the per-family models' scale (catches degenerate input scalers).
+#
+#   python trainers/compare_multi_family.py [rows_per_family]
+import sys
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import *
+from ai_core.ai_core_manager import AICoreManager
+from ai_core.family_registry import model_nbytes
+from ai_core.multi_family import MULTI_SCALERS_PATH
+
+PARAM_COLS = ['param_a', 'param_b', 'feed_width_m', 'substrate_h', 'eps_r']
+
+try:
+    import resource  # not available on Windows
+
+    def peak_rss_mb():
+        # ru_maxrss is KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+except ImportError:
+    def peak_rss_mb():
+        return float("nan")
+
+
+def load_all(backend):
+    mgr = AICoreManager(backend=backend, result_cache=None)
+    rss0 = peak_rss_mb()
+    t0 = time.perf_counter()
+    for fam in FAMILIES:
+        mgr.ensure_family(fam)
+    load_s = time.perf_counter() - t0
+    if backend == "multi":
+        nbytes = mgr._shared_models().nbytes
+    else:
+        nbytes = sum(model_nbytes(mgr.ensure_family(f)) for f in FAMILIES)
+    return mgr, load_s, nbytes, peak_rss_mb() - rss0
+
+
+def off_default_substrate(X, seed=RANDOM_SEED):
+    # same designs with substrate_h / eps_r drawn across their allowed ranges
+    rng = np.random.default_rng(seed)
+    X = X.copy()
+    X[:, 3] = rng.uniform(*SUBSTRATE_H_RANGE, size=len(X))
+    X[:, 4] = rng.uniform(*EPS_R_RANGE, size=len(X))
+    return X
+
+
+def evaluate(mgr, df):
+    # per-family forward MAE (GHz, MHz), inverse MAE in units of each param's std,
+    # and mean |Fr change| (GHz) when substrate_h / eps_r leave their dataset defaults
+    fams = df['family'].values
+    X = df[PARAM_COLS].values.astype(float)
+    T = np.column_stack([df['freq_Hz'].values / 1e9, df['bandwidth_Hz'].values / 1e6])
+
+    t0 = time.perf_counter()
+    Y = mgr.predict_forward_batch(fams, X)
+    P = mgr.predict_inverse_batch(fams, T)
+    predict_s = time.perf_counter() - t0
+    Y_off = mgr.predict_forward_batch(fams, off_default_substrate(X))
+
+    rows = {}
+    for fam in FAMILIES:
+        m = fams == fam
+        if not m.any():
+            continue
+        std = X[m].std(axis=0)
+        used = std > 1e-9 * np.abs(X[m]).mean(axis=0)  # skip fixed columns (float noise only)
+        rows[fam] = (
+            float(np.mean(np.abs(Y[m, 0] - T[m, 0]))),
+            float(np.mean(np.abs(Y[m, 1] - T[m, 1]))),
+            float(np.mean(np.abs(P[m][:, used] - X[m][:, used]) / std[used])),
+            float(np.mean(np.abs(Y_off[m, 0] - Y[m, 0]))),
+        )
+    return rows, predict_s
+
+
+def measure(backend, rows_per_family):
+    # runs in a fresh process so RSS and load time aren't shared between backends
+    import tensorflow  # noqa: F401  keep the TensorFlow import out of the load timings
+
+    df = pd.read_csv(DATASET_PATH)
+    df = df.sample(frac=1.0, random_state=RANDOM_SEED).groupby('family').head(rows_per_family)
+    mgr, load_s, nbytes, rss_mb = load_all(backend)
+    acc, predict_s = evaluate(mgr, df)
+    return load_s, nbytes, rss_mb, predict_s, acc
+
+
+def main(rows_per_family=2000):
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor
+
+    report = {}
+    for backend in ("keras", "multi"):
+        with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+            report[backend] = pool.submit(measure, backend, rows_per_family).result()
+
+    print(f"\n{'':14s} {'load s':>8s} {'weights MB':>11s} {'RSS +MB':>8s} {'predict s':>10s}")
+    for backend, (load_s, nbytes, rss_mb, predict_s, _) in report.items():
+        print(f"{backend:14s} {load_s:8.2f} {nbytes/2**20:11.2f} {rss_mb:8.1f} {predict_s:10.3f}")
+
+    print(f"\n{'family':14s} {'Fr MAE GHz':>21s} {'BW MAE MHz':>21s} {'inverse MAE (std)':>21s} "
+          f"{'off-default Fr shift':>21s}")
+    print(f"{'':14s}" + f" {'per-family':>10s} {'multi':>10s}"*4)
+    unstable = []
+    for fam in FAMILIES:
+        if fam not in report["keras"][4]:
+            continue
+        a, b = report["keras"][4][fam], report["multi"][4][fam]
+        print(f"{fam:14s}" + "".join(f" {a[i]:10.4g} {b[i]:10.4g}" for i in range(4)))
+        if not np.isfinite(b[3]) or b[3] > 10 * a[3] + 1.0:
+            unstable.append(fam)
+    if unstable:
+        print(f"\nWARNING: multi-family predictions blow up off the default substrate for {unstable} "
+              f"(check the input scalers in {MULTI_SCALERS_PATH.name})")
+    return report
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,275 @@
+# trainers/train_families.py
+# Train forward and / or inverse per-family models, families in parallel worker processes.
+#
+# One job per (family, direction). Jobs run in a spawn-context process pool,
+# each worker limited to --threads TensorFlow threads (default: cores / workers),
+# largest jobs first so a full retrain takes about as long as the slowest family.
+# Data comes from the family's dataset_store memmaps through a tf.data pipeline
+# (shuffled index batches gathered from the memmap, scaled per batch,
+# prefetched), so no job holds its family's data as one array.
+# Epoch counts are upper bounds: a job stops when val_loss stops improving,
+# cuts the learning rate on plateaus, and checkpoints every
+# TRAIN_CHECKPOINT_EVERY epochs (trainers/train_monitor.py); an interrupted
+# run resumes each unfinished job from its last checkpoint (--fresh: start over).
+# Outputs are the files AICoreManager loads (models/forward_<fam>.keras, scalers, ...),
+# holding the best-validation weights, plus a per-job timing / loss summary in
+# TRAIN_SUMMARY_PATH.
+#
+#   python trainers/train_families.py [--families patch_rect,dipole] [--directions forward,inverse]
+#                                     [--workers N] [--threads T] [--epochs E] [--fresh]
+import json
+import os
+import sys
+import time
+import multiprocessing as mp
+import joblib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import *
+from dataset_store import DatasetStore
+from sklearn.preprocessing import StandardScaler
+from sklearn.model_selection import train_test_split
+
+DIRECTIONS = ("forward", "inverse")
+VALIDATION_SPLIT = 0.15  # last part of the training rows, as keras validation_split
+
+
+def _limit_threads(threads):
+    # before TensorFlow starts its thread pools (first import in this process)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(min(threads, 2))
+
+
+def fit_scaler(A, idx, chunk=DATASET_CHUNK_ROWS):
+    # StandardScaler over rows idx of a memmap, chunk by chunk
+    scaler = StandardScaler()
+    for s in range(0, len(idx), chunk):
+        scaler.partial_fit(A[np.sort(idx[s:s + chunk])])
+    return scaler
+
+def make_dataset(X, y, idx, x_scaler, y_scaler, batch_size=BATCH_SIZE, shuffle=False, seed=RANDOM_SEED,
+                 first_epoch=0):
+    """
+    tf.data pipeline over rows idx of the memmaps X, y: a new permutation
+    each epoch, batches gathered from the memmap and scaled as they are
+    produced, prefetched while the previous batch trains. Epoch e is
+    shuffled by SeedSequence(seed, spawn_key=(e,)), so a resumed run
+    (first_epoch > 0) sees the same batches as an uninterrupted one.
+    """
+    import tensorflow as tf
+
+    epoch = [first_epoch]
+    scale = lambda s, A: A if s is None else s.transform(A)
+
+    def batches():
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(epoch[0],)))
+        epoch[0] += 1
+        order = rng.permutation(idx) if shuffle else idx
+        for s in range(0, len(order), batch_size):
+            b = np.sort(order[s:s + batch_size])  # sorted: sequential memmap reads
+            yield (scale(x_scaler, X[b]).astype(np.float32), scale(y_scaler, y[b]).astype(np.float32))
+
+    spec = (tf.TensorSpec((None, X.shape[1]), tf.float32), tf.TensorSpec((None, y.shape[1]), tf.float32))
+    return tf.data.Dataset.from_generator(batches, output_signature=spec).prefetch(tf.data.AUTOTUNE)
+
+def build_model(n_in, n_out):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Dense
+    from tensorflow.keras.losses import MeanSquaredError
+    from tensorflow.keras.optimizers import Adam
+
+    model = Sequential([
+        Dense(256, activation='relu', input_shape=(n_in,)),
+        Dense(128, activation='relu'),
+        Dense(64, activation='relu'),
+        Dense(n_out)
+    ])
+    model.compile(optimizer=Adam(learning_rate=TRAIN_LEARNING_RATE), loss=MeanSquaredError())
+    return model
+
+def _save_model(model, path):
+    # temp name + rename: a loading AICoreManager never sees a half-written file
+    tmp = path.with_name(f"{path.stem}.tmp{os.getpid()}{path.suffix}")
+    model.save(str(tmp))
+    os.replace(tmp, path)
+
+def _dump(obj, path):
+    tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    joblib.dump(obj, str(tmp))
+    os.replace(tmp, path)
+
+
+def train_job(family, direction, epochs=None, store_dir=DATASET_STORE_DIR, resume=True, verbose=0):
+    """
+    Train and save one family's forward or inverse model. Returns its summary dict.
+    forward: params -> (Fr_GHz, BW_MHz), inputs standardized (targets raw, as before)
+    inverse: (Fr_GHz, BW_MHz) -> params, both standardized
+    resume: continue from the job's checkpoint if one exists for the same data
+    """
+    import tensorflow as tf
+    from trainers.train_monitor import (TrainingMonitor, new_state, load_checkpoint,
+                                        load_best_weights, clear_checkpoint)
+
+    t0 = time.perf_counter()
+    store = DatasetStore(store_dir)
+    feats, targs = store.load(family, "features"), store.load(family, "targets")
+    X, y = (feats, targs) if direction == "forward" else (targs, feats)
+    epochs = int(epochs or (FORWARD_EPOCHS if direction == "forward" else INVERSE_EPOCHS))
+    n = X.shape[0]
+
+    # same row partition as train_test_split on the full arrays
+    train_idx, test_idx = train_test_split(np.arange(n), test_size=TRAIN_TEST_SPLIT, random_state=RANDOM_SEED)
+    n_val = int(len(train_idx) * VALIDATION_SPLIT)
+    fit_idx, val_idx = train_idx[:len(train_idx) - n_val], train_idx[len(train_idx) - n_val:]
+
+    all_idx = np.arange(n)
+    x_scaler = fit_scaler(X, all_idx)
+    y_scaler = fit_scaler(y, all_idx) if direction == "inverse" else None
+
+    ckpt_dir = TRAIN_CHECKPOINT_DIR / f"{direction}_{family}"
+    key = {"rows": int(n), "dataset": store.manifest["created"], "batch_size": BATCH_SIZE}
+    found = load_checkpoint(ckpt_dir, key) if resume else None
+    if found:
+        state, model = found
+    else:
+        clear_checkpoint(ckpt_dir)
+        tf.random.set_seed(RANDOM_SEED)
+        state, model = new_state(key), build_model(X.shape[1], y.shape[1])
+    resumed_from = state["epoch"]
+    monitor = TrainingMonitor(
+        ckpt_dir, state, TRAIN_PATIENCE, TRAIN_MIN_DELTA, TRAIN_LR_PATIENCE, TRAIN_LR_FACTOR,
+        TRAIN_MIN_LR, TRAIN_CHECKPOINT_EVERY, best_weights=load_best_weights(ckpt_dir, state),
+    )
+
+    t_fit = time.perf_counter()
+    if not state["stopped"] and state["epoch"] < epochs:
+        model.fit(
+            make_dataset(X, y, fit_idx, x_scaler, y_scaler, shuffle=True, first_epoch=state["epoch"]),
+            validation_data=make_dataset(X, y, val_idx, x_scaler, y_scaler),
+            initial_epoch=state["epoch"], epochs=epochs, callbacks=[monitor], verbose=verbose,
+        )
+    fit_s = time.perf_counter() - t_fit
+    epochs_run = state["epoch"] - resumed_from
+    if monitor.best_weights is not None:
+        model.set_weights(monitor.best_weights)  # publish the best-validation epoch, not the last
+    test_loss = float(model.evaluate(make_dataset(X, y, test_idx, x_scaler, y_scaler), verbose=0))
+
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    _save_model(model, MODELS_DIR / f"{direction}_{family}.keras")
+    if direction == "forward":
+        _dump(x_scaler, MODELS_DIR / f"forward_{family}_scaler.save")
+    else:
+        _dump(x_scaler, MODELS_DIR / f"inverse_{family}_scalerX.save")
+        _dump(y_scaler, MODELS_DIR / f"inverse_{family}_scalerY.save")
+    clear_checkpoint(ckpt_dir)  # published: the next run starts fresh
+
+    best = state["best_epoch"]
+    hist = state["history"]
+    return {
+        "family": family, "direction": direction, "rows": int(n),
+        "max_epochs": epochs, "epochs": state["epoch"], "best_epoch": best,
+        "epochs_saved": max(epochs - state["epoch"], 0), "stopped_early": state["stopped"],
+        "resumed_from": resumed_from, "epochs_run": epochs_run,
+        "train_loss": hist["loss"][best - 1] if best else None,
+        "val_loss": state["best_val"], "final_lr": hist["lr"][-1] if hist["lr"] else None,
+        "test_loss": test_loss, "fit_s": fit_s, "seconds": time.perf_counter() - t0,
+        "epoch_s": fit_s / epochs_run if epochs_run else None, "pid": os.getpid(),
+    }
+
+def _run_job(job):
+    family, direction, epochs, resume = job
+    try:
+        return train_job(family, direction, epochs, resume=resume)
+    except Exception as e:
+        return {"family": family, "direction": direction, "error": f"{type(e).__name__}: {e}"}
+
+
+def train_families(families=None, directions=DIRECTIONS, workers=TRAIN_WORKERS,
+                   threads=TRAIN_THREADS_PER_WORKER, epochs=None, resume=True, summary_path=TRAIN_SUMMARY_PATH):
+    """
+    Train every (family, direction) job; yields each job's summary as it
+    finishes and writes all of them to summary_path at the end.
+    families: default every family in the dataset store with >= 50 rows
+    workers: processes (default min(jobs, cores)); threads: TensorFlow threads per worker
+    epochs: upper bound per job (default FORWARD_EPOCHS / INVERSE_EPOCHS)
+    resume: continue unfinished jobs from their checkpoints
+    """
+    store = DatasetStore()
+    families = [f for f in (families or FAMILIES) if store.rows(f) >= 50]
+    epochs_of = lambda d: int(epochs or (FORWARD_EPOCHS if d == "forward" else INVERSE_EPOCHS))
+    # largest first: the long jobs start before the pool fills with short ones
+    jobs = sorted(((f, d, epochs, resume) for f in families for d in directions),
+                  key=lambda j: -store.rows(j[0]) * epochs_of(j[1]))
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, len(jobs) or 1))
+    threads = max(1, threads or cores // workers)
+
+    t0 = time.perf_counter()
+    results = []
+    if workers <= 1:
+        _limit_threads(threads)
+        for job in jobs:
+            results.append(_run_job(job))
+            yield results[-1]
+    else:
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp.get_context("spawn"),
+                initializer=_limit_threads,
+                initargs=(threads,),
+        ) as pool:
+            futures = [pool.submit(_run_job, job) for job in jobs]
+            for fut in as_completed(futures):
+                results.append(fut.result())
+                yield results[-1]
+
+    wall = time.perf_counter() - t0
+    summary = {
+        "workers": workers, "threads_per_worker": threads, "wall_s": wall,
+        "sum_job_s": sum(r.get("seconds", 0.0) for r in results),
+        "epochs_saved": sum(r.get("epochs_saved", 0) for r in results),
+        "finished_at": time.time(), "jobs": results,
+    }
+    tmp = Path(f"{summary_path}.tmp")
+    tmp.write_text(json.dumps(summary, indent=1))
+    os.replace(tmp, summary_path)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    opt = lambda name, default=None: argv[argv.index(name) + 1] if name in argv else default
+    families = opt("--families")
+    directions = opt("--directions")
+    gen = train_families(
+        families=families.split(",") if families else None,
+        directions=tuple(directions.split(",")) if directions else DIRECTIONS,
+        workers=int(opt("--workers", 0)) or None,
+        threads=int(opt("--threads", 0)) or None,
+        epochs=int(opt("--epochs", 0)) or None,
+        resume="--fresh" not in argv,
+    )
+    print(f"{'family':15s} {'model':8s} {'rows':>7s} {'epochs':>9s} {'best':>5s} {'saved':>5s} "
+          f"{'total s':>8s} {'best val':>10s} {'test loss':>10s}")
+    for r in gen:
+        if "error" in r:
+            print(f"{r['family']:15s} {r['direction']:8s} failed: {r['error']}")
+            continue
+        epochs = f"{r['epochs']}/{r['max_epochs']}"
+        resumed = f"  (resumed at {r['resumed_from']})" if r["resumed_from"] else ""
+        print(f"{r['family']:15s} {r['direction']:8s} {r['rows']:7d} {epochs:>9s} {r['best_epoch']:5d} "
+              f"{r['epochs_saved']:5d} {r['seconds']:8.1f} {r['val_loss'] or float('nan'):10.4g} "
+              f"{r['test_loss']:10.4g}{resumed}", flush=True)
+    summary = json.loads(Path(TRAIN_SUMMARY_PATH).read_text())
+    print(f"wall {summary['wall_s']:.1f} s for {summary['sum_job_s']:.1f} s of jobs, "
+          f"{summary['epochs_saved']} epochs saved by early stopping "
+          f"({summary['workers']} workers x {summary['threads_per_worker']} threads) -> {TRAIN_SUMMARY_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# trainers/train_monitor.py
+"""
+Early stopping, plateau learning-rate decay and resumable checkpoints for
+one training job (used by trainers/train_families.py).
+
+A checkpoint directory holds
+
+    state.json           epoch, early-stop / LR counters, best epoch, history
+    epoch_<n>.keras      model + optimizer after epoch n
+    best_<m>.npz         weights of the best-validation epoch m so far
+
+state.json is written last and names both files, so an interrupted write
+leaves the previous checkpoint usable. Keras' EarlyStopping and
+ReduceLROnPlateau reset their counters in on_train_begin and cannot resume;
+TrainingMonitor keeps all of it in one restorable state.
+"""
+import json
+import os
+import shutil
+import numpy as np
+from pathlib import Path
+from tensorflow.keras.callbacks import Callback
+from tensorflow.keras.models import load_model
+
+
+def new_state(key):
+    return {
+        "key": key, "epoch": 0, "stopped": False, "best_val": None, "best_epoch": 0,
+        "wait": 0, "lr_wait": 0, "model_file": None, "best_file": None,
+        "history": {"loss": [], "val_loss": [], "lr": []},
+    }
+
+def load_checkpoint(ckpt_dir, key):
+    """
+    (state, model) of the checkpoint in ckpt_dir, or None when there is none
+    or it was written for different data (key mismatch).
+    """
+    path = Path(ckpt_dir) / "state.json"
+    try:
+        state = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if state.get("key") != key or not state.get("model_file"):
+        return None
+    model_path = Path(ckpt_dir) / state["model_file"]
+    if not model_path.exists():
+        return None
+    return state, load_model(str(model_path))
+
+def load_best_weights(ckpt_dir, state):
+    # weights list of the checkpoint's best epoch (None before the first save)
+    if not state.get("best_file"):
+        return None
+    path = Path(ckpt_dir) / state["best_file"]
+    with np.load(str(path)) as data:
+        return [data[f"w{i}"] for i in range(len(data.files))]
+
+
+class TrainingMonitor(Callback):
+    """
+    After every epoch: track the best val_loss (relative improvement >
+    min_delta) and its weights, multiply the learning rate by lr_factor after
+    lr_patience epochs without improvement (down to min_lr), stop after
+    patience epochs without improvement, and checkpoint every `every` epochs
+    and when training ends.
+    """
+    def __init__(self, ckpt_dir, state, patience, min_delta, lr_patience, lr_factor, min_lr,
+                 every, best_weights=None):
+        super().__init__()
+        self.ckpt_dir = Path(ckpt_dir)
+        self.state = state
+        self.patience = patience
+        self.min_delta = min_delta
+        self.lr_patience = lr_patience
+        self.lr_factor = lr_factor
+        self.min_lr = min_lr
+        self.every = max(1, int(every))
+        self.best_weights = best_weights
+        self._best_dirty = False
+
+    @property
+    def lr(self):
+        return float(np.asarray(self.model.optimizer.learning_rate))
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs or {}
+        s = self.state
+        val = float(logs["val_loss"])
+        s["epoch"] = epoch + 1
+        s["history"]["loss"].append(float(logs["loss"]))
+        s["history"]["val_loss"].append(val)
+        s["history"]["lr"].append(self.lr)
+
+        if s["best_val"] is None or val < s["best_val"] * (1.0 - self.min_delta):
+            s["best_val"], s["best_epoch"] = val, epoch + 1
+            s["wait"] = s["lr_wait"] = 0
+            self.best_weights = self.model.get_weights()
+            self._best_dirty = True
+        else:
+            s["wait"] += 1
+            s["lr_wait"] += 1
+            if s["lr_wait"] >= self.lr_patience and self.lr > self.min_lr:
+                self.model.optimizer.learning_rate.assign(max(self.lr * self.lr_factor, self.min_lr))
+                s["lr_wait"] = 0
+            if s["wait"] >= self.patience:
+                s["stopped"] = True
+                self.model.stop_training = True
+
+        if s["stopped"] or s["epoch"] % self.every == 0:
+            self.save()
+
+    def on_train_end(self, logs=None):
+        if self.state["model_file"] != f"epoch_{self.state['epoch']}.keras":
+            self.save()
+
+    def save(self):
+        self.ckpt_dir.mkdir(parents=True, exist_ok=True)
+        s = self.state
+        old = {s["model_file"], s["best_file"]}
+        if self._best_dirty:
+            s["best_file"] = f"best_{s['best_epoch']}.npz"
+            tmp = self.ckpt_dir / "best.tmp.npz"
+            np.savez(str(tmp), **{f"w{i}": w for i, w in enumerate(self.best_weights)})
+            os.replace(tmp, self.ckpt_dir / s["best_file"])
+            self._best_dirty = False
+
+        s["model_file"] = f"epoch_{s['epoch']}.keras"
+        tmp = self.ckpt_dir / "epoch.tmp.keras"
+        self.model.save(str(tmp))
+        os.replace(tmp, self.ckpt_dir / s["model_file"])
+        tmp = self.ckpt_dir / "state.json.tmp"
+        tmp.write_text(json.dumps(s))
+        os.replace(tmp, self.ckpt_dir / "state.json")
+        for name in old - {s["model_file"], s["best_file"], None}:
+            (self.ckpt_dir / name).unlink(missing_ok=True)
+
+def clear_checkpoint(ckpt_dir):
+    shutil.rmtree(ckpt_dir, ignore_errors=True)
@@ -0,0 +1,84 @@
+# trainers/train_multi_family.py
+# One shared forward and one shared inverse model for all families (family one-hot input).
+# Used by AICoreManager(backend="multi"); compare against the per-family models with
+# trainers/compare_multi_family.py
+import sys
+import joblib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ai_core.ai_config import *
+from ai_core.multi_family import (
+    family_ids, encode_inputs, fit_family_scalers,
+    MULTI_FORWARD_PATH, MULTI_INVERSE_PATH, MULTI_SCALERS_PATH
+)
+from sklearn.model_selection import train_test_split
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import Dense
+from tensorflow.keras.losses import MeanSquaredError
+
+PARAM_COLS = ['param_a', 'param_b', 'feed_width_m', 'substrate_h', 'eps_r']
+
+
+def build_model(n_in, n_out):
+    model = Sequential([
+        Dense(256, activation='relu', input_shape=(n_in,)),
+        Dense(128, activation='relu'),
+        Dense(64, activation='relu'),
+        Dense(n_out)
+    ])
+    model.compile(optimizer='adam', loss=MeanSquaredError())
+    return model
+
+
+def train_direction(name, ids, X, y, epochs):
+    # per-family standardization of inputs and outputs, family one-hot appended to inputs
+    X_mean, X_scale = fit_family_scalers(ids, X)
+    y_mean, y_scale = fit_family_scalers(ids, y)
+    Xin = encode_inputs(ids, (X - X_mean[ids]) / X_scale[ids])
+    ys = (y - y_mean[ids]) / y_scale[ids]
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        Xin, ys, test_size=TRAIN_TEST_SPLIT, random_state=RANDOM_SEED, stratify=ids
+    )
+    model = build_model(Xin.shape[1], ys.shape[1])
+    print(f"[train_multi] training {name} model on {len(Xin)} samples")
+    model.fit(X_train, y_train, epochs=epochs, batch_size=BATCH_SIZE, validation_split=0.15)
+
+    loss = model.evaluate(X_test, y_test)
+    if PRINT_ERROR:
+        print(f"[train_multi] test loss (standardized) for {name}: {loss}")
+    return model, X_mean, X_scale, y_mean, y_scale
+
+
+def main():
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv(DATASET_PATH)
+    df = df[df['family'].isin(FAMILIES)]
+    ids = family_ids(df['family'].values)
+
+    params = df[PARAM_COLS].values.astype(float)
+    targets = df[['freq_Hz', 'bandwidth_Hz']].values.astype(float)
+    targets[:, 0] = targets[:, 0] / 1e9  # GHz
+    targets[:, 1] = targets[:, 1] / 1e6  # MHz
+
+    fwd, fX_mean, fX_scale, fy_mean, fy_scale = train_direction("forward", ids, params, targets, FORWARD_EPOCHS)
+    inv, iX_mean, iX_scale, iy_mean, iy_scale = train_direction("inverse", ids, targets, params, INVERSE_EPOCHS)
+
+    fwd.save(str(MULTI_FORWARD_PATH))
+    inv.save(str(MULTI_INVERSE_PATH))
+    joblib.dump({
+        "families": list(FAMILIES),
+        "fwd_X_mean": fX_mean, "fwd_X_scale": fX_scale,
+        "fwd_y_mean": fy_mean, "fwd_y_scale": fy_scale,
+        "inv_X_mean": iX_mean, "inv_X_scale": iX_scale,
+        "inv_y_mean": iy_mean, "inv_y_scale": iy_scale,
+    }, str(MULTI_SCALERS_PATH))
+    print(f"[train_multi] saved {MULTI_FORWARD_PATH.name}, {MULTI_INVERSE_PATH.name}, {MULTI_SCALERS_PATH.name}")
+
+
+if __name__ == "__main__":
+    main()
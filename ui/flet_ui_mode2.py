@@ -1,20 +1,27 @@
 # ui/flet_ui_mode2.py
 import flet as ft
 import threading
-import os
 import queue
-import pandas as pd
 
-from ai_core.parameter_engine import ParameterEngine
+from ai_core.inference_service import make_engine
 from cst_interface.cst_driver_mode2 import CSTDriverMode2
 from feedback.feedback_logger import log_feedback
+from feedback.feedback_store import default_store
+from feedback import feedback_aggregates
 from feedback.ai_quick_retrain import quick_retrain
-from ai_core.ai_config import FAMILIES, ANTENNA_PATH
+from feedback.retrain_worker import request_retrain, start_worker
+from ai_core.ai_config import FAMILIES, ANTENNA_PATH, RETRAIN_BACKGROUND
 
-engine = ParameterEngine()
+engine = make_engine()  # ParameterEngine, or the shared inference service
 cst = CSTDriverMode2()
 
-FEEDBACK_CSV = r"feedback\ai_feedback_mode2.csv"
+# Compile inference graphs in the background so the first Generate click doesn't pay for it
+threading.Thread(target=engine.ai_mgr.warmup, args=(FAMILIES,), daemon=True).start()
+
+# Correction-model retraining runs in its own process, the pipeline only signals it
+if RETRAIN_BACKGROUND:
+    start_worker()
+
 ANTENNA_PATH = ANTENNA_PATH
 
 # Queue for thread-safe UI updates
@@ -181,8 +188,11 @@ def main(page: ft.Page):
             params_for_log = list(params[:5]) if len(params) >= 5 else list(params) + [0] * (5 - len(params))
             log_feedback(family, Fr_t, BW_t, params_for_log, Fr_a, BW_a, S11)
 
-            show_loading("Quick retrain...")
-            quick_retrain()
+            if RETRAIN_BACKGROUND:
+                request_retrain()
+            else:
+                show_loading("Quick retrain...")
+                quick_retrain()
 
             def update_results():
                 final_msg = (
@@ -224,20 +234,14 @@ def main(page: ft.Page):
 
     def on_dashboard(e):
         try:
-            if not os.path.exists(FEEDBACK_CSV):
-                return show_snack("No feedback file yet")
-
-            df = pd.read_csv(FEEDBACK_CSV)
-            if df.empty:
-                return show_snack("Feedback file is empty")
-
-            df["freq_err"] = df["actual_Fr_GHz"] - df["target_Fr_GHz"]
-            df["bw_err"] = df["actual_BW_MHz"] - df["target_BW_MHz"]
-
-            show_snack(
-                f"Avg Freq Error: {df.freq_err.mean():.3f} GHz\n"
-                f"Avg BW Error: {df.bw_err.mean():.2f} MHz"
-            )
+            # running per-family statistics from the sidecar (only rows logged
+            # since its last update are read)
+            summary = feedback_aggregates.refresh(default_store()).summary()
+            if not summary:
+                return show_snack("No feedback yet")
+
+            families = [feedback_aggregates.ALL] + ([family_dd.value] if family_dd.value in summary else [])
+            show_snack(feedback_aggregates.format_summary(summary, families))
         except Exception as ex:
             show_snack(f"Dashboard error: {ex}")
 
@@ -1,6 +1,5 @@
 # utils.py
 import numpy as np
-import math
 from ai_core.ai_config import C
 
 def effective_eps(eps_r, W, h):
@@ -9,7 +8,7 @@ def effective_eps(eps_r, W, h):
 def rect_patch_L_from_freq(f, eps_r, h, W):
     eps_eff = effective_eps(eps_r, W, h)
     delta_L = 0.412 * h * ((eps_eff + 0.3)*(W/h + 0.264)) / ((eps_eff - 0.258)*(W/h + 0.8))
-    L = (C / (2 * f * math.sqrt(eps_eff))) - 2*delta_L
+    L = (C / (2 * f * np.sqrt(eps_eff))) - 2*delta_L
     return L, eps_eff
 
 def bandwidth_estimate_patch(f, W, h, eps_r, feed_factor=1.0):